@@ -53,15 +53,28 @@ class ApplicationRemoteDataSourceImpl implements ApplicationRemoteDataSource {
   @override
   Future<List<ApplicationModel>> getUserApplications() async {
     try {
-      final response = await dio.get('/api/applications/me');
-
-      if (response.data is List) {
-        return (response.data as List)
-            .map((json) => ApplicationModel.fromJson(json))
-            .toList();
-      } else {
-        throw Exception('Invalid response format');
-      }
+      final applications = <ApplicationModel>[];
+      String? cursor;
+      // The list is paged; the next page's cursor comes in X-Next-Cursor
+      do {
+        final response = await dio.get(
+          '/api/applications/me/',
+          queryParameters: {
+            'page_size': 100,
+            if (cursor != null) 'cursor': cursor,
+          },
+        );
+
+        if (response.data is! List) {
+          throw Exception('Invalid response format');
+        }
+        applications.addAll(
+          (response.data as List).map((json) => ApplicationModel.fromJson(json)),
+        );
+        cursor = response.headers.value('x-next-cursor');
+      } while (cursor != null);
+
+      return applications;
     } on DioException catch (e) {
       throw _handleError(e);
     }
@@ -0,0 +1,26 @@
+"""add_profile_data_version
+
+Revision ID: 3f1c2a7d9b40
+Revises: 944ba5b3ed85
+Create Date: 2026-10-19 10:12:31.504112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9b40'
+down_revision: Union[str, None] = '944ba5b3ed85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_profiles', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('user_profiles', 'data_version')
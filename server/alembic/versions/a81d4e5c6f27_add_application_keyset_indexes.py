@@ -0,0 +1,28 @@
+"""add_application_keyset_indexes
+
+Revision ID: a81d4e5c6f27
+Revises: 3f1c2a7d9b40
+Create Date: 2026-10-19 11:40:08.219533
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81d4e5c6f27'
+down_revision: Union[str, None] = '3f1c2a7d9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_applications_profile_created', 'applications', ['user_profile_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_applications_profile_status_created', 'applications', ['user_profile_id', 'status', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_applications_profile_status_created', table_name='applications')
+    op.drop_index('idx_applications_profile_created', table_name='applications')
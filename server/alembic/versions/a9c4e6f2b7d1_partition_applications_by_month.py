@@ -0,0 +1,142 @@
+"""partition_applications_by_month
+
+Revision ID: a9c4e6f2b7d1
+Revises: f1a6d3b08c52
+Create Date: 2026-10-19 18:05:12.447120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c4e6f2b7d1'
+down_revision: Union[str, None] = 'f1a6d3b08c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GENERATED_COLUMNS = (('city', 255), ('region', 255), ('country_code', 10))
+STORED_COLUMNS = (
+    'id, user_profile_id, address, description, image_urls, status, created_at, updated_at, search_vector'
+)
+INDEXES = (
+    'idx_applications_created_at',
+    'idx_applications_profile_created',
+    'idx_applications_profile_status_created',
+    'idx_applications_city_created',
+    'idx_applications_region_created',
+    'idx_applications_country_code',
+    'idx_applications_address_gin',
+    'idx_applications_search_vector',
+)
+SEARCH_TRIGGER = """
+    CREATE TRIGGER applications_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF description, address ON applications
+    FOR EACH ROW EXECUTE FUNCTION applications_search_vector_update()
+"""
+# One partition per month from the oldest row through three months ahead
+CREATE_MONTHLY_PARTITIONS = """
+    DO $$
+    DECLARE
+        month date := date_trunc('month', coalesce((SELECT min(created_at) FROM applications_unpartitioned), now()));
+    BEGIN
+        WHILE month <= date_trunc('month', now()) + interval '3 months' LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF applications FOR VALUES FROM (%L) TO (%L)',
+                'applications_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                month, month + interval '1 month'
+            );
+            month := month + interval '1 month';
+        END LOOP;
+    END $$
+"""
+
+
+def create_applications_table(primary_key, **kwargs) -> None:
+    op.create_table(
+        'applications',
+        sa.Column('user_profile_id', sa.UUID(), nullable=False),
+        sa.Column('address', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('image_urls', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        *[
+            sa.Column(name, sa.String(length), sa.Computed(f"CAST(address ->> '{name}' AS VARCHAR)", persisted=True), nullable=True)
+            for name, length in GENERATED_COLUMNS
+        ],
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_profile_id'], ['user_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kwargs
+    )
+
+
+def create_indexes() -> None:
+    op.create_index('idx_applications_created_at', 'applications', ['created_at'], unique=False)
+    op.create_index(
+        'idx_applications_profile_created', 'applications', ['user_profile_id', 'created_at', 'id'], unique=False
+    )
+    op.create_index(
+        'idx_applications_profile_status_created', 'applications',
+        ['user_profile_id', 'status', 'created_at', 'id'], unique=False
+    )
+    op.create_index('idx_applications_city_created', 'applications', ['city', 'created_at'], unique=False)
+    op.create_index('idx_applications_region_created', 'applications', ['region', 'created_at'], unique=False)
+    op.create_index('idx_applications_country_code', 'applications', ['country_code'], unique=False)
+    op.create_index(
+        'idx_applications_address_gin', 'applications', ['address'], unique=False,
+        postgresql_using='gin', postgresql_ops={'address': 'jsonb_path_ops'}
+    )
+    op.create_index(
+        'idx_applications_search_vector', 'applications', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def set_aside_applications_table(new_name: str) -> None:
+    """Rename the current table out of the way, freeing its index and constraint names"""
+    op.execute("DROP TRIGGER applications_search_vector_trigger ON applications")
+    for index in INDEXES:
+        op.drop_index(index, table_name='applications')
+    op.rename_table('applications', new_name)
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT applications_pkey TO {new_name}_pkey")
+    op.execute(f"ALTER TABLE {new_name} DROP CONSTRAINT applications_user_profile_id_fkey")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'application_archive_counts',
+        sa.Column('user_profile_id', sa.UUID(), nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('pending', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('approved', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rejected', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_profile_id'], ['user_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_profile_id')
+    )
+
+    # Rows are copied into the new partitions before its indexes are built
+    set_aside_applications_table('applications_unpartitioned')
+    create_applications_table(('id', 'created_at'), postgresql_partition_by='RANGE (created_at)')
+    op.execute("CREATE TABLE applications_default PARTITION OF applications DEFAULT")
+    op.execute(CREATE_MONTHLY_PARTITIONS)
+    op.execute(SEARCH_TRIGGER)
+    op.execute(f"INSERT INTO applications ({STORED_COLUMNS}) SELECT {STORED_COLUMNS} FROM applications_unpartitioned")
+    op.drop_table('applications_unpartitioned')
+    create_indexes()
+
+
+def downgrade() -> None:
+    # Rows already moved to archive files are not restored
+    set_aside_applications_table('applications_partitioned')
+    create_applications_table(('id',))
+    op.execute(SEARCH_TRIGGER)
+    op.execute(f"INSERT INTO applications ({STORED_COLUMNS}) SELECT {STORED_COLUMNS} FROM applications_partitioned")
+    op.drop_table('applications_partitioned')
+    create_indexes()
+    op.drop_table('application_archive_counts')
@@ -0,0 +1,44 @@
+"""add_application_status_events
+
+Revision ID: b83f5d1e6c90
+Revises: a9c4e6f2b7d1
+Create Date: 2026-10-19 21:14:37.602518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f5d1e6c90'
+down_revision: Union[str, None] = 'a9c4e6f2b7d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'application_status_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('user_profile_id', sa.UUID(), nullable=False),
+        sa.Column('application_id', sa.UUID(), nullable=False),
+        sa.Column('previous_status', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_profile_id'], ['user_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'idx_application_status_events_profile_id', 'application_status_events', ['user_profile_id', 'id'], unique=False
+    )
+    op.create_index(
+        'idx_application_status_events_created_at', 'application_status_events', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_application_status_events_created_at', table_name='application_status_events')
+    op.drop_index('idx_application_status_events_profile_id', table_name='application_status_events')
+    op.drop_table('application_status_events')
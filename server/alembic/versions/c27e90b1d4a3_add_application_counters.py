@@ -0,0 +1,48 @@
+"""add_application_counters
+
+Revision ID: c27e90b1d4a3
+Revises: a81d4e5c6f27
+Create Date: 2026-10-19 13:05:44.870216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c27e90b1d4a3'
+down_revision: Union[str, None] = 'a81d4e5c6f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'application_counters',
+        sa.Column('user_profile_id', sa.UUID(), nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('pending', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('approved', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rejected', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_profile_id'], ['user_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_profile_id')
+    )
+    
+    # Backfill from existing applications
+    op.execute("""
+        INSERT INTO application_counters (user_profile_id, total, pending, approved, rejected)
+        SELECT p.id,
+               COUNT(a.id),
+               COUNT(a.id) FILTER (WHERE a.status = 'pending'),
+               COUNT(a.id) FILTER (WHERE a.status = 'approved'),
+               COUNT(a.id) FILTER (WHERE a.status = 'rejected')
+        FROM user_profiles p
+        LEFT JOIN applications a ON a.user_profile_id = p.id
+        GROUP BY p.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('application_counters')
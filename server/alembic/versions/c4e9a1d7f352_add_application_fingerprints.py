@@ -0,0 +1,58 @@
+"""add_application_fingerprints
+
+Revision ID: c4e9a1d7f352
+Revises: b83f5d1e6c90
+Create Date: 2026-10-19 23:02:51.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a1d7f352'
+down_revision: Union[str, None] = 'b83f5d1e6c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'application_fingerprints',
+        sa.Column('application_id', sa.UUID(), nullable=False),
+        sa.Column('user_profile_id', sa.UUID(), nullable=False),
+        sa.Column('geohash', sa.String(length=12), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('duplicate_of_id', sa.UUID(), nullable=True),
+        sa.Column('similarity', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['user_profile_id'], ['user_profiles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('application_id')
+    )
+    op.create_index(
+        'idx_application_fingerprints_created_at', 'application_fingerprints', ['created_at'], unique=False
+    )
+    op.create_index(
+        'idx_application_fingerprints_flagged', 'application_fingerprints', ['created_at', 'application_id'],
+        unique=False, postgresql_where=sa.text('duplicate_of_id IS NOT NULL')
+    )
+    op.create_table(
+        'application_lsh_buckets',
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.Column('application_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket', 'application_id')
+    )
+    op.create_index(
+        'idx_application_lsh_buckets_created_at', 'application_lsh_buckets', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_application_lsh_buckets_created_at', table_name='application_lsh_buckets')
+    op.drop_table('application_lsh_buckets')
+    op.drop_index('idx_application_fingerprints_flagged', table_name='application_fingerprints')
+    op.drop_index('idx_application_fingerprints_created_at', table_name='application_fingerprints')
+    op.drop_table('application_fingerprints')
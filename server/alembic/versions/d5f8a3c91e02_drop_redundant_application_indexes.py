@@ -0,0 +1,29 @@
+"""drop_redundant_application_indexes
+
+Revision ID: d5f8a3c91e02
+Revises: c27e90b1d4a3
+Create Date: 2026-10-19 14:21:10.337905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f8a3c91e02'
+down_revision: Union[str, None] = 'c27e90b1d4a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Both are prefixes/subsets of the composite (user_profile_id, ...) indexes
+    op.drop_index('idx_applications_user_profile_id', table_name='applications')
+    op.drop_index('idx_applications_status', table_name='applications')
+
+
+def downgrade() -> None:
+    op.create_index('idx_applications_status', 'applications', ['status'], unique=False)
+    op.create_index('idx_applications_user_profile_id', 'applications', ['user_profile_id'], unique=False)
@@ -0,0 +1,65 @@
+"""jsonb_address_generated_columns
+
+Revision ID: e4b7c2a95d18
+Revises: d5f8a3c91e02
+Create Date: 2026-10-19 16:42:03.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2a95d18'
+down_revision: Union[str, None] = 'd5f8a3c91e02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GENERATED_COLUMNS = (('city', 255), ('region', 255), ('country_code', 10))
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'applications', 'address',
+        type_=postgresql.JSONB(), existing_type=sa.JSON(), existing_nullable=False,
+        postgresql_using='address::jsonb'
+    )
+    op.alter_column(
+        'user_profiles', 'address',
+        type_=postgresql.JSONB(), existing_type=sa.JSON(), existing_nullable=True,
+        postgresql_using='address::jsonb'
+    )
+    for name, length in GENERATED_COLUMNS:
+        op.add_column(
+            'applications',
+            sa.Column(name, sa.String(length), sa.Computed(f"CAST(address ->> '{name}' AS VARCHAR)", persisted=True), nullable=True)
+        )
+    op.create_index('idx_applications_city_created', 'applications', ['city', 'created_at'], unique=False)
+    op.create_index('idx_applications_region_created', 'applications', ['region', 'created_at'], unique=False)
+    op.create_index('idx_applications_country_code', 'applications', ['country_code'], unique=False)
+    op.create_index(
+        'idx_applications_address_gin', 'applications', ['address'], unique=False,
+        postgresql_using='gin', postgresql_ops={'address': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_applications_address_gin', table_name='applications')
+    op.drop_index('idx_applications_country_code', table_name='applications')
+    op.drop_index('idx_applications_region_created', table_name='applications')
+    op.drop_index('idx_applications_city_created', table_name='applications')
+    for name, _ in reversed(GENERATED_COLUMNS):
+        op.drop_column('applications', name)
+    op.alter_column(
+        'user_profiles', 'address',
+        type_=sa.JSON(), existing_type=postgresql.JSONB(), existing_nullable=True,
+        postgresql_using='address::json'
+    )
+    op.alter_column(
+        'applications', 'address',
+        type_=sa.JSON(), existing_type=postgresql.JSONB(), existing_nullable=False,
+        postgresql_using='address::json'
+    )
@@ -0,0 +1,60 @@
+"""add_application_search_vector
+
+Revision ID: f1a6d3b08c52
+Revises: e4b7c2a95d18
+Create Date: 2026-10-19 17:20:36.904115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6d3b08c52'
+down_revision: Union[str, None] = 'e4b7c2a95d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('applications', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("""
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'kazakh') THEN
+                CREATE TEXT SEARCH CONFIGURATION kazakh (COPY = simple);
+            END IF;
+        END $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION applications_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'A') ||
+                setweight(to_tsvector('kazakh', coalesce(NEW.description, '')), 'A') ||
+                setweight(to_tsvector('russian', coalesce(NEW.address ->> 'address', '')), 'B') ||
+                setweight(to_tsvector('kazakh', coalesce(NEW.address ->> 'address', '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER applications_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF description, address ON applications
+        FOR EACH ROW EXECUTE FUNCTION applications_search_vector_update()
+    """)
+    # Fire the trigger once for existing rows
+    op.execute("UPDATE applications SET description = description")
+    op.create_index(
+        'idx_applications_search_vector', 'applications', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_applications_search_vector', table_name='applications')
+    op.execute("DROP TRIGGER IF EXISTS applications_search_vector_trigger ON applications")
+    op.execute("DROP FUNCTION IF EXISTS applications_search_vector_update()")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS kazakh")
+    op.drop_column('applications', 'search_vector')
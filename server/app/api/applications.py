@@ -1,34 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import Row, select, insert, and_
 from typing import List, Optional
+from datetime import datetime
 import uuid
-from app.db.base import get_session
-from app.core.dependencies import get_current_account
+from app.db.base import get_primary_session, get_session
+from app.core.config import settings
+from app.core.dependencies import get_current_account, get_reviewer_account
+from app.core.etag import make_profile_etag, conditional_response, bump_profile_version
+from app.core.cache import response_cache
+from app.core.status_stream import status_broker
+from app.core.responses import ORJSONModelResponse
+from app.core.pagination import InvalidCursorError, decode_cursor, paginate, split_page
 from app.schemas.application import (
     ApplicationCreateSchema,
     ApplicationResponseSchema,
     ApplicationUpdateSchema,
     ApplicationStatusUpdateSchema,
-    ApplicationStatsSchema
+    ApplicationStatsSchema,
+    ApplicationBulkCreateSchema,
+    ApplicationBulkItemResultSchema,
+    ApplicationBulkResponseSchema,
+    ApplicationBulkStatusUpdateSchema,
+    ApplicationBulkStatusResponseSchema,
+    ApplicationSearchResultSchema,
+    ApplicationDuplicateSchema
 )
 from app.schemas.address import AddressSchema
-from app.models import Account, Application, UserProfile
+from app.models import Account, Application, ApplicationArchiveCount, ApplicationFingerprint, UserProfile
 from app.services.geocoding_service import geocoding_service
+from app.services.counter_service import ApplicationCounterService
+from app.services.archive_service import ArchiveService
+from app.services.export_service import EXPORT_FORMATS, ExportService
+from app.services.search_service import SearchService
+from app.services.review_service import ReviewService
+from app.services.status_event_service import StatusEventService
+from app.services.duplicate_service import DuplicateService
+from app.services.image_service import MAX_FILES_PER_REQUEST
+from app.api.images import receive_images
 
-router = APIRouter(prefix="/api/applications", tags=["Applications"])
+router = APIRouter(
+    prefix="/api/applications",
+    tags=["Applications"],
+    default_response_class=ORJSONModelResponse
+)
+
+
+def _application_response(application: Application) -> ApplicationResponseSchema:
+    """Build and validate the response model once; handlers return it pre-encoded"""
+    return ApplicationResponseSchema(
+        id=application.id,
+        user_profile_id=application.user_profile_id,
+        address=application.address,
+        description=application.description,
+        image_urls=application.image_urls,
+        status=application.status,
+        address_display=application.address_display,
+        image_count=application.image_count,
+        created_at=application.created_at,
+        updated_at=application.updated_at
+    )
+
+
+# Listing pages select the response fields as plain columns, in response field
+# order: rows come back as tuples, without building Application instances or
+# registering them in the session's identity map
+LISTING_COLUMNS = (
+    Application.id,
+    Application.user_profile_id,
+    Application.address,
+    Application.description,
+    Application.image_urls,
+    Application.status,
+    Application.address_display.label("address_display"),
+    Application.image_count.label("image_count"),
+    Application.created_at,
+    Application.updated_at,
+)
+LISTING_FIELDS = tuple(column.key for column in LISTING_COLUMNS)
+
+
+def _listing_item(row) -> dict:
+    """Response fields of a listing row, or of an archived Application"""
+    if isinstance(row, Row):
+        return dict(zip(LISTING_FIELDS, row))
+    return {field: getattr(row, field) for field in LISTING_FIELDS}
+
+
+# Keyset orderings; every sort key ends with the primary key to make it total
+ORDERINGS = {
+    "created_at": ((Application.created_at, Application.id), False),
+    "-created_at": ((Application.created_at, Application.id), True),
+    "status": ((Application.status, Application.created_at, Application.id), False),
+    "-status": ((Application.status, Application.created_at, Application.id), True),
+}
+
+DUPLICATE_ORDERING = (ApplicationFingerprint.created_at, ApplicationFingerprint.application_id)
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    query,
+    ordering: str,
+    cursor: Optional[str],
+    page_size: int,
+    archived: Optional[dict] = None
+):
+    """Fetch one keyset page of ``LISTING_COLUMNS`` rows and the cursor of the next one.
+
+    ``archived`` holds equality filters selecting the same rows from archived
+    partitions; when given, archived rows are merged into the page.
+    """
+    columns, descending = ORDERINGS[ordering]
+    statement, after = _page_query(query, ordering, cursor, page_size)
+    result = await db.execute(statement)
+    applications = result.all()
+    
+    # Archived rows are older than every live one, so a full newest-first page never needs them
+    page_is_full = descending and columns[0] is Application.created_at and len(applications) > page_size
+    if archived is not None and not page_is_full and await _has_archived(db, archived["user_profile_id"]):
+        archived_rows = await ArchiveService.fetch_page(archived, columns, descending, after, page_size + 1)
+        applications = sorted(
+            [*applications, *archived_rows],
+            key=lambda application: tuple(getattr(application, column.key) for column in columns),
+            reverse=descending
+        )[:page_size + 1]
+    
+    return split_page(applications, columns, ordering, page_size)
+
+
+def _page_query(query, ordering: str, cursor: Optional[str], page_size: int):
+    """The keyset page statement for ``query`` and the sort key the cursor points after"""
+    columns, descending = ORDERINGS[ordering]
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, ordering, columns)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    return paginate(query, columns, descending, after, page_size), after
+
+
+async def _has_archived(db: AsyncSession, profile_id: str) -> bool:
+    if not ArchiveService.has_archives():
+        return False
+    archived_count = await db.get(ApplicationArchiveCount, uuid.UUID(profile_id))
+    return bool(archived_count and archived_count.total)
+
+
+def _page_response(applications, next_cursor: Optional[str], headers=None) -> ORJSONModelResponse:
+    response = ORJSONModelResponse([_listing_item(row) for row in applications], headers=headers)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+
+def _filter_location(query, city: Optional[str], region: Optional[str]):
+    """Filter on the indexed columns generated from the address"""
+    if city:
+        query = query.where(Application.city == city)
+    if region:
+        query = query.where(Application.region == region)
+    return query
+
+
+def _own_listing(
+    profile_id: uuid.UUID,
+    status_filter: Optional[str] = None,
+    city: Optional[str] = None,
+    region: Optional[str] = None
+):
+    """``LISTING_COLUMNS`` of a profile's applications with the listing filters applied"""
+    query = select(*LISTING_COLUMNS).where(Application.user_profile_id == profile_id)
+    if status_filter:
+        query = query.where(Application.status == status_filter)
+    return _filter_location(query, city, region)
 
 
 @router.get("/", response_model=List[ApplicationResponseSchema])
 async def list_applications(
     status_filter: Optional[str] = Query(None, alias="status"),
+    city: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
     ordering: Optional[str] = Query("created_at"),
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     page_size: int = Query(20, ge=1, le=100),
     current_account: Account = Depends(get_current_account),
     db: AsyncSession = Depends(get_session)
 ):
-    """List all applications for current user with filtering and pagination"""
+    """List applications for current user with filtering and cursor pagination.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
     # Get user's profile
     profile_result = await db.execute(
         select(UserProfile).where(UserProfile.account_id == current_account.id)
@@ -41,101 +209,66 @@ async def list_applications(
             detail="User profile not found"
         )
     
-    query = select(Application).where(Application.user_profile_id == profile.id)
-    
-    # Apply status filter
-    if status_filter:
-        if status_filter not in ['pending', 'approved', 'rejected']:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid status filter"
-            )
-        query = query.where(Application.status == status_filter)
-    
-    # Apply ordering
-    if ordering == "created_at":
-        query = query.order_by(Application.created_at)
-    elif ordering == "-created_at":
-        query = query.order_by(Application.created_at.desc())
-    elif ordering == "status":
-        query = query.order_by(Application.status)
-    elif ordering == "-status":
-        query = query.order_by(Application.status.desc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    result = await db.execute(query)
-    applications = result.scalars().all()
-    
-    return [
-        ApplicationResponseSchema(
-            id=app.id,
-            user_profile_id=app.user_profile_id,
-            address=app.address,
-            description=app.description,
-            image_urls=app.image_urls,
-            status=app.status,
-            address_display=app.address_display,
-            image_count=app.image_count,
-            created_at=app.created_at,
-            updated_at=app.updated_at
-        )
-        for app in applications
-    ]
-
-
-@router.post("/", response_model=ApplicationResponseSchema, status_code=status.HTTP_201_CREATED)
-async def create_application(
-    application_data: ApplicationCreateSchema,
-    current_account: Account = Depends(get_current_account),
-    db: AsyncSession = Depends(get_session)
-):
-    """Create new application for current user"""
-    # Get user's profile
-    profile_result = await db.execute(
-        select(UserProfile).where(UserProfile.account_id == current_account.id)
-    )
-    profile = profile_result.scalar_one_or_none()
+    if status_filter and status_filter not in ['pending', 'approved', 'rejected']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid status filter"
+        )
+    query = _own_listing(profile.id, status_filter, city, region)
     
-    if not profile:
+    if ordering not in ORDERINGS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User profile not found. Please create a profile first."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid ordering"
         )
     
+    archived = ArchiveService.filters(user_profile_id=profile.id, status=status_filter, city=city, region=region)
+    applications, next_cursor = await _fetch_page(db, query, ordering, cursor, page_size, archived)
+    
+    return _page_response(applications, next_cursor)
+
+
+def _location_error(application_data: ApplicationCreateSchema) -> Optional[str]:
     # Validate that either address_query or coordinates are provided
     has_address_query = bool(application_data.address_query)
     has_coordinates = bool(application_data.latitude and application_data.longitude)
     
     if not (has_address_query or has_coordinates):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Must provide either address_query or both latitude and longitude"
-        )
-    
+        return "Must provide either address_query or both latitude and longitude"
+    return None
+
+
+def _address_key(application_data: ApplicationCreateSchema) -> tuple:
+    """Items with the same key resolve to the same address"""
+    if application_data.address_query:
+        return ("query", application_data.address_query.strip().lower())
+    return ("coordinates", application_data.latitude, application_data.longitude)
+
+
+async def _resolve_address(application_data: ApplicationCreateSchema) -> dict:
+    """Geocode the application location, falling back to the raw input"""
     # Geocode address
     address_data = None
-    if has_address_query:
+    if application_data.address_query:
         address_data = await geocoding_service.geocode_address_query(application_data.address_query)
-    elif has_coordinates:
+    elif application_data.latitude and application_data.longitude:
         address_data = await geocoding_service.reverse_geocode_to_address(
             application_data.latitude, application_data.longitude
         )
     
     if not address_data or not address_data.found:
         # Create basic address data with coordinates if available
-        address_data = {
+        return {
             "found": False,
             "address": application_data.address_query or "Координаты не найдены",
             "latitude": application_data.latitude,
             "longitude": application_data.longitude,
             "confidence": 0.0
         }
-    else:
-        address_data = address_data.model_dump()
-    
+    return address_data.model_dump()
+
+
+def _sync_profile_city(profile: UserProfile, address_data: dict) -> None:
     # Compare cities and update user profile if different
     if address_data.get("found") and address_data.get("city"):
         new_city = address_data["city"]
@@ -167,6 +300,36 @@ async def create_application(
                     "confidence": 0.0
                 }
                 profile.address = updated_address
+
+
+@router.post("/", response_model=ApplicationResponseSchema, status_code=status.HTTP_201_CREATED)
+async def create_application(
+    application_data: ApplicationCreateSchema,
+    current_account: Account = Depends(get_current_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Create new application for current user"""
+    # Get user's profile
+    profile_result = await db.execute(
+        select(UserProfile).where(UserProfile.account_id == current_account.id)
+    )
+    profile = profile_result.scalar_one_or_none()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found. Please create a profile first."
+        )
+    
+    location_error = _location_error(application_data)
+    if location_error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=location_error
+        )
+    
+    address_data = await _resolve_address(application_data)
+    _sync_profile_city(profile, address_data)
     
     # Create application
     application = Application(
@@ -179,26 +342,142 @@ async def create_application(
     )
     
     db.add(application)
+    await ApplicationCounterService.record_created(db, profile.id)
+    # The counter upsert flushed the application, so its id and created_at are set
+    await DuplicateService.check_and_record(db, [application])
+    await bump_profile_version(db, profile.id)
     await db.commit()
-    await db.refresh(application)
+    await response_cache.invalidate(profile.id)
     
-    return ApplicationResponseSchema(
-        id=application.id,
-        user_profile_id=application.user_profile_id,
-        address=application.address,
-        description=application.description,
-        image_urls=application.image_urls,
-        status=application.status,
-        address_display=application.address_display,
-        image_count=application.image_count,
-        created_at=application.created_at,
-        updated_at=application.updated_at
+    return ORJSONModelResponse(_application_response(application), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk/", response_model=ApplicationBulkResponseSchema)
+async def create_applications_bulk(
+    bulk_data: ApplicationBulkCreateSchema,
+    current_account: Account = Depends(get_current_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Create many applications at once, reporting a result per item"""
+    # Get user's profile
+    profile_result = await db.execute(
+        select(UserProfile).where(UserProfile.account_id == current_account.id)
+    )
+    profile = profile_result.scalar_one_or_none()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found. Please create a profile first."
+        )
+    
+    results = {}
+    valid = []
+    for index, item in enumerate(bulk_data.items):
+        try:
+            application_data = ApplicationCreateSchema.model_validate(item)
+        except ValidationError as exc:
+            results[index] = ApplicationBulkItemResultSchema(
+                index=index,
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                error="; ".join(error["msg"] for error in exc.errors())
+            )
+            continue
+        location_error = _location_error(application_data)
+        if location_error:
+            results[index] = ApplicationBulkItemResultSchema(
+                index=index, status_code=status.HTTP_400_BAD_REQUEST, error=location_error
+            )
+            continue
+        valid.append((index, application_data))
+    
+    # Each distinct location is geocoded once, in submission order
+    locations = {}
+    for _, application_data in valid:
+        locations.setdefault(_address_key(application_data), application_data)
+    if len(locations) > settings.bulk_geocode_limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_geocode_limit} distinct addresses per request"
+        )
+    profile_id = profile.id
+    # Release the connection while geocoding; each lookup can take a second
+    await db.rollback()
+    
+    addresses = {}
+    for key, application_data in locations.items():
+        addresses[key] = await _resolve_address(application_data)
+    
+    if valid:
+        profile = await db.get(UserProfile, profile_id, populate_existing=True)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User profile not found. Please create a profile first."
+            )
+        rows = []
+        for _, application_data in valid:
+            address_data = addresses[_address_key(application_data)]
+            _sync_profile_city(profile, address_data)
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_profile_id": profile.id,
+                "address": address_data,
+                "description": application_data.description,
+                "image_urls": list(application_data.image_urls),
+                "status": "pending",
+            })
+        
+        # One multi-row INSERT ... RETURNING for the whole batch
+        inserted = await db.scalars(insert(Application).values(rows).returning(Application))
+        created = {application.id: application for application in inserted}
+        for (index, _), row in zip(valid, rows):
+            results[index] = ApplicationBulkItemResultSchema(
+                index=index,
+                status_code=status.HTTP_201_CREATED,
+                application=_application_response(created[row["id"]])
+            )
+        
+        await ApplicationCounterService.record_created(db, profile.id, count=len(rows))
+        await DuplicateService.check_and_record(db, [created[row["id"]] for row in rows])
+        await bump_profile_version(db, profile.id)
+        await db.commit()
+        await response_cache.invalidate(profile.id)
+    
+    return ORJSONModelResponse(
+        ApplicationBulkResponseSchema(
+            created=len(valid),
+            failed=len(bulk_data.items) - len(valid),
+            results=[results[index] for index in range(len(bulk_data.items))]
+        )
+    )
+
+
+@router.put("/bulk/status/", response_model=ApplicationBulkStatusResponseSchema)
+async def update_application_status_bulk(
+    status_data: ApplicationBulkStatusUpdateSchema,
+    reviewer: Account = Depends(get_reviewer_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Set the status of many applications by ids or filter (reviewers only)"""
+    conditions = ExportService.filter_conditions(**status_data.filter.model_dump()) if status_data.filter else []
+    change = await ReviewService.bulk_update_status(db, status_data.status, ids=status_data.ids, conditions=conditions)
+    await db.commit()
+    await response_cache.invalidate_many(change.profile_ids)
+    status_broker.dispatch(change.events)
+    
+    return ORJSONModelResponse(
+        ApplicationBulkStatusResponseSchema(updated=len(change.ids), ids=change.ids, truncated=change.truncated)
     )
 
 
 @router.get("/status/{status_value}/", response_model=List[ApplicationResponseSchema])
 async def get_applications_by_status(
     status_value: str,
+    city: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    page_size: int = Query(20, ge=1, le=100),
     current_account: Account = Depends(get_current_account),
     db: AsyncSession = Depends(get_session)
 ):
@@ -221,35 +500,17 @@ async def get_applications_by_status(
             detail="User profile not found"
         )
 
-    result = await db.execute(
-        select(Application).where(
-            and_(
-                Application.status == status_value,
-                Application.user_profile_id == profile.id
-            )
-        )
-    )
-    applications = result.scalars().all()
-
-    return [
-        ApplicationResponseSchema(
-            id=app.id,
-            user_profile_id=app.user_profile_id,
-            address=app.address,
-            description=app.description,
-            image_urls=app.image_urls,
-            status=app.status,
-            address_display=app.address_display,
-            image_count=app.image_count,
-            created_at=app.created_at,
-            updated_at=app.updated_at
-        )
-        for app in applications
-    ]
+    query = _own_listing(profile.id, status_value, city, region)
+    archived = ArchiveService.filters(user_profile_id=profile.id, status=status_value, city=city, region=region)
+    applications, next_cursor = await _fetch_page(db, query, "-created_at", cursor, page_size, archived)
+
+    return _page_response(applications, next_cursor)
 
 
 @router.get("/stats/", response_model=ApplicationStatsSchema)
 async def get_application_stats(
+    request: Request,
+    response: Response,
     current_account: Account = Depends(get_current_account),
     db: AsyncSession = Depends(get_session)
 ):
@@ -266,42 +527,51 @@ async def get_application_stats(
             detail="User profile not found"
         )
     
-    # Get counts by status for user's applications
-    result = await db.execute(
-        select(
-            func.count(Application.id).label('total'),
-            func.sum(func.case((Application.status == 'pending', 1), else_=0)).label('pending'),
-            func.sum(func.case((Application.status == 'approved', 1), else_=0)).label('approved'),
-            func.sum(func.case((Application.status == 'rejected', 1), else_=0)).label('rejected')
-        ).where(Application.user_profile_id == profile.id)
-    )
-    
-    stats = result.first()
+    not_modified = conditional_response(request, response, make_profile_etag(profile, "applications:stats"))
+    if not_modified:
+        return not_modified
+    cached = await response_cache.get(profile, "applications:stats")
+    if cached:
+        return cached
     
-    total = stats.total or 0
-    pending = stats.pending or 0
-    approved = stats.approved or 0
-    rejected = stats.rejected or 0
+    counts = await ApplicationCounterService.get_counts(db, profile.id)
+    total = counts["total"]
+    pending = counts["pending"]
+    approved = counts["approved"]
+    rejected = counts["rejected"]
     
     # Calculate approval rate
     processed = approved + rejected
     approval_rate = (approved / processed * 100) if processed > 0 else 0.0
     
-    return ApplicationStatsSchema(
+    stats = ApplicationStatsSchema(
         total=total,
         pending=pending,
         approved=approved,
         rejected=rejected,
         approval_rate=round(approval_rate, 2)
     )
+    return await response_cache.store(
+        profile, "applications:stats", ORJSONModelResponse(stats, headers=response.headers)
+    )
 
 
 @router.get("/me/", response_model=List[ApplicationResponseSchema])
 async def get_my_applications(
+    request: Request,
+    response: Response,
+    city: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    page_size: Optional[int] = Query(None, ge=1, le=100),
     current_account: Account = Depends(get_current_account),
     db: AsyncSession = Depends(get_session)
 ):
-    """Get all applications for current user"""
+    """Get current user's applications, newest first, one cursor page at a time.
+
+    Without ``cursor`` and ``page_size`` every application is returned, as
+    before pagination, since released app versions do not follow the cursor.
+    """
     # Get user's profile
     profile_result = await db.execute(
         select(UserProfile).where(UserProfile.account_id == current_account.id)
@@ -314,27 +584,174 @@ async def get_my_applications(
             detail="User profile not found"
         )
     
-    query = select(Application).where(Application.user_profile_id == profile.id)
-    query = query.order_by(Application.created_at.desc())
+    view = f"applications:me:{city}:{region}:{cursor}:{page_size}"
+    not_modified = conditional_response(request, response, make_profile_etag(profile, view))
+    if not_modified:
+        return not_modified
+    cached = await response_cache.get(profile, view)
+    if cached:
+        return cached
+    
+    query = _own_listing(profile.id, city=city, region=region)
+    archived = ArchiveService.filters(user_profile_id=profile.id, city=city, region=region)
+    if cursor is None and page_size is None:
+        applications, next_cursor = [], None
+        while True:
+            page, next_cursor = await _fetch_page(db, query, "-created_at", next_cursor, 100, archived)
+            applications.extend(page)
+            if not next_cursor:
+                break
+    else:
+        applications, next_cursor = await _fetch_page(db, query, "-created_at", cursor, page_size or 20, archived)
+    
+    page = _page_response(applications, next_cursor, headers=response.headers)
+    return await response_cache.store(profile, view, page)
+
+
+@router.get("/search/", response_model=List[ApplicationSearchResultSchema])
+async def search_applications(
+    q: str = Query(..., min_length=1, max_length=200),
+    page_size: int = Query(20, ge=1, le=100),
+    current_account: Account = Depends(get_current_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Full-text search over current user's applications, best matches first"""
+    # Get user's profile
+    profile_result = await db.execute(
+        select(UserProfile).where(UserProfile.account_id == current_account.id)
+    )
+    profile = profile_result.scalar_one_or_none()
     
-    result = await db.execute(query)
-    applications = result.scalars().all()
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found"
+        )
+    
+    matches = await SearchService.search(db, q, profile_id=profile.id, limit=page_size)
+    
+    return ORJSONModelResponse([
+        ApplicationSearchResultSchema(
+            **_application_response(application).model_dump(),
+            rank=rank,
+            highlight=highlight
+        )
+        for application, rank, highlight in matches
+    ])
+
+
+@router.get("/events/", response_class=StreamingResponse)
+async def stream_status_events(
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID", ge=0),
+    current_account: Account = Depends(get_current_account),
+    # The session get_current_account read from, which may be the replica
+    auth_db: AsyncSession = Depends(get_session),
+    # Catch-up reads on a lagging replica would skip events for good
+    db: AsyncSession = Depends(get_primary_session)
+):
+    """Stream status changes of own applications as server-sent events"""
+    # Get user's profile
+    profile_result = await db.execute(
+        select(UserProfile).where(UserProfile.account_id == current_account.id)
+    )
+    profile = profile_result.scalar_one_or_none()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found"
+        )
+    profile_id = profile.id
+    # Release the connections; the stream only touches the database to catch up
+    await auth_db.rollback()
+    await db.rollback()
+    
+    # EventSource resends the last id it saw in the header when reconnecting
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    return StreamingResponse(
+        StatusEventService.stream(db, profile_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/export/", response_class=StreamingResponse)
+async def export_applications(
+    export_format: str = Query("ndjson", alias="format"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    city: Optional[str] = Query(None),
+    region: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    reviewer: Account = Depends(get_reviewer_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Stream all applications as NDJSON or CSV (reviewers only)"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid export format"
+        )
+    if status_filter and status_filter not in ['pending', 'approved', 'rejected']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid status filter"
+        )
+    
+    query = ExportService.build_query(status_filter, city, region, created_from, created_to)
+    archived = None
+    if ArchiveService.has_archives():
+        archived = ArchiveService.iter_chunks(
+            ArchiveService.filters(status=status_filter, city=city, region=region), created_from, created_to
+        )
+    return StreamingResponse(
+        ExportService.stream(db, query, export_format, archived=archived),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="applications.{export_format}"'}
+    )
+
+
+@router.get("/duplicates/", response_model=List[ApplicationDuplicateSchema])
+async def list_duplicate_applications(
+    cursor: Optional[str] = Query(None),
+    page_size: int = Query(20, ge=1, le=100),
+    reviewer: Account = Depends(get_reviewer_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Applications flagged as near-duplicates of a recent one nearby, newest first (reviewers only)"""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, "duplicates", DUPLICATE_ORDERING)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
     
-    return [
-        ApplicationResponseSchema(
-            id=app.id,
-            user_profile_id=app.user_profile_id,
-            address=app.address,
-            description=app.description,
-            image_urls=app.image_urls,
-            status=app.status,
-            address_display=app.address_display,
-            image_count=app.image_count,
-            created_at=app.created_at,
-            updated_at=app.updated_at
+    fingerprints, next_cursor = split_page(
+        await DuplicateService.flagged_page(db, after, page_size), DUPLICATE_ORDERING, "duplicates", page_size
+    )
+    applications = await DuplicateService.load_applications(db, fingerprints)
+    page = [
+        ApplicationDuplicateSchema(
+            application=_application_response(applications[fingerprint.application_id]),
+            duplicate_of=(
+                _application_response(applications[fingerprint.duplicate_of_id])
+                if fingerprint.duplicate_of_id in applications else None
+            ),
+            similarity=fingerprint.similarity,
+            flagged_at=fingerprint.created_at
         )
-        for app in applications
+        for fingerprint in fingerprints
+        # Skips applications deleted since the page was read
+        if fingerprint.application_id in applications
     ]
+    response = ORJSONModelResponse(page)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 @router.get("/{application_id}/", response_model=ApplicationResponseSchema)
@@ -366,24 +783,17 @@ async def get_application(
     )
     application = result.scalar_one_or_none()
     
+    if not application and await _has_archived(db, str(profile.id)):
+        # Older than the retention window: look it up in the archive indexes
+        application = await ArchiveService.find(application_id, profile.id)
+    
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
     
-    return ApplicationResponseSchema(
-        id=application.id,
-        user_profile_id=application.user_profile_id,
-        address=application.address,
-        description=application.description,
-        image_urls=application.image_urls,
-        status=application.status,
-        address_display=application.address_display,
-        image_count=application.image_count,
-        created_at=application.created_at,
-        updated_at=application.updated_at
-    )
+    return ORJSONModelResponse(_application_response(application))
 
 
 @router.put("/{application_id}/", response_model=ApplicationResponseSchema)
@@ -446,21 +856,11 @@ async def update_application(
         else:
             setattr(application, field, value)
     
+    await bump_profile_version(db, profile.id)
     await db.commit()
-    await db.refresh(application)
+    await response_cache.invalidate(profile.id)
     
-    return ApplicationResponseSchema(
-        id=application.id,
-        user_profile_id=application.user_profile_id,
-        address=application.address,
-        description=application.description,
-        image_urls=application.image_urls,
-        status=application.status,
-        address_display=application.address_display,
-        image_count=application.image_count,
-        created_at=application.created_at,
-        updated_at=application.updated_at
-    )
+    return ORJSONModelResponse(_application_response(application))
 
 
 @router.patch("/{application_id}/", response_model=ApplicationResponseSchema)
@@ -510,7 +910,72 @@ async def delete_application(
         )
     
     await db.delete(application)
+    await ApplicationCounterService.record_deleted(db, profile.id, application.status)
+    await DuplicateService.forget(db, [application])
+    await bump_profile_version(db, profile.id)
     await db.commit()
+    await response_cache.invalidate(profile.id)
+
+
+@router.post("/{application_id}/images/", response_model=ApplicationResponseSchema)
+async def upload_application_images(
+    application_id: uuid.UUID,
+    request: Request,
+    current_account: Account = Depends(get_current_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Upload images (raw body or multipart/form-data) and add them to the application"""
+    # Get user's profile
+    profile_result = await db.execute(
+        select(UserProfile).where(UserProfile.account_id == current_account.id)
+    )
+    profile = profile_result.scalar_one_or_none()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User profile not found"
+        )
+    profile_id = profile.id
+    
+    owned = and_(Application.id == application_id, Application.user_profile_id == profile_id)
+    image_urls = await db.scalar(select(Application.image_urls).where(owned))
+    if image_urls is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+    free_slots = MAX_FILES_PER_REQUEST - len(image_urls)
+    if free_slots <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 10 image URLs allowed"
+        )
+    # Release the connection while the body streams in; uploads can be slow
+    await db.rollback()
+    
+    images = await receive_images(request, max_files=free_slots)
+    
+    # Re-read under a row lock: another upload may have added images meanwhile
+    application = (await db.execute(select(Application).where(owned).with_for_update())).scalar_one_or_none()
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+    # The same photo uploaded twice is stored once and linked once
+    new_urls = [url for url in dict.fromkeys(image.url for image in images) if url not in application.image_urls]
+    if len(application.image_urls) + len(new_urls) > MAX_FILES_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Maximum 10 image URLs allowed"
+        )
+    application.image_urls = [*application.image_urls, *new_urls]
+    await bump_profile_version(db, profile_id)
+    await db.commit()
+    await response_cache.invalidate(profile_id)
+    
+    return ORJSONModelResponse(_application_response(application))
 
 
 @router.put("/{application_id}/status/", response_model=ApplicationResponseSchema)
@@ -549,19 +1014,16 @@ async def update_application_status(
             detail="Application not found"
         )
     
+    previous_status = application.status
+    # Set first: a missing counter row is rebuilt from the applications, which must include this change
     application.status = status_data.status
+    await ApplicationCounterService.record_status_change(db, profile.id, previous_status, status_data.status)
+    await bump_profile_version(db, profile.id)
+    events = []
+    if previous_status != status_data.status:
+        events = await StatusEventService.record(db, [(profile.id, application.id, previous_status, status_data.status)])
     await db.commit()
-    await db.refresh(application)
+    await response_cache.invalidate(profile.id)
+    status_broker.dispatch(events)
     
-    return ApplicationResponseSchema(
-        id=application.id,
-        user_profile_id=application.user_profile_id,
-        address=application.address,
-        description=application.description,
-        image_urls=application.image_urls,
-        status=application.status,
-        address_display=application.address_display,
-        image_count=application.image_count,
-        created_at=application.created_at,
-        updated_at=application.updated_at
-    )
+    return ORJSONModelResponse(_application_response(application))
@@ -0,0 +1,160 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import os
+from app.db.base import get_session
+from app.core.config import settings
+from app.core.dependencies import get_current_account
+from app.core.etag import etag_matches
+from app.core.responses import FileRangeResponse, ORJSONModelResponse
+from app.models import Account
+from app.schemas.image import ImageUploadResultSchema, ImageUploadResponseSchema
+from app.services.image_service import (
+    CONTENT_TYPES, IMAGE_KEY, MAX_FILES_PER_REQUEST, ImageService, ImageUploadError, LocalImageStore,
+    StoredImage, image_store
+)
+from app.services.thumbnail_service import VARIANTS, thumbnail_generator
+
+router = APIRouter(
+    prefix="/api/images",
+    tags=["Images"],
+    default_response_class=ORJSONModelResponse
+)
+
+
+async def receive_images(request: Request, max_files: int = MAX_FILES_PER_REQUEST) -> List[StoredImage]:
+    """Store the images in the request body while it streams in"""
+    try:
+        images = await ImageService.receive(
+            image_store, request.headers.get("content-type", ""), request.stream(), max_files
+        )
+    except ImageUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    # Listing screens ask for thumbnails right away, so have them ready
+    for image in images:
+        if image.created:
+            thumbnail_generator.warm(image_store, image.key)
+    return images
+
+
+def upload_results(images: List[StoredImage]) -> List[ImageUploadResultSchema]:
+    return [
+        ImageUploadResultSchema(
+            key=image.key,
+            url=image.url,
+            content_type=image.content_type,
+            size=image.size,
+            created=image.created
+        )
+        for image in images
+    ]
+
+
+@router.post("/", response_model=ImageUploadResponseSchema, status_code=status.HTTP_201_CREATED)
+async def upload_images(
+    request: Request,
+    current_account: Account = Depends(get_current_account),
+    db: AsyncSession = Depends(get_session)
+):
+    """Upload images (raw body or multipart/form-data) to use in image_urls"""
+    # Release the connection before the body arrives; uploads can be slow
+    await db.rollback()
+    images = await receive_images(request)
+    return ORJSONModelResponse(
+        ImageUploadResponseSchema(images=upload_results(images)),
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+# Keys are content hashes, so a URL's bytes never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+async def _file_response(
+    request: Request,
+    path: str,
+    etag: str,
+    media_type: str,
+    accel_redirect: Optional[str]
+):
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    try:
+        size = (await run_in_threadpool(os.stat, path)).st_size
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    if not settings.image_accel_redirect_prefix:
+        accel_redirect = None
+    return FileRangeResponse(path, size, media_type, headers=headers, accel_redirect=accel_redirect)
+
+
+def _check_key(key: str) -> None:
+    if not IMAGE_KEY.match(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+
+@router.get("/{key}", response_class=Response)
+@router.head("/{key}", response_class=Response, include_in_schema=False)
+async def get_image(key: str, request: Request):
+    """Serve a stored image by its key (byte ranges supported)"""
+    _check_key(key)
+    
+    if not isinstance(image_store, LocalImageStore):
+        return RedirectResponse(image_store.presigned_url(key))
+    
+    return await _file_response(
+        request,
+        image_store.path(key),
+        f'"{key}"',
+        CONTENT_TYPES[key.rsplit(".", 1)[1]],
+        f"{settings.image_accel_redirect_prefix}/images/{key[:2]}/{key}"
+    )
+
+
+@router.get("/{variant}/{key}", response_class=Response)
+@router.head("/{variant}/{key}", response_class=Response, include_in_schema=False)
+async def get_image_variant(variant: str, key: str, request: Request):
+    """Serve a downscaled variant (thumb or medium) of a stored image"""
+    _check_key(key)
+    if variant not in VARIANTS or not thumbnail_generator.supports(key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image variant not found"
+        )
+    
+    etag = f'"{key}.{variant}"'
+    # A cached variant is answered from its ETag without touching the file
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": IMMUTABLE})
+    
+    try:
+        path = await thumbnail_generator.get(image_store, key, variant)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Image cannot be resized"
+        )
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    
+    name = os.path.basename(path)
+    return await _file_response(
+        request,
+        path,
+        etag,
+        CONTENT_TYPES[key.rsplit(".", 1)[1]],
+        f"{settings.image_accel_redirect_prefix}/thumbnails/{key[:2]}/{name}"
+    )
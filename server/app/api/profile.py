@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, delete
 from app.db.base import get_session
 from app.core.dependencies import get_current_account
+from app.core.etag import make_profile_etag, conditional_response, bump_profile_version
+from app.core.cache import response_cache
+from app.core.responses import ORJSONModelResponse
 from app.schemas.user_profile import (
     UserProfileCreateSchema,
     UserProfileResponseSchema,
     UserProfileUpdateSchema
 )
-from app.models import Account, UserProfile, Application
+from app.models import Account, UserProfile, Application, ApplicationCounter
 from app.services.geocoding_service import geocoding_service
+from app.services.counter_service import ApplicationCounterService
 
 router = APIRouter(prefix="/api/accounts/profile", tags=["User Profile"])
 
@@ -49,6 +53,8 @@ async def create_profile(
     )
     
     db.add(profile)
+    await db.flush()
+    ApplicationCounterService.create_for_profile(db, profile.id)
     await db.commit()
     await db.refresh(profile)
     
@@ -71,6 +77,8 @@ async def create_profile(
 
 @router.get("/me/", response_model=UserProfileResponseSchema)
 async def get_my_profile(
+    request: Request,
+    response: Response,
     current_account: Account = Depends(get_current_account),
     db: AsyncSession = Depends(get_session)
 ):
@@ -86,13 +94,17 @@ async def get_my_profile(
             detail="Profile not found for this account"
         )
     
-    # Count applications for this user
-    applications_count_result = await db.execute(
-        select(func.count(Application.id)).where(Application.user_profile_id == profile.id)
-    )
-    applications_count = applications_count_result.scalar()
+    not_modified = conditional_response(request, response, make_profile_etag(profile, "profile:me"))
+    if not_modified:
+        return not_modified
+    cached = await response_cache.get(profile, "profile:me")
+    if cached:
+        return cached
     
-    return UserProfileResponseSchema(
+    counts = await ApplicationCounterService.get_counts(db, profile.id)
+    applications_count = counts["total"]
+    
+    profile_response = UserProfileResponseSchema(
         id=profile.id,
         phone_number=current_account.phone_number,
         name=profile.name,
@@ -105,6 +117,9 @@ async def get_my_profile(
         created_at=profile.created_at,
         updated_at=profile.updated_at
     )
+    return await response_cache.store(
+        profile, "profile:me", ORJSONModelResponse(profile_response, headers=response.headers)
+    )
 
 
 @router.put("/me/", response_model=UserProfileResponseSchema)
@@ -139,14 +154,13 @@ async def update_my_profile(
     for field, value in update_data.items():
         setattr(profile, field, value)
     
+    await bump_profile_version(db, profile.id)
     await db.commit()
+    await response_cache.invalidate(profile.id)
     await db.refresh(profile)
     
-    # Count applications for this user
-    applications_count_result = await db.execute(
-        select(func.count(Application.id)).where(Application.user_profile_id == profile.id)
-    )
-    applications_count = applications_count_result.scalar()
+    counts = await ApplicationCounterService.get_counts(db, profile.id)
+    applications_count = counts["total"]
     
     # Don't load relationships to avoid serialization issues
     return UserProfileResponseSchema(
@@ -191,5 +205,9 @@ async def delete_my_profile(
             detail="Profile not found for this account"
         )
     
+    # Remove applications set-based instead of materializing them for the ORM cascade
+    await db.execute(delete(Application).where(Application.user_profile_id == profile.id))
+    await db.execute(delete(ApplicationCounter).where(ApplicationCounter.user_profile_id == profile.id))
     await db.delete(profile)
     await db.commit()
+    await response_cache.invalidate(profile.id)
@@ -0,0 +1,116 @@
+"""Operational commands.
+
+Usage:
+    python -m app.cli reconcile-counters
+    python -m app.cli export-applications --format csv --status approved --city Алматы -o approved.csv
+    python -m app.cli ensure-partitions --months-ahead 3
+    python -m app.cli archive-partitions --retention-months 24 --format parquet
+    python -m app.cli index-archives
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date, datetime
+
+from app.core.config import settings
+from app.db.base import async_session_maker
+from app.services.archive_service import ARCHIVE_FORMATS, ArchiveService
+from app.services.counter_service import ApplicationCounterService
+from app.services.export_service import EXPORT_FORMATS, ExportService
+from app.services.partition_service import PartitionService
+
+
+async def reconcile_counters(batch_size: int) -> None:
+    async with async_session_maker() as session:
+        repaired = await ApplicationCounterService.reconcile(session, batch_size=batch_size)
+    print(f"Repaired {repaired} application counter rows")
+
+
+async def export_applications(args: argparse.Namespace) -> None:
+    query = ExportService.build_query(args.status, args.city, args.region, args.created_from, args.created_to)
+    archived = None
+    if ArchiveService.has_archives():
+        filters = ArchiveService.filters(status=args.status, city=args.city, region=args.region)
+        archived = ArchiveService.iter_chunks(filters, args.created_from, args.created_to, args.chunk_size)
+    output = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        async with async_session_maker() as session:
+            async for chunk in ExportService.stream(session, query, args.format, args.chunk_size, archived):
+                output.write(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+async def ensure_partitions(start: date, months_ahead: int) -> None:
+    async with async_session_maker() as session:
+        created = await PartitionService.ensure_partitions(session, start, months_ahead)
+        await session.commit()
+    print(f"Created {len(created)} application partitions: {', '.join(created) or '-'}")
+
+
+async def archive_partitions(args: argparse.Namespace) -> None:
+    if not args.archive_dir:
+        sys.exit("Set APPLICATION_ARCHIVE_DIR or pass --archive-dir")
+    async with async_session_maker() as session:
+        archived = await PartitionService.archive_expired(
+            session, args.archive_dir, args.retention_months, args.format, args.chunk_size
+        )
+    for entry in archived:
+        print(f"Archived {entry['rows']} applications to {entry['file']}")
+    print(f"Archived {len(archived)} partitions")
+
+
+def index_archives(args: argparse.Namespace) -> None:
+    if not args.archive_dir:
+        sys.exit("Set APPLICATION_ARCHIVE_DIR or pass --archive-dir")
+    indexed = ArchiveService.index_archives(args.archive_dir, args.chunk_size)
+    print(f"Indexed {len(indexed)} archives: {', '.join(indexed) or '-'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    reconcile = subparsers.add_parser("reconcile-counters", help="Recompute per-profile application counters")
+    reconcile.add_argument("--batch-size", type=int, default=1000)
+    
+    export = subparsers.add_parser("export-applications", help="Stream applications to NDJSON or CSV")
+    export.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    export.add_argument("--status", choices=["pending", "approved", "rejected"])
+    export.add_argument("--city")
+    export.add_argument("--region")
+    export.add_argument("--from", dest="created_from", type=datetime.fromisoformat)
+    export.add_argument("--to", dest="created_to", type=datetime.fromisoformat)
+    export.add_argument("--chunk-size", type=int, default=1000)
+    export.add_argument("-o", "--output", default="-", help="file path, or - for stdout")
+    
+    partitions = subparsers.add_parser("ensure-partitions", help="Create upcoming monthly application partitions")
+    partitions.add_argument("--from", dest="start", type=date.fromisoformat, help="first month to cover")
+    partitions.add_argument("--months-ahead", type=int, default=3)
+    
+    archive = subparsers.add_parser("archive-partitions", help="Move expired application partitions to archive files")
+    archive.add_argument("--archive-dir", default=settings.application_archive_dir)
+    archive.add_argument("--retention-months", type=int, default=settings.application_retention_months)
+    archive.add_argument("--format", choices=sorted(ARCHIVE_FORMATS), default=settings.application_archive_format)
+    archive.add_argument("--chunk-size", type=int, default=1000)
+    
+    index = subparsers.add_parser("index-archives", help="Rewrite archives written without an index")
+    index.add_argument("--archive-dir", default=settings.application_archive_dir)
+    index.add_argument("--chunk-size", type=int, default=1000)
+    
+    args = parser.parse_args()
+    if args.command == "reconcile-counters":
+        asyncio.run(reconcile_counters(args.batch_size))
+    elif args.command == "export-applications":
+        asyncio.run(export_applications(args))
+    elif args.command == "ensure-partitions":
+        asyncio.run(ensure_partitions(args.start, args.months_ahead))
+    elif args.command == "archive-partitions":
+        asyncio.run(archive_partitions(args))
+    elif args.command == "index-archives":
+        index_archives(args)
+
+
+if __name__ == "__main__":
+    main()
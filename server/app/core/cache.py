@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+import orjson
+from fastapi import Response
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models import UserProfile
+
+cache_lookups = metrics.counter("response_cache_lookups_total", "Response cache lookups by result")
+
+
+class CacheBackend:
+    """Storage for cached responses, grouped by profile so one write drops them all"""
+
+    async def get(self, profile_id: str, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, profile_id: str, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    async def invalidate(self, profile_id: str) -> None:
+        raise NotImplementedError
+
+    async def invalidate_many(self, profile_ids: Iterable[str]) -> None:
+        for profile_id in profile_ids:
+            await self.invalidate(profile_id)
+
+
+class NullCacheBackend(CacheBackend):
+    async def get(self, profile_id: str, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, profile_id: str, key: str, value: bytes) -> None:
+        pass
+
+    async def invalidate(self, profile_id: str) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-worker LRU bounded by entry count and total payload size"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._keys: Dict[str, Set[str]] = {}
+
+    async def get(self, profile_id: str, key: str) -> Optional[bytes]:
+        value = self._entries.get((profile_id, key))
+        if value is not None:
+            self._entries.move_to_end((profile_id, key))
+        return value
+
+    async def set(self, profile_id: str, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._remove(profile_id, key)
+        self._entries[(profile_id, key)] = value
+        self._keys.setdefault(profile_id, set()).add(key)
+        self.size += len(value)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            oldest_profile, oldest_key = next(iter(self._entries))
+            self._remove(oldest_profile, oldest_key)
+
+    async def invalidate(self, profile_id: str) -> None:
+        for key in list(self._keys.get(profile_id, ())):
+            self._remove(profile_id, key)
+
+    def _remove(self, profile_id: str, key: str) -> None:
+        value = self._entries.pop((profile_id, key), None)
+        if value is None:
+            return
+        self.size -= len(value)
+        keys = self._keys[profile_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys[profile_id]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared between workers: one hash per profile, deleted as a whole on write.
+
+    Memory is bounded by the TTL and by the server's ``maxmemory`` with an
+    ``allkeys-lru`` eviction policy.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        try:
+            import redis.asyncio
+        except ImportError:  # pragma: no cover - optional dependency
+            raise ValueError("The redis response cache backend requires the redis package")
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _name(profile_id: str) -> str:
+        return f"response_cache:{profile_id}"
+
+    async def get(self, profile_id: str, key: str) -> Optional[bytes]:
+        return await self.client.hget(self._name(profile_id), key)
+
+    async def set(self, profile_id: str, key: str, value: bytes) -> None:
+        async with self.client.pipeline(transaction=False) as pipeline:
+            pipeline.hset(self._name(profile_id), key, value)
+            pipeline.expire(self._name(profile_id), self.ttl_seconds)
+            await pipeline.execute()
+
+    async def invalidate(self, profile_id: str) -> None:
+        await self.client.delete(self._name(profile_id))
+
+    async def invalidate_many(self, profile_ids: Iterable[str]) -> None:
+        names = [self._name(profile_id) for profile_id in profile_ids]
+        for start in range(0, len(names), 1000):
+            await self.client.delete(*names[start:start + 1000])
+
+
+class ResponseCache:
+    """Rendered responses of profile-scoped views.
+
+    Keys include the profile's ``data_version``, which every write bumps in
+    its own transaction, so an entry can only be served for the exact data
+    it was rendered from; a reader racing a write stores its result under
+    the old version, which no later request asks for. Handlers still
+    invalidate the profile after each commit to free the space at once.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(profile: UserProfile, view: str) -> str:
+        return f"{profile.data_version}:{view}"
+
+    async def get(self, profile: UserProfile, view: str) -> Optional[Response]:
+        entry = await self.backend.get(str(profile.id), self._key(profile, view))
+        cache_lookups.inc(result="hit" if entry is not None else "miss")
+        if entry is None:
+            return None
+        headers, body = entry.split(b"\n", 1)
+        return Response(content=body, headers=orjson.loads(headers))
+
+    async def store(self, profile: UserProfile, view: str, response: Response) -> Response:
+        """Cache a fully rendered response and hand it back"""
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        entry = orjson.dumps(headers) + b"\n" + response.body
+        await self.backend.set(str(profile.id), self._key(profile, view), entry)
+        return response
+
+    async def invalidate(self, profile_id) -> None:
+        await self.backend.invalidate(str(profile_id))
+
+    async def invalidate_many(self, profile_ids: Iterable) -> None:
+        await self.backend.invalidate_many([str(profile_id) for profile_id in profile_ids])
+
+
+def create_backend() -> CacheBackend:
+    if settings.response_cache_backend == "memory":
+        return MemoryCacheBackend(settings.response_cache_max_entries, settings.response_cache_max_bytes)
+    if settings.response_cache_backend == "redis":
+        if not settings.response_cache_url:
+            raise ValueError("RESPONSE_CACHE_URL is required for the redis response cache backend")
+        return RedisCacheBackend(settings.response_cache_url, settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown response cache backend: {settings.response_cache_backend}")
+
+
+response_cache = ResponseCache(create_backend())
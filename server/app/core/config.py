@@ -1,11 +1,15 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 
 class Settings(BaseSettings):
     # Database
     database_url: str
+    # Optional read replica for safe (GET/HEAD) requests
+    database_replica_url: Optional[str] = None
+    # Requests this soon after the client's own write stay on the primary
+    replica_read_your_writes_seconds: float = 5.0
     
     # JWT Settings
     secret_key: str
@@ -19,6 +23,80 @@ class Settings(BaseSettings):
     twilio_from_number: str
     twilio_mock_mode: bool
     
+    # Monthly application partitions older than the retention window are
+    # exported here and dropped from the database; reads fall back to the files
+    application_archive_dir: Optional[str] = None
+    application_retention_months: int = 24
+    application_archive_format: str = "ndjson"
+    
+    # Background maintenance jobs, in seconds between runs
+    scheduler_enabled: bool = True
+    otp_purge_interval_seconds: float = 300
+    counter_reconcile_interval_seconds: float = 3600
+    partition_maintenance_interval_seconds: float = 86400
+    cache_eviction_interval_seconds: float = 60
+    status_event_purge_interval_seconds: float = 3600
+    duplicate_purge_interval_seconds: float = 3600
+    
+    # Per-profile response cache: "memory" (per worker), "redis" (shared) or "none"
+    response_cache_backend: str = "memory"
+    response_cache_url: Optional[str] = None
+    response_cache_max_entries: int = 10000
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_ttl_seconds: int = 600
+    
+    # Application status stream (server-sent events)
+    status_stream_heartbeat_seconds: float = 15
+    # Events buffered per connection before it falls back to replaying from the database
+    status_stream_queue_size: int = 100
+    # Resuming further back than this many events tells the client to reload instead
+    status_stream_replay_limit: int = 500
+    status_event_retention_hours: int = 72
+    
+    # Uploaded images, stored under the hash of their bytes: "local" or "s3"
+    image_storage_backend: str = "local"
+    image_storage_dir: str = "media/images"
+    # Any S3-compatible store; credentials come from the usual AWS_* variables
+    image_s3_bucket: Optional[str] = None
+    image_s3_endpoint_url: Optional[str] = None
+    # Prefix for stored image URLs, e.g. a CDN; defaults to this API's /api/images
+    image_public_base_url: Optional[str] = None
+    image_max_bytes: int = 15 * 1024 * 1024
+    # Downscaled variants, rendered in a process pool (one worker per CPU by default)
+    thumbnail_cache_dir: str = "media/thumbnails"
+    thumbnail_workers: Optional[int] = None
+    # Behind nginx: hand local files off with X-Accel-Redirect under this internal location
+    image_accel_redirect_prefix: Optional[str] = None
+    
+    # Near-duplicate detection on create: a similar description filed in the
+    # same or a neighbouring geohash cell (precision 7 is about 150 m) within the window
+    duplicate_geohash_precision: int = 7
+    duplicate_window_hours: int = 72
+    duplicate_similarity_threshold: float = 0.6
+    
+    # GET /metrics answers clients in these networks, and anyone sending
+    # "Authorization: Bearer <metrics_token>" if a token is set. Behind a
+    # proxy the client is the proxy unless the server trusts forwarded headers
+    metrics_allowed_networks: List[str] = ["127.0.0.1/32", "::1/128"]
+    metrics_token: Optional[str] = None
+    
+    # Phone numbers of accounts allowed to review and export all applications
+    reviewer_phone_numbers: List[str] = []
+    
+    # Production server (python -m app.server); workers default to one per available CPU
+    server_bind: str = "0.0.0.0:8000"
+    server_workers: Optional[int] = None
+    # A worker is replaced after this many requests plus up to the jitter,
+    # so workers do not all restart at once
+    server_max_requests: int = 10000
+    server_max_requests_jitter: int = 1000
+    # Pending connections queue; the kernel caps it at net.core.somaxconn
+    server_backlog: int = 2048
+    # Longer than a load balancer's idle timeout (often 60 s), so the balancer
+    # never reuses a connection the server has just closed
+    server_keepalive_seconds: int = 75
+    server_graceful_timeout_seconds: int = 30
+
     # API Settings
     cors_allowed_origins: List[str]
     debug: bool
@@ -27,6 +105,9 @@ class Settings(BaseSettings):
     # Nominatim API
     nominatim_base_url: str
     nominatim_user_agent: str
+    # Nominatim takes one request per second, so every distinct location in a
+    # bulk create adds up to a second to the request
+    bulk_geocode_limit: int = 10
     
     class Config:
         env_file = ".env"
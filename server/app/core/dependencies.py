@@ -1,6 +1,9 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+import ipaddress
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.db.base import get_session
 from app.services.auth_service import AuthService
 from app.models import Account
@@ -31,3 +34,38 @@ async def get_current_account(
         )
     
     return account
+
+
+async def get_reviewer_account(
+    current_account: Account = Depends(get_current_account)
+) -> Account:
+    """Restrict an endpoint to accounts on the reviewer allowlist"""
+    if current_account.phone_number not in settings.reviewer_phone_numbers:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Reviewer access required"
+        )
+    
+    return current_account
+
+
+async def require_metrics_access(request: Request) -> None:
+    """Restrict an endpoint to allowed client networks, or to holders of the metrics token"""
+    if settings.metrics_token:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+            return
+    
+    try:
+        client = ipaddress.ip_address(request.client.host) if request.client else None
+    except ValueError:
+        client = None
+    if client and any(
+        client in ipaddress.ip_network(network, strict=False) for network in settings.metrics_allowed_networks
+    ):
+        return
+    
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Metrics access required"
+    )
@@ -0,0 +1,64 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import UserProfile
+
+# Codings CompressionMiddleware may apply, each marked in the ETag it sends
+CONTENT_CODINGS = ("zstd", "br", "gzip")
+
+
+def make_profile_etag(profile: UserProfile, view: str) -> str:
+    """Build a strong ETag for a profile-scoped view from its change version"""
+    digest = hashlib.sha1(f"{profile.id}:{profile.data_version}:{view}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of a compressed representation of the response tagged ``etag``.
+
+    Strong validators must differ per content-coding, so the coding goes
+    inside the quotes ("abc-gzip"); weak ones may be shared and are kept.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def identity_etag(etag: str) -> str:
+    """Undo ``encoded_etag``: the ETag the handler gave the uncompressed response"""
+    for encoding in CONTENT_CODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return f'{etag[:-len(suffix)]}"'
+    return etag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against the current ETag, in any content-coding"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (identity_etag(tag.strip()) for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 response when the client copy is current, otherwise tag the response"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def bump_profile_version(db: AsyncSession, *profile_ids) -> None:
+    """Invalidate ETags of all views derived from the profiles' data"""
+    await db.execute(
+        update(UserProfile)
+        .where(UserProfile.id == profile_ids[0] if len(profile_ids) == 1 else UserProfile.id.in_(profile_ids))
+        .values(data_version=UserProfile.data_version + 1, updated_at=UserProfile.updated_at)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,48 @@
+"""Image resizing run inside thumbnail worker processes.
+
+Kept free of app imports so that spawning a worker only loads this module
+and Pillow, not the web stack.
+"""
+import os
+import tempfile
+
+# Encoder settings per stored extension
+SAVE_OPTIONS = {
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+}
+
+
+def render_variant(source: str, destination: str, max_edge: int) -> None:
+    """Write ``source`` scaled down to fit ``max_edge`` pixels to ``destination``.
+
+    Raises ValueError if the image cannot be decoded.
+    """
+    from PIL import Image, ImageOps
+
+    extension = destination.rsplit(".", 1)[1]
+    options = SAVE_OPTIONS.get(extension)
+    if options is None:
+        raise ValueError(f"No thumbnails for .{extension} images")
+    try:
+        with Image.open(source) as image:
+            # JPEGs decode straight at a reduced scale, which is most of the saving
+            image.draft("RGB", (max_edge, max_edge))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Cannot decode image: {e}")
+    if options["format"] == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    # Written under a temporary name, so readers never see a partial file
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, **options)
+        os.replace(temp_path, destination)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
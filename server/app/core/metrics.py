@@ -0,0 +1,78 @@
+from typing import Dict, List, Tuple
+
+# Label values of one series, as sorted (name, value) pairs
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Metric:
+    """One metric family in Prometheus' text exposition format"""
+
+    def __init__(self, name: str, kind: str, documentation: str):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.values: Dict[LabelSet, float] = {}
+        self.counts: Dict[LabelSet, int] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelSet:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        self.values[self._key(labels)] = value
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + value
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values.items()):
+            if self.kind == "summary":
+                lines.append(f"{self.name}_sum{_labels(key)} {value}")
+                lines.append(f"{self.name}_count{_labels(key)} {self.counts[key]}")
+            else:
+                lines.append(f"{self.name}{_labels(key)} {value}")
+        return lines
+
+
+def _labels(key: LabelSet) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Process-local metrics; every worker serves its own values"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, name: str, kind: str, documentation: str) -> Metric:
+        if name not in self._metrics:
+            self._metrics[name] = Metric(name, kind, documentation)
+        return self._metrics[name]
+
+    def counter(self, name: str, documentation: str) -> Metric:
+        return self._register(name, "counter", documentation)
+
+    def gauge(self, name: str, documentation: str) -> Metric:
+        return self._register(name, "gauge", documentation)
+
+    def summary(self, name: str, documentation: str) -> Metric:
+        return self._register(name, "summary", documentation)
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+metrics = MetricsRegistry()
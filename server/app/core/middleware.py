@@ -1,9 +1,25 @@
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import math
 import time
-from typing import Dict
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
 import asyncio
+from app.core.etag import encoded_etag
+from app.db.base import SAFE_METHODS, LAST_WRITE_COOKIE, LAST_WRITE_HEADER
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -38,6 +54,17 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         response = await call_next(request)
         return response
+    
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        """Forget clients with no calls in the current window; returns how many"""
+        now = now or time.time()
+        stale = [
+            client_ip for client_ip, client in self.clients.items()
+            if all(now - call_time >= self.period for call_time in client["calls"])
+        ]
+        for client_ip in stale:
+            del self.clients[client_ip]
+        return len(stale)
 
 
 class ErrorHandlingMiddleware(BaseHTTPMiddleware):
@@ -60,3 +87,254 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
                 status_code=500,
                 content={"detail": "Internal server error", "error": str(e)}
             )
+
+
+_MAX_LEVELS = {"gzip": 9, "br": 11, "zstd": 19}
+
+
+class _Compressor:
+    """Incremental encoder for a single content-coding"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level or 3).compressobj()
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=level or 4)
+        else:
+            self._obj = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def available_encodings() -> List[str]:
+    """Content-codings supported by this process, in server preference order"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """Pick the best supported coding from an Accept-Encoding header"""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip depending on Accept-Encoding.
+
+    Bodies smaller than ``minimum_size`` are sent as is. Streaming bodies are
+    compressed chunk by chunk. Responses for ``precompressed_paths`` are
+    compressed once at a high level and served from memory afterwards.
+    """
+
+    excluded_media_types = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        precompressed_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.precompressed_paths = frozenset(precompressed_paths)
+        self.encodings = available_encodings()
+        self._precompressed: Dict[Tuple[str, str], Tuple[List[Tuple[bytes, bytes]], bytes]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cache_key = None
+        if scope["method"] == "GET" and scope["path"] in self.precompressed_paths:
+            cache_key = (scope["path"], encoding)
+            cached = self._precompressed.get(cache_key)
+            if cached is not None:
+                raw_headers, body = cached
+                await send({"type": "http.response.start", "status": 200, "headers": raw_headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+
+        responder = _CompressionResponder(self, send, encoding, cache_key, headers.get("if-none-match", ""))
+        await self.app(scope, receive, responder)
+
+    def is_excluded(self, content_type: str) -> bool:
+        return content_type.startswith(self.excluded_media_types)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        send: Send,
+        encoding: str,
+        cache_key: Optional[Tuple[str, str]],
+        if_none_match: str
+    ):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.cache_key = cache_key
+        self.if_none_match = if_none_match
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.buffer: List[bytes] = []
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if (
+                "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+                or self.middleware.is_excluded(headers.get("content-type", ""))
+            ):
+                if message["status"] == 304 and "etag" in headers:
+                    message = self._not_modified(message, headers["etag"])
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.cache_key is not None and self.start_message["status"] == 200:
+            self.buffer.append(body)
+            if not more_body:
+                await self._send_precompressed(b"".join(self.buffer))
+            return
+
+        if self.compressor is None:
+            # Hold back small leading chunks until the threshold decision can be made
+            self.buffer.append(body)
+            buffered_size = sum(len(chunk) for chunk in self.buffer)
+            if more_body and buffered_size < self.middleware.minimum_size:
+                return
+            body, self.buffer = b"".join(self.buffer), []
+
+            if not more_body and buffered_size < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _not_modified(self, message: Message, etag: str) -> Message:
+        # Confirm the client's copy under the ETag it holds: the compressed one
+        # if that is what it revalidated, so a cache does not relabel it
+        tagged = encoded_etag(etag, self.encoding)
+        if tagged not in (tag.strip() for tag in self.if_none_match.split(",")):
+            return message
+        headers = MutableHeaders(raw=list(message["headers"]))
+        headers["ETag"] = tagged
+        return {**message, "headers": headers.raw}
+
+    async def _send_precompressed(self, body: bytes) -> None:
+        compressor = _Compressor(self.encoding, level=_MAX_LEVELS[self.encoding])
+        compressed = compressor.compress(body) + compressor.flush()
+        headers = MutableHeaders(raw=list(self.start_message["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+        self.middleware._precompressed[self.cache_key] = (headers.raw, compressed)
+        await self.send({**self.start_message, "headers": headers.raw})
+        await self.send({"type": "http.response.body", "body": compressed})
+
+
+class ReadYourWritesMiddleware:
+    """Stamp successful writes so the client's next reads stay on the primary.
+
+    The timestamp is returned both as a cookie (browsers) and as the
+    ``X-Last-Write`` header, which API clients echo back on later requests.
+    """
+
+    def __init__(self, app: ASGIApp, window_seconds: float) -> None:
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_stamp(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                stamp = f"{time.time():.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(LAST_WRITE_HEADER, stamp)
+                headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={math.ceil(self.window_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_stamp)
@@ -0,0 +1,63 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import orjson
+from sqlalchemy import Select, bindparam, tuple_
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(ordering: str, values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row into an opaque cursor"""
+    keys = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    payload = orjson.dumps({"o": ordering, "k": keys})
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, ordering: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor produced for the same ordering back into typed key values"""
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["o"] != ordering or len(payload["k"]) != len(columns):
+            raise InvalidCursorError("Cursor does not match ordering")
+        return [_parse_key(value, column) for value, column in zip(payload["k"], columns)]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def _parse_key(value: str, column: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return value
+
+
+def paginate(
+    query: Select,
+    columns: Sequence[Any],
+    descending: bool,
+    after: Optional[Sequence[Any]],
+    page_size: int
+) -> Select:
+    """Apply keyset ordering, the "after cursor" condition and a one-row lookahead"""
+    if after is not None:
+        key = tuple_(*columns)
+        bound = tuple_(*[bindparam(None, value, type_=column.type) for value, column in zip(after, columns)])
+        query = query.where(key < bound if descending else key > bound)
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order_by).limit(page_size + 1)
+
+
+def split_page(rows: Sequence[Any], columns: Sequence[Any], ordering: str, page_size: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the lookahead row and build the cursor for the next page"""
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(ordering, [getattr(last, column.key) for column in columns])
@@ -0,0 +1,125 @@
+from typing import Any, Dict, Optional, Tuple
+import os
+import uuid
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+
+def _encode_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, uuid.UUID):
+        # orjson only encodes uuid.UUID itself; asyncpg returns a subclass
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONModelResponse(JSONResponse):
+    """JSON response that encodes already validated pydantic models with orjson.
+
+    Returning it from a handler skips FastAPI's response_model re-validation;
+    UUIDs and datetimes are encoded natively by orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_default)
+
+
+class FileRangeResponse(Response):
+    """Serve a file, or one byte range of it, without blocking the event loop.
+
+    Honours a single ``bytes=`` range (``If-Range`` permitting); multiple
+    ranges are answered with the whole file, as HTTP allows. The file is
+    read in a worker thread in ``chunk_size`` pieces. When
+    ``accel_redirect`` is given, the body is left to a fronting nginx
+    instead, which sends the file with ``sendfile()`` and applies the
+    range itself.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        accel_redirect: Optional[str] = None
+    ):
+        super().__init__(media_type=media_type, headers=headers)
+        self.path = path
+        self.size = size
+        self.accel_redirect = accel_redirect
+        self.headers["Accept-Ranges"] = "bytes"
+
+    def _range(self, scope: Scope) -> Optional[Tuple[int, int]]:
+        """(start, end) of the requested range, inclusive; None for the whole file"""
+        headers = Headers(scope=scope)
+        value = headers.get("range", "")
+        if_range = headers.get("if-range")
+        if not value.startswith("bytes=") or "," in value:
+            return None
+        if if_range is not None and if_range != self.headers.get("etag"):
+            return None
+        first, _, last = value[6:].strip().partition("-")
+        try:
+            if not first:
+                # Suffix range: the last N bytes
+                start, end = max(self.size - int(last), 0), self.size - 1
+            else:
+                start = int(first)
+                end = min(int(last), self.size - 1) if last else self.size - 1
+        except ValueError:
+            return None
+        if start > end and first and (not last or int(last) >= start):
+            raise _Unsatisfiable()
+        if start > end:
+            return None
+        return start, end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            byte_range = self._range(scope)
+        except _Unsatisfiable:
+            self.status_code = 416
+            self.headers["Content-Range"] = f"bytes */{self.size}"
+            self.headers["Content-Length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if self.accel_redirect is not None:
+            self.headers["X-Accel-Redirect"] = self.accel_redirect
+            await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = byte_range if byte_range is not None else (0, self.size - 1)
+        if byte_range is not None:
+            self.status_code = 206
+            self.headers["Content-Range"] = f"bytes {start}-{end}/{self.size}"
+        self.headers["Content-Length"] = str(end - start + 1)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        with await run_in_threadpool(open, self.path, "rb") as f:
+            position = start
+            while position <= end:
+                size = min(self.chunk_size, end - position + 1)
+                chunk = await run_in_threadpool(os.pread, f.fileno(), size, position)
+                if not chunk:
+                    raise RuntimeError(f"{self.path} is shorter than {self.size} bytes")
+                position += len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": position <= end})
+        if start > end:
+            await send({"type": "http.response.body", "body": b""})
+
+
+class _Unsatisfiable(Exception):
+    pass
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Session-level advisory lock held by the worker that runs leader-only jobs
+SCHEDULER_LOCK_KEY = 0x7363686564
+
+job_runs = metrics.counter("scheduler_job_runs_total", "Maintenance job runs by outcome")
+job_duration = metrics.summary("scheduler_job_duration_seconds", "Time spent running maintenance jobs")
+job_last_duration = metrics.gauge("scheduler_job_last_duration_seconds", "Duration of the latest run of each job")
+job_rows = metrics.counter("scheduler_job_rows_affected_total", "Rows deleted, repaired or evicted by each job")
+job_last_rows = metrics.gauge("scheduler_job_last_rows_affected", "Rows affected by the latest run of each job")
+leader_gauge = metrics.gauge("scheduler_is_leader", "1 if this worker holds the scheduler leader lock")
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    # Returns the number of rows (or entries) the run affected
+    func: Callable[[], Awaitable[int]]
+    # Leader-only jobs run in one worker; the rest maintain per-process state
+    leader_only: bool = True
+    # Run once as soon as the scheduler starts instead of after one interval,
+    # and for leader-only jobs again whenever this worker takes over leadership
+    run_on_start: bool = False
+
+
+class Scheduler:
+    """Periodic in-process jobs with leader election across workers.
+
+    On PostgreSQL the leader is whichever worker holds an advisory lock on
+    a dedicated connection; the lock is released when that worker exits or
+    its connection drops, and another worker takes over at its next election.
+    Other databases are assumed to be served by a single process.
+    """
+
+    def __init__(self, engine: AsyncEngine, election_interval: float = 15.0):
+        self.engine = engine
+        self.election_interval = election_interval
+        self.jobs: List[Job] = []
+        self.is_leader = False
+        self._leader_connection: Optional[AsyncConnection] = None
+        self._tasks: List[asyncio.Task] = []
+        # Set to run a job now instead of at the end of its current interval
+        self._wakeups: Dict[str, asyncio.Event] = {}
+
+    def add_job(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], Awaitable[int]],
+        leader_only: bool = True,
+        run_on_start: bool = False
+    ) -> Job:
+        job = Job(name, interval, func, leader_only, run_on_start)
+        self.jobs.append(job)
+        self._wakeups[name] = asyncio.Event()
+        return job
+
+    async def start(self) -> None:
+        await self.elect()
+        self._tasks = [asyncio.create_task(self._election_loop())]
+        self._tasks += [asyncio.create_task(self._job_loop(job)) for job in self.jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._resign()
+
+    async def elect(self) -> bool:
+        """Keep or try to take leadership; returns whether this worker leads"""
+        if self.engine.dialect.name != "postgresql":
+            self._set_leader(True)
+            return True
+        if self._leader_connection is not None:
+            try:
+                await self._leader_connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("Scheduler lost its leader connection")
+                await self._resign()
+        connection = await self.engine.connect()
+        try:
+            # Autocommit, so holding the lock does not hold a transaction open
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEDULER_LOCK_KEY})
+        except Exception:
+            await connection.close()
+            raise
+        if acquired:
+            self._leader_connection = connection
+            self._set_leader(True)
+        else:
+            await connection.close()
+        return bool(acquired)
+
+    async def _resign(self) -> None:
+        if self._leader_connection is not None:
+            try:
+                # Invalidate rather than return it to the pool, so the
+                # connection really closes and the lock is released with it
+                await self._leader_connection.invalidate()
+                await self._leader_connection.close()
+            except Exception:
+                logger.warning("Could not close the scheduler leader connection", exc_info=True)
+            self._leader_connection = None
+        self._set_leader(False)
+
+    def _set_leader(self, is_leader: bool) -> None:
+        if is_leader and not self.is_leader:
+            # A new leader does not wait out the interval of jobs the old one may have skipped
+            for job in self.jobs:
+                if job.leader_only and job.run_on_start:
+                    self._wakeups[job.name].set()
+        self.is_leader = is_leader
+        leader_gauge.set(1 if is_leader else 0)
+
+    async def run_job(self, job: Job) -> Optional[int]:
+        """Run a job once, recording its duration and rows affected"""
+        start = time.perf_counter()
+        try:
+            rows = await job.func()
+        except Exception:
+            logger.exception("Maintenance job %s failed", job.name)
+            job_runs.inc(job=job.name, outcome="error")
+            return None
+        finally:
+            duration = time.perf_counter() - start
+            job_duration.observe(duration, job=job.name)
+            job_last_duration.set(duration, job=job.name)
+        job_runs.inc(job=job.name, outcome="success")
+        job_rows.inc(rows, job=job.name)
+        job_last_rows.set(rows, job=job.name)
+        return rows
+
+    async def _election_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.election_interval)
+            try:
+                await self.elect()
+            except Exception:
+                logger.exception("Scheduler leader election failed")
+
+    async def _job_loop(self, job: Job) -> None:
+        delay = 0 if job.run_on_start else job.interval
+        wakeup = self._wakeups[job.name]
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            delay = job.interval
+            if job.leader_only and not self.is_leader:
+                continue
+            await self.run_job(job)
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+import orjson
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "application_status_events"
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_PAYLOAD_BYTES = 7000
+
+subscribers_gauge = metrics.gauge("status_stream_subscribers", "Open status stream connections in this worker")
+overflows = metrics.counter("status_stream_overflows_total", "Connections that fell behind and replayed from the database")
+
+
+class Subscription:
+    """Events for one stream connection, buffered up to ``max_queued``.
+
+    A subscriber that falls further behind loses its buffer and is flagged
+    ``overflowed``; it then catches up from the event table instead, so
+    memory per connection stays bounded without dropping events.
+    """
+
+    def __init__(self, profile_id: str, max_queued: int):
+        self.profile_id = profile_id
+        self.max_queued = max_queued
+        self.overflowed = False
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        if len(self._events) >= self.max_queued:
+            self._events.clear()
+            if not self.overflowed:
+                overflows.inc()
+            self.overflowed = True
+        if not self.overflowed:
+            self._events.append(event)
+        self._ready.set()
+
+    def mark_overflowed(self) -> None:
+        self._events.clear()
+        self.overflowed = True
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until events arrive; False on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def drain(self) -> List[Dict[str, Any]]:
+        events = list(self._events)
+        self._events.clear()
+        self._ready.clear()
+        return events
+
+
+class StatusBroker:
+    """In-process fan-out of status events to the connections of each profile.
+
+    On PostgreSQL, writers ``NOTIFY`` inside their transaction and every
+    worker's bridge connection ``LISTEN``s, so events committed by any worker
+    reach connections held by all of them. Without the bridge, handlers
+    publish their own events after committing.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._connection: Optional[AsyncConnection] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._reconnect: Optional[asyncio.Task] = None
+
+    @property
+    def bridged(self) -> bool:
+        return self._connection is not None
+
+    def subscribe(self, profile_id, max_queued: int) -> Subscription:
+        subscription = Subscription(str(profile_id), max_queued)
+        self._subscriptions.setdefault(subscription.profile_id, set()).add(subscription)
+        subscribers_gauge.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.profile_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.profile_id]
+        subscribers_gauge.inc(-1)
+
+    def publish(self, events: Iterable[Dict[str, Any]]) -> None:
+        for event in events:
+            for subscription in self._subscriptions.get(event["profile_id"], ()):
+                subscription.push(event)
+
+    def dispatch(self, events: List[Dict[str, Any]]) -> None:
+        """Publish events a handler just committed, unless the bridge delivers them"""
+        if not self.bridged:
+            self.publish(events)
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """LISTEN for events from all workers (PostgreSQL only)"""
+        if engine.dialect.name != "postgresql":
+            return
+        self._engine = engine
+        await self._listen()
+
+    async def stop(self) -> None:
+        self._engine = None
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                await connection.invalidate()
+                await connection.close()
+            except Exception:
+                logger.warning("Could not close the status stream connection", exc_info=True)
+
+    async def _listen(self) -> None:
+        connection = await self._engine.connect()
+        try:
+            driver = (await connection.get_raw_connection()).driver_connection
+            await driver.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            driver.add_termination_listener(self._on_terminated)
+        except Exception:
+            await connection.invalidate()
+            await connection.close()
+            raise
+        self._connection = connection
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.publish(orjson.loads(payload))
+
+    def _on_terminated(self, connection) -> None:
+        if self._engine is None:
+            # Closed by stop()
+            return
+        logger.warning("Status stream lost its LISTEN connection; reconnecting")
+        self._connection = None
+        # Notifications sent meanwhile are gone: make every connection catch up from the table
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.mark_overflowed()
+        if self._reconnect is None:
+            self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        delay = 1.0
+        try:
+            while self._engine is not None and self._connection is None:
+                try:
+                    await self._listen()
+                except Exception:
+                    logger.warning("Status stream reconnect failed", exc_info=True)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                    continue
+                # Events committed before LISTEN resumed are replayed from the table
+                for subscriptions in self._subscriptions.values():
+                    for subscription in subscriptions:
+                        subscription.mark_overflowed()
+        finally:
+            self._reconnect = None
+
+
+def notify_payloads(events: List[Dict[str, Any]]) -> List[str]:
+    """Pack events into as few NOTIFY payloads as fit the size limit"""
+    payloads, batch, size = [], [], 2
+    for event in events:
+        encoded = orjson.dumps(event)
+        if batch and size + len(encoded) + 1 > NOTIFY_PAYLOAD_BYTES:
+            payloads.append(b"[" + b",".join(batch) + b"]")
+            batch, size = [], 2
+        batch.append(encoded)
+        size += len(encoded) + 1
+    if batch:
+        payloads.append(b"[" + b",".join(batch) + b"]")
+    return [payload.decode() for payload in payloads]
+
+
+status_broker = StatusBroker()
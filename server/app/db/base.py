@@ -1,22 +1,92 @@
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import HTTPConnection
 from app.core.config import settings
 
 engine = create_async_engine(settings.database_url, echo=settings.debug)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engine = (
+    create_async_engine(settings.database_replica_url, echo=settings.debug)
+    if settings.database_replica_url else None
+)
+replica_session_maker = (
+    sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None else None
+)
+
 Base = declarative_base()
 
+# Alembic head this code expects; tests/test_startup.py keeps it in step with alembic/versions
+SCHEMA_REVISION = "c4e9a1d7f352"
+
+SAFE_METHODS = ("GET", "HEAD")
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def last_write_at(connection: HTTPConnection) -> Optional[float]:
+    """Timestamp of the client's latest write, from header or cookie"""
+    value = connection.headers.get(LAST_WRITE_HEADER) or connection.cookies.get(LAST_WRITE_COOKIE)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        # Unreadable token: treat as a fresh write so the client sees its own data
+        return time.time()
 
-async def get_session() -> AsyncSession:
+
+def use_replica(connection: HTTPConnection) -> bool:
+    """Route safe requests to the replica outside the read-your-writes window"""
+    if replica_session_maker is None or connection.scope.get("method", "GET") not in SAFE_METHODS:
+        return False
+    written_at = last_write_at(connection)
+    return written_at is None or time.time() - written_at >= settings.replica_read_your_writes_seconds
+
+
+async def get_session(connection: HTTPConnection) -> AsyncSession:
+    replica = use_replica(connection)
+    async with (replica_session_maker if replica else async_session_maker)() as session:
+        session.info["read_only"] = replica
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_primary_session() -> AsyncSession:
+    """Session on the primary whatever the method, for reads that must not lag behind writes"""
     async with async_session_maker() as session:
+        session.info["read_only"] = False
         try:
             yield session
         finally:
             await session.close()
 
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def check_schema():
+    """Fail fast unless the database is migrated to ``SCHEMA_REVISION``.
+
+    One query instead of ``create_all``, which inspects every table on each
+    boot. Migrations target PostgreSQL, so other databases (local SQLite)
+    are still created from the models.
+    """
+    if engine.dialect.name != "postgresql":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return
+    async with engine.connect() as conn:
+        try:
+            revision = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+        except ProgrammingError:
+            revision = None
+    if revision != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database schema is at revision {revision}, expected {SCHEMA_REVISION}; run `alembic upgrade head`"
+        )
@@ -1,22 +1,41 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
-from app.core.middleware import RateLimitMiddleware, ErrorHandlingMiddleware
-from app.db.base import init_db
-from app.api import auth, profile, applications, geo
+from app.core.dependencies import require_metrics_access
+from app.core.middleware import (
+    RateLimitMiddleware, ErrorHandlingMiddleware, CompressionMiddleware, ReadYourWritesMiddleware
+)
+from app.core.metrics import metrics
+from app.core.scheduler import Scheduler
+from app.core.status_stream import status_broker
+from app.db.base import check_schema, engine
+from app.services.maintenance_service import MaintenanceService
+from app.services.thumbnail_service import thumbnail_generator
+from app.api import auth, profile, applications, geo, images
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await init_db()
+    await check_schema()
+    await status_broker.start(engine)
+    scheduler = Scheduler(engine)
+    if settings.scheduler_enabled:
+        MaintenanceService.register_jobs(scheduler, app)
+        await scheduler.start()
+    else:
+        # Nothing else keeps partitions ahead; workers starting together
+        # queue on the advisory lock in ensure_partitions
+        await MaintenanceService.ensure_partitions()
     yield
     # Shutdown
-    pass
+    await scheduler.stop()
+    await status_broker.stop()
+    thumbnail_generator.shutdown()
 
 
 app = FastAPI(
@@ -29,6 +48,13 @@ app = FastAPI(
 # Add middleware
 app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=500,
+    precompressed_paths=["/openapi.json", "/docs", "/redoc"],
+)
+if settings.database_replica_url:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.replica_read_your_writes_seconds)
 
 # CORS middleware
 app.add_middleware(
@@ -37,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Last-Write"],
 )
 
 # Include routers
@@ -44,6 +71,7 @@ app.include_router(auth.router)
 app.include_router(profile.router)
 app.include_router(applications.router)
 app.include_router(geo.router)
+app.include_router(images.router)
 
 
 @app.exception_handler(HTTPException)
@@ -72,6 +100,11 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
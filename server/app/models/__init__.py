@@ -2,6 +2,9 @@ from .base import UUIDTimestampedModel, TimestampedMixin
 from .account import Account
 from .user_profile import UserProfile
 from .application import Application
+from .application_counter import ApplicationCounter, ApplicationArchiveCount
+from .application_event import ApplicationStatusEvent
+from .application_fingerprint import ApplicationFingerprint, ApplicationLSHBucket
 from .otp_request import OTPRequest
 
 __all__ = [
@@ -10,5 +13,10 @@ __all__ = [
     "Account",
     "UserProfile",
     "Application",
+    "ApplicationCounter",
+    "ApplicationArchiveCount",
+    "ApplicationStatusEvent",
+    "ApplicationFingerprint",
+    "ApplicationLSHBucket",
     "OTPRequest"
 ]
@@ -10,7 +10,7 @@ class Account(UUIDTimestampedModel):
     is_verified = Column(Boolean, default=False, nullable=False)
     
     # Relationships
-    profile = relationship("UserProfile", back_populates="account", uselist=False, cascade="all, delete-orphan", lazy="selectin")
+    profile = relationship("UserProfile", back_populates="account", uselist=False, cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
     
     # Indexes
     __table_args__ = (
@@ -1,36 +1,167 @@
-from sqlalchemy import Column, String, Text, Index, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Index, ForeignKey, PrimaryKeyConstraint, Computed, DDL, Integer, event, func
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.ext.hybrid import hybrid_property
-from .base import UUIDTimestampedModel
+from sqlalchemy.sql.functions import FunctionElement
+from .base import UUIDTimestampedModel, JSONDocument
+
+NO_ADDRESS = "Адрес не указан"
+
+
+class element_count(FunctionElement):
+    """Number of elements in an array column, NULL for NULL"""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(element_count)
+def _element_count(element, compiler, **kw):
+    return f"cardinality({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(element_count, "sqlite")
+def _element_count_sqlite(element, compiler, **kw):
+    # SQLite keeps arrays as JSON text
+    return f"json_array_length({compiler.process(element.clauses, **kw)})"
 
 
 class Application(UUIDTimestampedModel):
     __tablename__ = "applications"
     
     user_profile_id = Column(UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False)
-    address = Column(JSON, nullable=False)
+    address = Column(JSONDocument, nullable=False)
     description = Column(Text, nullable=False)
     image_urls = Column(ARRAY(String), nullable=False, default=list)
     status = Column(String(20), default="pending", nullable=False)
+    # Partition key, so part of the primary key (see __table_args__)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
+    
+    # Extracted from address by the database so they can be indexed and filtered on
+    city = Column(String(255), Computed(address["city"].as_string(), persisted=True))
+    region = Column(String(255), Computed(address["region"].as_string(), persisted=True))
+    country_code = Column(String(10), Computed(address["country_code"].as_string(), persisted=True))
+    # Maintained by a trigger on PostgreSQL; SQLite searches the applications_fts table instead
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True), raiseload=True)
     
     # Relationships
-    user_profile = relationship("UserProfile", back_populates="applications", lazy="selectin")
+    user_profile = relationship("UserProfile", back_populates="applications", lazy="raise")
 
-    # Computed properties
+    # Computed properties, in Python on instances and in SQL in column selects
     @hybrid_property
     def address_display(self) -> str:
         if self.address and isinstance(self.address, dict):
-            return self.address.get("address", "Адрес не указан")
-        return "Адрес не указан"
+            return self.address.get("address", NO_ADDRESS)
+        return NO_ADDRESS
+    
+    @address_display.expression
+    def address_display(cls):
+        return func.coalesce(cls.address["address"].as_string(), NO_ADDRESS)
     
     @hybrid_property
     def image_count(self) -> int:
         return len(self.image_urls) if self.image_urls else 0
     
+    @image_count.expression
+    def image_count(cls):
+        return func.coalesce(element_count(cls.image_urls), 0)
+    
     # Indexes
     __table_args__ = (
-        Index("idx_applications_user_profile_id", "user_profile_id"),
-        Index("idx_applications_status", "status"),
+        # created_at is the partition key, which PostgreSQL requires in every unique
+        # constraint; id leads so lookups by id alone still use each partition's key
+        PrimaryKeyConstraint("id", "created_at"),
         Index("idx_applications_created_at", "created_at"),
+        # Every profile-scoped query is served by one of these; the status one also
+        # answers per-status counts with an index-only scan
+        Index("idx_applications_profile_created", "user_profile_id", "created_at", "id"),
+        Index("idx_applications_profile_status_created", "user_profile_id", "status", "created_at", "id"),
+        Index("idx_applications_city_created", "city", "created_at"),
+        Index("idx_applications_region_created", "region", "created_at"),
+        Index("idx_applications_country_code", "country_code"),
+        # Containment queries (address @> '{...}') on PostgreSQL
+        Index(
+            "idx_applications_address_gin", "address",
+            postgresql_using="gin", postgresql_ops={"address": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index("idx_applications_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Monthly partitions are managed by app.services.partition_service
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
+
+# Rows outside every monthly partition land here until their partition is created
+event.listen(
+    Application.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS applications_default PARTITION OF applications DEFAULT").execute_if(
+        dialect="postgresql"
+    )
+)
+
+
+# Full-text search. There is no Kazakh stemmer in PostgreSQL, so "kazakh" is a
+# copy of "simple" (lowercased, unstemmed) that a dictionary can be added to later.
+POSTGRESQL_SEARCH_DDL = [
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'kazakh') THEN
+            CREATE TEXT SEARCH CONFIGURATION kazakh (COPY = simple);
+        END IF;
+    END $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION applications_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'A') ||
+            setweight(to_tsvector('kazakh', coalesce(NEW.description, '')), 'A') ||
+            setweight(to_tsvector('russian', coalesce(NEW.address ->> 'address', '')), 'B') ||
+            setweight(to_tsvector('kazakh', coalesce(NEW.address ->> 'address', '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER applications_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF description, address ON applications
+    FOR EACH ROW EXECUTE FUNCTION applications_search_vector_update()
+    """,
+]
+
+# SQLite rowids are not stable for tables without an INTEGER PRIMARY KEY, so
+# the FTS5 table carries the application id instead
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+        application_id UNINDEXED, description, address, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER applications_fts_insert AFTER INSERT ON applications BEGIN
+        INSERT INTO applications_fts (application_id, description, address)
+        VALUES (new.id, new.description, json_extract(new.address, '$.address'));
+    END
+    """,
+    """
+    CREATE TRIGGER applications_fts_update AFTER UPDATE OF description, address ON applications BEGIN
+        DELETE FROM applications_fts WHERE application_id = old.id;
+        INSERT INTO applications_fts (application_id, description, address)
+        VALUES (new.id, new.description, json_extract(new.address, '$.address'));
+    END
+    """,
+    """
+    CREATE TRIGGER applications_fts_delete AFTER DELETE ON applications BEGIN
+        DELETE FROM applications_fts WHERE application_id = old.id;
+    END
+    """,
+]
+
+for statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(Application.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Application.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Application.__table__, "after_drop", DDL("DROP TABLE IF EXISTS applications_fts").execute_if(dialect="sqlite")
+)
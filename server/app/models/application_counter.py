@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class ApplicationCounter(Base):
+    """Per-profile application totals, maintained in the same transaction as application writes"""
+    __tablename__ = "application_counters"
+    
+    user_profile_id = Column(UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, default=0, server_default="0", nullable=False)
+    pending = Column(Integer, default=0, server_default="0", nullable=False)
+    approved = Column(Integer, default=0, server_default="0", nullable=False)
+    rejected = Column(Integer, default=0, server_default="0", nullable=False)
+
+
+
+class ApplicationArchiveCount(Base):
+    """Per-profile totals of applications moved to cold storage, added when a partition is archived"""
+    __tablename__ = "application_archive_counts"
+    
+    user_profile_id = Column(UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), primary_key=True)
+    total = Column(Integer, default=0, server_default="0", nullable=False)
+    pending = Column(Integer, default=0, server_default="0", nullable=False)
+    approved = Column(Integer, default=0, server_default="0", nullable=False)
+    rejected = Column(Integer, default=0, server_default="0", nullable=False)
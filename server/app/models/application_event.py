@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class ApplicationStatusEvent(Base):
+    """Status changes pushed to the owner's stream; ids double as SSE event ids.
+
+    Writers insert events after bumping the profile's ``data_version``, whose
+    row lock orders concurrent writers, so one profile's event ids increase
+    in commit order and a client can resume with ``id > last_event_id``.
+    """
+    __tablename__ = "application_status_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_profile_id = Column(UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False)
+    # No foreign key: applications are keyed by (id, created_at) and may be archived
+    application_id = Column(UUID(as_uuid=True), nullable=False)
+    previous_status = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("idx_application_status_events_profile_id", "user_profile_id", "id"),
+        Index("idx_application_status_events_created_at", "created_at"),
+    )
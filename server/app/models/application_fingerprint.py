@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, DateTime, Float, LargeBinary, Index, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class ApplicationFingerprint(Base):
+    """MinHash signature of an application's description and the cell it was filed in.
+
+    ``duplicate_of_id`` is set when a recent application nearby was similar
+    enough; such rows are what reviewers see as flagged duplicates.
+    """
+    __tablename__ = "application_fingerprints"
+    
+    # No foreign key: applications are keyed by (id, created_at) and may be archived
+    application_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_profile_id = Column(UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False)
+    geohash = Column(String(12), nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    duplicate_of_id = Column(UUID(as_uuid=True), nullable=True)
+    similarity = Column(Float, nullable=True)
+    
+    __table_args__ = (
+        Index("idx_application_fingerprints_created_at", "created_at"),
+        # Reviewers page through flagged rows only, newest first
+        Index(
+            "idx_application_fingerprints_flagged", "created_at", "application_id",
+            postgresql_where=duplicate_of_id.isnot(None),
+            sqlite_where=duplicate_of_id.isnot(None)
+        ),
+    )
+
+
+class ApplicationLSHBucket(Base):
+    """One row per LSH band of a recent fingerprint; buckets are scoped to a geohash cell"""
+    __tablename__ = "application_lsh_buckets"
+    
+    bucket = Column(BigInteger, nullable=False)
+    application_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        PrimaryKeyConstraint("bucket", "application_id"),
+        Index("idx_application_lsh_buckets_created_at", "created_at"),
+    )
@@ -1,9 +1,12 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, Integer, JSON
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.db.base import Base
 
+# JSONB on PostgreSQL (indexable, parsed once on write); plain JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
 
 class UUIDTimestampedModel(Base):
     __abstract__ = True
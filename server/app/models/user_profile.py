@@ -1,8 +1,8 @@
-from sqlalchemy import Column, String, Index, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSON
+from sqlalchemy import Column, String, Integer, Index, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
-from .base import UUIDTimestampedModel
+from .base import UUIDTimestampedModel, JSONDocument
 
 
 class UserProfile(UUIDTimestampedModel):
@@ -12,11 +12,13 @@ class UserProfile(UUIDTimestampedModel):
     name = Column(String(100), nullable=False)
     surname = Column(String(100), nullable=False)
     position = Column(String(150), nullable=False)
-    address = Column(JSON, nullable=True)
+    address = Column(JSONDocument, nullable=True)
+    # Incremented on every write to the profile or its applications; drives ETags
+    data_version = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Relationships
-    account = relationship("Account", back_populates="profile", lazy="selectin")
-    applications = relationship("Application", back_populates="user_profile", cascade="all, delete-orphan", lazy="selectin")
+    account = relationship("Account", back_populates="profile", lazy="raise")
+    applications = relationship("Application", back_populates="user_profile", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
     
     # Computed properties
     @hybrid_property
@@ -1,7 +1,12 @@
 from .address import AddressSchema
 from .auth import OTPRequestSchema, OTPVerifySchema, CheckVerificationSchema, TokenSchema
 from .user_profile import UserProfileCreateSchema, UserProfileResponseSchema, UserProfileUpdateSchema
-from .application import ApplicationCreateSchema, ApplicationResponseSchema, ApplicationUpdateSchema, ApplicationStatusUpdateSchema, ApplicationStatsSchema
+from .application import (
+    ApplicationCreateSchema, ApplicationResponseSchema, ApplicationUpdateSchema, ApplicationStatusUpdateSchema, ApplicationStatsSchema,
+    ApplicationBulkCreateSchema, ApplicationBulkItemResultSchema, ApplicationBulkResponseSchema, ApplicationSearchResultSchema,
+    ApplicationDuplicateSchema
+)
+from .image import ImageUploadResultSchema, ImageUploadResponseSchema
 from .geo import GeocodeRequestSchema, GeocodeResponseSchema, ReverseGeocodeRequestSchema, AutocompleteResponseSchema
 
 __all__ = [
@@ -18,6 +23,13 @@ __all__ = [
     "ApplicationUpdateSchema",
     "ApplicationStatusUpdateSchema",
     "ApplicationStatsSchema",
+    "ApplicationBulkCreateSchema",
+    "ApplicationBulkItemResultSchema",
+    "ApplicationBulkResponseSchema",
+    "ApplicationSearchResultSchema",
+    "ApplicationDuplicateSchema",
+    "ImageUploadResultSchema",
+    "ImageUploadResponseSchema",
     "GeocodeRequestSchema",
     "GeocodeResponseSchema",
     "ReverseGeocodeRequestSchema",
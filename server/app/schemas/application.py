@@ -77,9 +77,100 @@ class ApplicationResponseSchema(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ApplicationSearchResultSchema(ApplicationResponseSchema):
+    rank: float
+    # Description as escaped HTML, with matched terms wrapped in <mark></mark>
+    highlight: str
+
+
+class ApplicationDuplicateSchema(BaseModel):
+    application: ApplicationResponseSchema
+    # None once the original has been deleted
+    duplicate_of: Optional[ApplicationResponseSchema] = None
+    # Estimated share of description shingles in common, 0..1
+    similarity: float
+    flagged_at: datetime
+
+
 class ApplicationStatsSchema(BaseModel):
     total: int
     pending: int
     approved: int
     rejected: int
     approval_rate: float
+
+
+class ApplicationBulkCreateSchema(BaseModel):
+    # Items are validated one by one so a bad item does not reject the batch
+    items: List[dict]
+    
+    @validator('items')
+    def validate_items(cls, v):
+        if not v:
+            raise ValueError('At least one item is required')
+        if len(v) > 100:
+            raise ValueError('Maximum 100 applications per request')
+        return v
+
+
+class ApplicationBulkItemResultSchema(BaseModel):
+    index: int
+    status_code: int
+    application: Optional[ApplicationResponseSchema] = None
+    error: Optional[str] = None
+
+
+class ApplicationBulkResponseSchema(BaseModel):
+    created: int
+    failed: int
+    results: List[ApplicationBulkItemResultSchema]
+
+
+class ApplicationFilterSchema(BaseModel):
+    status: Optional[str] = None
+    city: Optional[str] = None
+    region: Optional[str] = None
+    created_from: Optional[datetime] = None
+    # Exclusive
+    created_to: Optional[datetime] = None
+    
+    @validator('status')
+    def validate_status(cls, v):
+        if v is not None and v not in ['pending', 'approved', 'rejected']:
+            raise ValueError('Status must be pending, approved, or rejected')
+        return v
+
+
+class ApplicationBulkStatusUpdateSchema(BaseModel):
+    status: str
+    # Exactly one of ids or filter selects the applications
+    ids: Optional[List[uuid.UUID]] = None
+    filter: Optional[ApplicationFilterSchema] = None
+    
+    @validator('status')
+    def validate_status(cls, v):
+        if v not in ['pending', 'approved', 'rejected']:
+            raise ValueError('Status must be pending, approved, or rejected')
+        return v
+    
+    @validator('ids')
+    def validate_ids(cls, v):
+        if v is not None and not 1 <= len(v) <= 10000:
+            raise ValueError('Between 1 and 10000 ids per request')
+        return v
+    
+    @validator('filter', always=True)
+    def validate_selection(cls, v, values):
+        if (v is None) == (values.get('ids') is None):
+            raise ValueError('Provide either ids or filter')
+        if v is not None and not v.model_dump(exclude_none=True):
+            raise ValueError('Filter needs at least one condition')
+        return v
+
+
+class ApplicationBulkStatusResponseSchema(BaseModel):
+    # Applications whose status changed; ones already in the target status are skipped
+    updated: int
+    ids: List[uuid.UUID]
+    # The filter matched more applications than one request changes; repeat it for the rest
+    truncated: bool = False
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImageUploadResultSchema(BaseModel):
+    key: str
+    url: str
+    content_type: str
+    size: int
+    # False when the same image had been uploaded before
+    created: bool
+
+
+class ImageUploadResponseSchema(BaseModel):
+    images: List[ImageUploadResultSchema]
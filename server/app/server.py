@@ -0,0 +1,104 @@
+"""Production server: gunicorn supervising uvicorn workers.
+
+Usage:
+    python -m app.server [--bind 0.0.0.0:8000] [--workers 4]
+
+The app is imported once in the master and forked into the workers, so they
+share its memory copy-on-write and a broken import fails before any worker
+starts. Each worker is replaced after ``SERVER_MAX_REQUESTS`` requests (plus
+jitter), which caps slow memory growth without restarting them all at once.
+``SIGHUP`` replaces the workers gracefully, but code changes need a full
+restart because the app is preloaded.
+"""
+import argparse
+import gc
+import importlib.util
+import math
+import os
+from typing import Any, Dict, Optional
+
+from gunicorn.app.base import BaseApplication
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # pragma: no cover - older uvicorn ships the worker itself
+    from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, within the container's CPU quota if it has one"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        count = os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {
+        # The C event loop and HTTP parser; the pure-Python ones are the fallback
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        # Cancel requests still running (event streams never finish) before
+        # gunicorn's graceful timeout kills the worker, so lifespan shutdown still runs
+        "timeout_graceful_shutdown": max(1, settings.server_graceful_timeout_seconds - 5),
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        # Move everything imported so far out of the collector's generations.
+        # Collections in the workers then never write to these objects, and
+        # the pages they share with the master are not copied
+        gc.freeze()
+        return app
+
+
+def server_options(bind: Optional[str] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "bind": bind or settings.server_bind,
+        # Each worker runs one event loop, so one per CPU keeps every core busy without contention
+        "workers": workers or settings.server_workers or available_cpus(),
+        "worker_class": Worker,
+        "preload_app": True,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "backlog": settings.server_backlog,
+        "keepalive": settings.server_keepalive_seconds,
+        "graceful_timeout": settings.server_graceful_timeout_seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bind", help=f"Address to listen on (default {settings.server_bind})")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per available CPU)")
+    args = parser.parse_args()
+    Server(server_options(args.bind, args.workers)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,18 @@
+from .archive_service import ArchiveService
 from .auth_service import AuthService
+from .counter_service import ApplicationCounterService
+from .duplicate_service import DuplicateService
+from .export_service import ExportService
 from .geocoding_service import GeocodingService
+from .maintenance_service import MaintenanceService
 from .otp_service import OTPService
+from .partition_service import PartitionService
+from .review_service import ReviewService
+from .search_service import SearchService
+from .status_event_service import StatusEventService
 
-__all__ = ["AuthService", "GeocodingService", "OTPService"]
+__all__ = [
+    "ArchiveService", "AuthService", "ApplicationCounterService", "DuplicateService", "ExportService", "GeocodingService",
+    "MaintenanceService", "OTPService", "PartitionService", "ReviewService", "SearchService",
+    "StatusEventService"
+]
@@ -0,0 +1,447 @@
+import bisect
+import gzip
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+import orjson
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.models import Application
+
+ARCHIVE_FORMATS = {"ndjson": ".ndjson.gz", "parquet": ".parquet"}
+ARCHIVE_FIELDS = (
+    "id", "user_profile_id", "status", "address", "description", "image_urls",
+    "city", "region", "country_code", "created_at", "updated_at",
+)
+ARCHIVE_COLUMNS = tuple(getattr(Application, field) for field in ARCHIVE_FIELDS)
+MANIFEST_NAME = "manifest.json"
+UUID_FIELDS = ("id", "user_profile_id")
+DATETIME_FIELDS = ("created_at", "updated_at")
+
+# Sidecar index of an archive file: a header, the byte offset of each batch
+# (and of the end of the file), then two runs of fixed-size records searched
+# in place: (id, profile, batch) sorted by id, and (profile, batch) sorted by profile
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"HAX1"
+INDEX_HEADER = struct.Struct("<4sIII")
+ID_RECORD = struct.Struct("<16s16sI")
+PROFILE_RECORD = struct.Struct("<16sI")
+UUID_SIZE = 16
+
+# Manifest contents by path, reloaded when the file's mtime changes
+_manifests: Dict[str, tuple] = {}
+# Open indexes by path, likewise
+_indexes: Dict[str, tuple] = {}
+
+
+def _pyarrow():
+    """Import pyarrow on first use; it is optional and slow to import at startup"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover - optional dependency
+        raise ValueError("Parquet archives require pyarrow")
+    return pyarrow
+
+
+def _parquet_schema():
+    pyarrow = _pyarrow()
+    return pyarrow.schema([
+        ("id", pyarrow.string()),
+        ("user_profile_id", pyarrow.string()),
+        ("status", pyarrow.string()),
+        ("address", pyarrow.string()),
+        ("description", pyarrow.string()),
+        ("image_urls", pyarrow.list_(pyarrow.string())),
+        ("city", pyarrow.string()),
+        ("region", pyarrow.string()),
+        ("country_code", pyarrow.string()),
+        ("created_at", pyarrow.timestamp("us")),
+        ("updated_at", pyarrow.timestamp("us")),
+    ])
+
+
+def _uuid_bytes(value: Any) -> bytes:
+    # str() covers driver-specific UUID types
+    return uuid.UUID(str(value)).bytes
+
+
+class _Keys:
+    """The leading key of each fixed-size record in a buffer, as a sequence bisect can search"""
+
+    def __init__(self, buffer: mmap.mmap, offset: int, record: struct.Struct, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.record = record
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> bytes:
+        start = self.offset + position * self.record.size
+        return self.buffer[start:start + UUID_SIZE]
+
+    def unpack(self, position: int) -> tuple:
+        return self.record.unpack_from(self.buffer, self.offset + position * self.record.size)
+
+
+class ArchiveIndex:
+    """Which batch of an archive file holds each application and each profile's rows"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as index_file:
+            self._buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, batches, ids, profiles = INDEX_HEADER.unpack_from(self._buffer)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not an archive index")
+        offset = INDEX_HEADER.size
+        self.offsets = struct.unpack_from(f"<{batches + 1}Q", self._buffer, offset)
+        offset += (batches + 1) * 8
+        self._ids = _Keys(self._buffer, offset, ID_RECORD, ids)
+        offset += ids * ID_RECORD.size
+        self._profiles = _Keys(self._buffer, offset, PROFILE_RECORD, profiles)
+
+    def batch_of(self, application_id: uuid.UUID, profile_id: uuid.UUID) -> Optional[int]:
+        """The batch holding the application, if it is archived here and belongs to the profile"""
+        position = bisect.bisect_left(self._ids, application_id.bytes)
+        if position == len(self._ids) or self._ids[position] != application_id.bytes:
+            return None
+        _, profile, batch = self._ids.unpack(position)
+        return batch if profile == profile_id.bytes else None
+
+    def batches_for(self, profile_id: uuid.UUID) -> List[int]:
+        """The batches holding any of the profile's rows, in file order"""
+        batches = []
+        position = bisect.bisect_left(self._profiles, profile_id.bytes)
+        while position < len(self._profiles) and self._profiles[position] == profile_id.bytes:
+            batches.append(self._profiles.unpack(position)[1])
+            position += 1
+        return batches
+
+
+class ArchiveWriter:
+    """Write one archive file and its index; they only appear under their final names once closed"""
+
+    def __init__(self, path: str, archive_format: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.archive_format = archive_format
+        self.rows = 0
+        self._temp_path = f"{path}.tmp"
+        self._offsets: List[int] = []
+        self._ids: List[bytes] = []
+        self._profiles = set()
+        if archive_format == "parquet":
+            self._file = _pyarrow().parquet.ParquetWriter(self._temp_path, _parquet_schema(), compression="zstd")
+        else:
+            self._file = open(self._temp_path, "wb")
+
+    def write(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Write one batch: a Parquet row group, or a gzip member of the NDJSON file"""
+        if not rows:
+            return
+        batch = len(self._offsets)
+        for row in rows:
+            profile = _uuid_bytes(row["user_profile_id"])
+            self._ids.append(ID_RECORD.pack(_uuid_bytes(row["id"]), profile, batch))
+            self._profiles.add(PROFILE_RECORD.pack(profile, batch))
+        if self.archive_format == "parquet":
+            self._offsets.append(batch)
+            records = [
+                {
+                    **row,
+                    "id": str(row["id"]),
+                    "user_profile_id": str(row["user_profile_id"]),
+                    "address": orjson.dumps(row["address"]).decode(),
+                }
+                for row in rows
+            ]
+            table = _pyarrow().Table.from_pylist(records, schema=_parquet_schema())
+            self._file.write_table(table, row_group_size=len(records))
+        else:
+            # Concatenated gzip members read back as one stream, and each can
+            # also be decompressed on its own from its offset
+            self._offsets.append(self._file.tell())
+            # default=str covers driver-specific UUID types
+            self._file.write(gzip.compress(b"".join(orjson.dumps(row, default=str) + b"\n" for row in rows)))
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        if self.archive_format == "parquet":
+            self._offsets.append(len(self._offsets))
+        else:
+            self._offsets.append(self._file.tell())
+        self._file.close()
+        with open(self._temp_path, "rb") as written:
+            os.fsync(written.fileno())
+        self._write_index()
+        os.replace(self._temp_path, self.path)
+
+    def _write_index(self) -> None:
+        self._ids.sort()
+        profiles = sorted(self._profiles)
+        batches = len(self._offsets) - 1
+        with open(f"{self.index_path}.tmp", "wb") as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, batches, len(self._ids), len(profiles)))
+            index_file.write(struct.pack(f"<{batches + 1}Q", *self._offsets))
+            index_file.write(b"".join(self._ids))
+            index_file.write(b"".join(profiles))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def abort(self) -> None:
+        self._file.close()
+        os.remove(self._temp_path)
+
+
+class ArchiveService:
+    @staticmethod
+    def file_name(partition: str, archive_format: str) -> str:
+        return partition + ARCHIVE_FORMATS[archive_format]
+
+    @staticmethod
+    def index_name(file_name: str) -> str:
+        return file_name + INDEX_SUFFIX
+
+    @staticmethod
+    def load_index(path: str) -> ArchiveIndex:
+        mtime = os.stat(path).st_mtime_ns
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, ArchiveIndex(path))
+            _indexes[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def load_manifest(archive_dir: str) -> Dict[str, Any]:
+        """Archived partitions by name, as recorded in the archive directory"""
+        path = os.path.join(archive_dir, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {"partitions": {}}
+        cached = _manifests.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as manifest_file:
+                cached = (mtime, orjson.loads(manifest_file.read()))
+            _manifests[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def save_entry(archive_dir: str, partition: str, entry: Dict[str, Any]) -> None:
+        """Add or replace one partition's entry, atomically rewriting the manifest"""
+        partitions = dict(ArchiveService.load_manifest(archive_dir)["partitions"])
+        partitions[partition] = entry
+        path = os.path.join(archive_dir, MANIFEST_NAME)
+        with open(f"{path}.tmp", "wb") as manifest_file:
+            manifest_file.write(orjson.dumps({"partitions": partitions}, option=orjson.OPT_INDENT_2))
+            manifest_file.flush()
+            os.fsync(manifest_file.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def entries(archive_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Archives whose partition has been dropped, oldest first"""
+        archive_dir = archive_dir or settings.application_archive_dir
+        if not archive_dir:
+            return []
+        partitions = ArchiveService.load_manifest(archive_dir)["partitions"].values()
+        return sorted((entry for entry in partitions if entry["complete"]), key=lambda entry: entry["start"])
+
+    @staticmethod
+    def has_archives() -> bool:
+        return bool(ArchiveService.entries())
+
+    @staticmethod
+    def filters(**values: Any) -> Dict[str, str]:
+        """Equality filters on archived fields, ignoring unset values"""
+        return {field: str(value) for field, value in values.items() if value is not None}
+
+    @staticmethod
+    def iter_rows(
+        filters: Dict[str, str],
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Archived rows matching ``filters``, in created_at order; ``created_to`` is exclusive.
+
+        With a ``user_profile_id`` filter, indexed files are only read for
+        the batches holding that profile's rows. Files are read sequentially,
+        so this blocks; async callers go through :meth:`fetch_page`,
+        :meth:`find` and :meth:`iter_chunks`.
+        """
+        archive_dir = settings.application_archive_dir
+        profile_id = filters.get("user_profile_id")
+        for entry in ArchiveService.entries(archive_dir):
+            if created_from and datetime.fromisoformat(entry["end"]) <= created_from:
+                continue
+            if created_to and datetime.fromisoformat(entry["start"]) >= created_to:
+                continue
+            path = os.path.join(archive_dir, entry["file"])
+            if profile_id and entry.get("index"):
+                index = ArchiveService.load_index(os.path.join(archive_dir, entry["index"]))
+                batches = index.batches_for(uuid.UUID(profile_id))
+                rows = ArchiveService._read_batches(path, entry["format"], index, batches, filters)
+            else:
+                rows = ArchiveService._read_file(path, entry["format"], filters)
+            for row in rows:
+                if created_from and row["created_at"] < created_from:
+                    continue
+                if created_to and row["created_at"] >= created_to:
+                    continue
+                yield row
+
+    @staticmethod
+    def _read_file(path: str, archive_format: str, filters: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        if archive_format == "parquet":
+            conditions = [(field, "==", value) for field, value in filters.items()] or None
+            for batch in _pyarrow().parquet.read_table(path, filters=conditions).to_batches():
+                for row in batch.to_pylist():
+                    row["address"] = orjson.loads(row["address"])
+                    yield ArchiveService._decode(row)
+            return
+        with gzip.open(path, "rb") as archive:
+            for line in archive:
+                row = orjson.loads(line)
+                if ArchiveService._matches(row, filters):
+                    yield ArchiveService._decode(row)
+
+    @staticmethod
+    def _read_batches(
+        path: str,
+        archive_format: str,
+        index: ArchiveIndex,
+        batches: Sequence[int],
+        filters: Dict[str, str]
+    ) -> Iterator[Dict[str, Any]]:
+        if archive_format == "parquet":
+            parquet_file = _pyarrow().parquet.ParquetFile(path)
+            for batch in batches:
+                for row in parquet_file.read_row_group(batch).to_pylist():
+                    if ArchiveService._matches(row, filters):
+                        row["address"] = orjson.loads(row["address"])
+                        yield ArchiveService._decode(row)
+            return
+        with open(path, "rb") as archive:
+            for batch in batches:
+                archive.seek(index.offsets[batch])
+                member = archive.read(index.offsets[batch + 1] - index.offsets[batch])
+                for line in gzip.decompress(member).splitlines():
+                    row = orjson.loads(line)
+                    if ArchiveService._matches(row, filters):
+                        yield ArchiveService._decode(row)
+
+    @staticmethod
+    def _matches(row: Dict[str, Any], filters: Dict[str, str]) -> bool:
+        return all(row.get(field) == value for field, value in filters.items())
+
+    @staticmethod
+    def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+        for field in UUID_FIELDS:
+            row[field] = uuid.UUID(row[field])
+        for field in DATETIME_FIELDS:
+            if isinstance(row[field], str):
+                row[field] = datetime.fromisoformat(row[field])
+        return row
+
+    @staticmethod
+    def to_application(row: Dict[str, Any]) -> Application:
+        """A transient, read-only Application for an archived row"""
+        return Application(**row)
+
+    @staticmethod
+    async def fetch_page(
+        filters: Dict[str, str],
+        columns: Sequence[Any],
+        descending: bool,
+        after: Optional[Sequence[Any]],
+        limit: int
+    ) -> List[Application]:
+        """The first ``limit`` archived rows after the cursor in keyset order"""
+        def key(row):
+            return tuple(row[column.key] for column in columns)
+
+        def collect():
+            created_from = None
+            if after is not None and not descending and columns[0].key == "created_at":
+                # Skip whole files before the cursor
+                created_from = after[0]
+            rows = ArchiveService.iter_rows(filters, created_from)
+            if after is not None:
+                bound = tuple(after)
+                rows = (row for row in rows if (key(row) < bound if descending else key(row) > bound))
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            return [ArchiveService.to_application(row) for row in pick(limit, rows, key=key)]
+
+        return await run_in_threadpool(collect)
+
+    @staticmethod
+    async def find(application_id: uuid.UUID, profile_id: uuid.UUID) -> Optional[Application]:
+        """The profile's archived application, read from the one batch the index points to.
+
+        Archives without an index are not searched; ``index-archives`` adds one.
+        """
+        def first():
+            archive_dir = settings.application_archive_dir
+            for entry in ArchiveService.entries(archive_dir):
+                if not entry.get("index"):
+                    continue
+                index = ArchiveService.load_index(os.path.join(archive_dir, entry["index"]))
+                batch = index.batch_of(application_id, profile_id)
+                if batch is None:
+                    continue
+                path = os.path.join(archive_dir, entry["file"])
+                filters = ArchiveService.filters(id=application_id)
+                for row in ArchiveService._read_batches(path, entry["format"], index, [batch], filters):
+                    return ArchiveService.to_application(row)
+            return None
+
+        return await run_in_threadpool(first)
+
+    @staticmethod
+    def index_archives(archive_dir: str, chunk_size: int = 1000) -> List[str]:
+        """Rewrite archives recorded without an index as indexed batches; returns their partitions"""
+        indexed = []
+        for partition, entry in list(ArchiveService.load_manifest(archive_dir)["partitions"].items()):
+            if entry.get("index"):
+                continue
+            path = os.path.join(archive_dir, entry["file"])
+            # The old file stays open for reading until the new one replaces it
+            rows = ArchiveService._read_file(path, entry["format"], {})
+            writer = ArchiveWriter(path, entry["format"])
+            try:
+                while True:
+                    batch = list(itertools.islice(rows, chunk_size))
+                    if not batch:
+                        break
+                    writer.write(batch)
+            except BaseException:
+                writer.abort()
+                raise
+            writer.close()
+            entry = {**entry, "index": ArchiveService.index_name(entry["file"])}
+            ArchiveService.save_entry(archive_dir, partition, entry)
+            indexed.append(partition)
+        return indexed
+
+    @staticmethod
+    async def iter_chunks(
+        filters: Dict[str, str],
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Archived rows in batches, each read off the event loop"""
+        rows = ArchiveService.iter_rows(filters, created_from, created_to)
+        while True:
+            chunk = await run_in_threadpool(lambda: list(itertools.islice(rows, chunk_size)))
+            if not chunk:
+                return
+            yield chunk
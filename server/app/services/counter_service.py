@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, Optional
+import uuid
+from sqlalchemy import select, update, func, case, cast, union_all, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import bump_profile_version
+from app.models import Application, ApplicationArchiveCount, ApplicationCounter, UserProfile
+
+STATUSES = ("pending", "approved", "rejected")
+COUNTER_FIELDS = ("total",) + STATUSES
+
+
+class ApplicationCounterService:
+    @staticmethod
+    def create_for_profile(db: AsyncSession, profile_id: uuid.UUID) -> None:
+        """Add an empty counter row for a new profile"""
+        db.add(ApplicationCounter(user_profile_id=profile_id, total=0, pending=0, approved=0, rejected=0))
+
+    @staticmethod
+    async def record_created(db: AsyncSession, profile_id: uuid.UUID, status: str = "pending", count: int = 1) -> None:
+        await ApplicationCounterService._apply(db, profile_id, {"total": count, status: count})
+
+    @staticmethod
+    async def record_deleted(db: AsyncSession, profile_id: uuid.UUID, status: str) -> None:
+        await ApplicationCounterService._apply(db, profile_id, {"total": -1, status: -1})
+
+    @staticmethod
+    async def record_status_change(db: AsyncSession, profile_id: uuid.UUID, old_status: str, new_status: str) -> None:
+        if old_status == new_status:
+            return
+        await ApplicationCounterService._apply(db, profile_id, {old_status: -1, new_status: 1})
+
+    @staticmethod
+    async def get_counts(db: AsyncSession, profile_id: uuid.UUID) -> Dict[str, int]:
+        """Read counters with a single primary-key lookup"""
+        counter = await db.get(ApplicationCounter, profile_id)
+        if counter is None and db.info.get("read_only"):
+            # Replica sessions cannot repair the row; count from source instead
+            row = (await db.execute(ApplicationCounterService.counts_query([profile_id]))).first()
+            return {field: getattr(row, field) if row else 0 for field in COUNTER_FIELDS}
+        if counter is None:
+            await ApplicationCounterService.reconcile(db, [profile_id])
+            counter = await db.get(ApplicationCounter, profile_id)
+        return {field: getattr(counter, field) for field in COUNTER_FIELDS}
+
+    @staticmethod
+    async def _apply(db: AsyncSession, profile_id: uuid.UUID, deltas: Dict[str, int]) -> None:
+        result = await db.execute(
+            update(ApplicationCounter)
+            .where(ApplicationCounter.user_profile_id == profile_id)
+            .values({field: getattr(ApplicationCounter, field) + delta for field, delta in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # Missing row (profile predates the counters table): rebuild it from source rows.
+            # Callers make the change in the session first, so the recount (after autoflush) includes it
+            await ApplicationCounterService.reconcile(db, [profile_id])
+
+    @staticmethod
+    async def reconcile(
+        db: AsyncSession,
+        profile_ids: Optional[Iterable[uuid.UUID]] = None,
+        batch_size: int = 1000
+    ) -> int:
+        """Recompute counters from applications and repair drifted rows.
+
+        Profiles are processed in primary-key batches; returns the number of
+        counter rows that were inserted or corrected. With ``profile_ids`` the
+        repair joins the caller's transaction. Without, every profile is swept
+        and each batch is committed, so the counter row locks taken by a batch
+        do not block writers for the rest of the sweep.
+        """
+        repaired = 0
+        if profile_ids is not None:
+            ids = list(profile_ids)
+            for start in range(0, len(ids), batch_size):
+                repaired += await ApplicationCounterService._reconcile_batch(db, ids[start:start + batch_size])
+            return repaired
+
+        last_id = None
+        while True:
+            query = select(UserProfile.id).order_by(UserProfile.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(UserProfile.id > last_id)
+            ids = (await db.execute(query)).scalars().all()
+            if not ids:
+                return repaired
+            repaired += await ApplicationCounterService._reconcile_batch(db, ids)
+            await db.commit()
+            last_id = ids[-1]
+
+    @staticmethod
+    def counts_query(profile_ids: list):
+        """Per-profile totals computed from applications, including archived ones"""
+        live = (
+            select(
+                Application.user_profile_id,
+                func.count(Application.id).label("total"),
+                *[
+                    func.count(case((Application.status == status, 1))).label(status)
+                    for status in STATUSES
+                ]
+            )
+            .where(Application.user_profile_id.in_(profile_ids))
+            .group_by(Application.user_profile_id)
+        )
+        archived = (
+            select(
+                ApplicationArchiveCount.user_profile_id,
+                *[getattr(ApplicationArchiveCount, field) for field in COUNTER_FIELDS]
+            )
+            .where(ApplicationArchiveCount.user_profile_id.in_(profile_ids))
+        )
+        combined = union_all(live, archived).subquery()
+        return (
+            select(
+                combined.c.user_profile_id,
+                *[cast(func.sum(combined.c[field]), Integer).label(field) for field in COUNTER_FIELDS]
+            )
+            .group_by(combined.c.user_profile_id)
+        )
+
+    @staticmethod
+    async def _reconcile_batch(db: AsyncSession, profile_ids: list) -> int:
+        # Lock the counter rows before counting. A writer that already changed
+        # one holds its lock, so this waits for it to commit and then counts its
+        # rows; a writer that comes later applies its delta on top of the repair
+        stored_result = await db.execute(
+            select(ApplicationCounter)
+            .where(ApplicationCounter.user_profile_id.in_(profile_ids))
+            .order_by(ApplicationCounter.user_profile_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        stored = {counter.user_profile_id: counter for counter in stored_result.scalars()}
+
+        actual_result = await db.execute(ApplicationCounterService.counts_query(profile_ids))
+        actual = {row.user_profile_id: {field: getattr(row, field) for field in COUNTER_FIELDS} for row in actual_result}
+
+        repaired = 0
+        corrected = []
+        empty = {field: 0 for field in COUNTER_FIELDS}
+        for profile_id in profile_ids:
+            expected = actual.get(profile_id, empty)
+            counter = stored.get(profile_id)
+            if counter is None:
+                db.add(ApplicationCounter(user_profile_id=profile_id, **expected))
+                repaired += 1
+            elif any(getattr(counter, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(counter, field, value)
+                corrected.append(profile_id)
+                repaired += 1
+        if corrected:
+            # Counts already served (ETags, cached responses) change with the repair
+            await bump_profile_version(db, *corrected)
+        await db.flush()
+        return repaired
@@ -0,0 +1,302 @@
+import hashlib
+import re
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import BigInteger, DateTime, select, delete, insert, and_, any_, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.pagination import paginate
+from app.models import Application, ApplicationFingerprint, ApplicationLSHBucket
+
+# Character shingles suit short, free-form descriptions better than word n-grams
+SHINGLE_SIZE = 4
+NUM_HASHES = 64
+# 16 bands of 4 rows: pairs with similarity around 0.5 and up share a band
+# bucket with high probability, unrelated texts almost never do
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+SIGNATURE_FORMAT = f"<{NUM_HASHES}I"
+BAND_FORMAT = f"<{ROWS_PER_BAND}I"
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+WORDS = re.compile(r"\w+")
+
+
+def geohash(latitude: float, longitude: float, precision: int) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell, bits, value, even = [], 0, 0, True
+    while len(cell) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            cell.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(cell)
+
+
+def geohash_bounds(cell: str) -> Tuple[float, float, float, float]:
+    """(south, north, west, east) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lon_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbourhood(cell: str) -> List[str]:
+    """The cell and its eight neighbours, so points near a cell edge still meet"""
+    south, north, west, east = geohash_bounds(cell)
+    latitude, longitude = (south + north) / 2, (west + east) / 2
+    height, width = north - south, east - west
+    return list(dict.fromkeys(
+        geohash(latitude + dy * height, longitude + dx * width, len(cell))
+        for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+    ))
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    """MinHash signature of the text's character shingles.
+
+    One SHAKE-256 digest per shingle supplies all the hash functions at
+    once, and the column-wise minimum runs in C via ``zip``.
+    """
+    normalized = " ".join(WORDS.findall(text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    rows = [
+        struct.unpack(SIGNATURE_FORMAT, hashlib.shake_256(shingle.encode()).digest(NUM_HASHES * 4))
+        for shingle in shingles
+    ]
+    return tuple(map(min, zip(*rows)))
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(SIGNATURE_FORMAT, *signature)
+
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    return struct.unpack(SIGNATURE_FORMAT, data)
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the two signatures' shingle sets"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+
+def band_hashes(signature: Sequence[int]) -> List[int]:
+    """One 64-bit hash per band of the signature"""
+    return [
+        int.from_bytes(hashlib.blake2b(
+            struct.pack(BAND_FORMAT, *signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]),
+            digest_size=8, person=f"band:{band}".encode()
+        ).digest(), "little")
+        for band in range(BANDS)
+    ]
+
+
+def lsh_buckets(bands: Sequence[int], cell: str) -> List[int]:
+    """The bands' buckets within a geohash cell, as signed 64-bit ints.
+
+    Band hashes are combined with a hash of the cell, so looking up a cell's
+    neighbours costs one hash per cell rather than one per cell and band.
+    """
+    cell_key = int.from_bytes(hashlib.blake2b(cell.encode(), digest_size=8).digest(), "little")
+    # BIGINT is signed
+    return [(band ^ cell_key) - (1 << 63) * 2 * ((band ^ cell_key) >> 63) for band in bands]
+
+
+class DuplicateMatch(NamedTuple):
+    application_id: object
+    duplicate_of_id: object
+    similarity: float
+
+
+class DuplicateService:
+    @staticmethod
+    def location_cell(address: dict) -> Optional[str]:
+        latitude, longitude = address.get("latitude"), address.get("longitude")
+        if latitude is None or longitude is None:
+            return None
+        return geohash(float(latitude), float(longitude), settings.duplicate_geohash_precision)
+
+    @staticmethod
+    async def check_and_record(db: AsyncSession, applications: Iterable) -> List[DuplicateMatch]:
+        """Flag new applications that repeat a recent one nearby, and index them.
+
+        Candidates come from one lookup of the LSH buckets of each
+        application's cell and its neighbours within the time window, so the
+        cost does not grow with the history of a profile or a city.
+        Applications without coordinates are skipped.
+        """
+        entries = []
+        for application in applications:
+            cell = DuplicateService.location_cell(application.address)
+            if cell is None:
+                continue
+            signature = minhash(application.description)
+            entries.append((application, cell, signature))
+        if not entries:
+            return []
+
+        now = datetime.utcnow()
+        cutoff = now - timedelta(hours=settings.duplicate_window_hours)
+        bands = {id(application): band_hashes(signature) for application, _, signature in entries}
+        lookups = {
+            id(application): {
+                bucket for neighbour in geohash_neighbourhood(cell) for bucket in lsh_buckets(bands[id(application)], neighbour)
+            }
+            for application, cell, _ in entries
+        }
+        candidates = await DuplicateService._candidates(db, set().union(*lookups.values()), cutoff)
+
+        matches = []
+        fingerprints, bucket_rows = [], []
+        for application, cell, signature in entries:
+            own_buckets = set(lsh_buckets(bands[id(application)], cell))
+            best: Optional[Tuple[float, object]] = None
+            for candidate_id, (candidate_signature, candidate_buckets) in candidates.items():
+                if candidate_buckets.isdisjoint(lookups[id(application)]):
+                    continue
+                score = similarity(signature, candidate_signature)
+                if score >= settings.duplicate_similarity_threshold and (best is None or score > best[0]):
+                    best = (score, candidate_id)
+            if best is not None:
+                matches.append(DuplicateMatch(application.id, best[1], best[0]))
+            created_at = application.created_at or now
+            fingerprints.append({
+                "application_id": application.id,
+                "user_profile_id": application.user_profile_id,
+                "geohash": cell,
+                "signature": pack_signature(signature),
+                "created_at": created_at,
+                "duplicate_of_id": best[1] if best else None,
+                "similarity": best[0] if best else None,
+            })
+            bucket_rows.extend((bucket, application.id, created_at) for bucket in own_buckets)
+            # Later applications in the same batch are compared with this one too
+            candidates[application.id] = (signature, own_buckets)
+
+        await db.execute(insert(ApplicationFingerprint), fingerprints)
+        await DuplicateService._insert_buckets(db, bucket_rows)
+        return matches
+
+    @staticmethod
+    async def _candidates(
+        db: AsyncSession,
+        buckets: set,
+        cutoff: datetime
+    ) -> Dict[object, Tuple[Tuple[int, ...], set]]:
+        if db.bind.dialect.name == "postgresql":
+            # One array parameter: the statement text, and so its prepared plan, never changes
+            in_buckets = ApplicationLSHBucket.bucket == any_(literal(list(buckets), ARRAY(BigInteger)))
+        else:
+            in_buckets = ApplicationLSHBucket.bucket.in_(buckets)
+        rows = (await db.execute(
+            select(ApplicationLSHBucket.application_id, ApplicationLSHBucket.bucket, ApplicationFingerprint.signature)
+            .join(
+                ApplicationFingerprint,
+                ApplicationFingerprint.application_id == ApplicationLSHBucket.application_id
+            )
+            .where(in_buckets, ApplicationLSHBucket.created_at >= cutoff)
+        )).all()
+        candidates: Dict[object, Tuple[Tuple[int, ...], set]] = {}
+        for application_id, bucket, signature in rows:
+            if application_id not in candidates:
+                candidates[application_id] = (unpack_signature(signature), set())
+            candidates[application_id][1].add(bucket)
+        return candidates
+
+    @staticmethod
+    async def _insert_buckets(db: AsyncSession, rows: List[Tuple[int, object, datetime]]) -> None:
+        buckets = ApplicationLSHBucket.__table__
+        if db.bind.dialect.name == "postgresql":
+            # One INSERT ... SELECT over parallel arrays rather than a row per bucket
+            columns = list(zip(*rows))
+            values = func.unnest(
+                literal(list(columns[0]), ARRAY(BigInteger)),
+                literal(list(columns[1]), ARRAY(UUID(as_uuid=True))),
+                literal(list(columns[2]), ARRAY(DateTime))
+            ).table_valued("bucket", "application_id", "created_at").render_derived()
+            await db.execute(insert(buckets).from_select(["bucket", "application_id", "created_at"], select(values)))
+            return
+        await db.execute(
+            insert(buckets),
+            [{"bucket": bucket, "application_id": application_id, "created_at": created_at}
+             for bucket, application_id, created_at in rows]
+        )
+
+    @staticmethod
+    async def flagged_page(db: AsyncSession, after: Optional[Sequence], page_size: int) -> List[ApplicationFingerprint]:
+        """One keyset page of flagged fingerprints, newest first, plus a lookahead row.
+
+        Served by the partial index on flagged rows, whatever the table's size.
+        """
+        columns = (ApplicationFingerprint.created_at, ApplicationFingerprint.application_id)
+        query = select(ApplicationFingerprint).where(ApplicationFingerprint.duplicate_of_id.is_not(None))
+        return list((await db.execute(paginate(query, columns, True, after, page_size))).scalars())
+
+    @staticmethod
+    async def load_applications(db: AsyncSession, fingerprints: Sequence[ApplicationFingerprint]) -> Dict[object, Application]:
+        """Flagged applications and the ones they repeat, by id, in one query"""
+        ids = {fingerprint.application_id for fingerprint in fingerprints}
+        ids.update(fingerprint.duplicate_of_id for fingerprint in fingerprints)
+        if not ids:
+            return {}
+        result = await db.execute(select(Application).where(Application.id.in_(ids)))
+        return {application.id: application for application in result.scalars()}
+
+    @staticmethod
+    async def forget(db: AsyncSession, applications: Iterable) -> None:
+        """Drop fingerprints of deleted applications so nothing matches them.
+
+        Their LSH buckets expire with the window; candidates without a
+        fingerprint are never matched.
+        """
+        ids = [application.id for application in applications if DuplicateService.location_cell(application.address)]
+        if ids:
+            await db.execute(delete(ApplicationFingerprint).where(ApplicationFingerprint.application_id.in_(ids)))
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession, batch_size: int = 5000) -> int:
+        """Delete LSH buckets and unflagged fingerprints older than the window, in batches.
+
+        Flagged fingerprints are kept for reviewers.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.duplicate_window_hours)
+        deleted = 0
+        for model, key, conditions in (
+            (ApplicationLSHBucket, ApplicationLSHBucket.bucket, (ApplicationLSHBucket.created_at < cutoff,)),
+            (
+                ApplicationFingerprint,
+                ApplicationFingerprint.application_id,
+                (ApplicationFingerprint.created_at < cutoff, ApplicationFingerprint.duplicate_of_id.is_(None))
+            ),
+        ):
+            while True:
+                expired = select(key).where(and_(*conditions)).limit(batch_size)
+                keys = (await db.execute(expired)).scalars().all()
+                if not keys:
+                    break
+                result = await db.execute(delete(model).where(key.in_(keys), *conditions))
+                await db.commit()
+                deleted += result.rowcount
+        return deleted
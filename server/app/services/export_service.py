@@ -0,0 +1,118 @@
+import csv
+import io
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Application
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+EXPORT_COLUMNS = (
+    Application.id,
+    Application.user_profile_id,
+    Application.status,
+    Application.address,
+    Application.description,
+    Application.image_urls,
+    Application.created_at,
+    Application.updated_at,
+)
+# Archived rows are dicts; give them the attribute and _asdict() access of a result row
+ExportRow = namedtuple("ExportRow", [column.key for column in EXPORT_COLUMNS])
+CSV_HEADER = ["id", "user_profile_id", "status", "city", "address", "description", "image_urls", "created_at", "updated_at"]
+
+
+class ExportService:
+    @staticmethod
+    def build_query(
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        region: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ):
+        """Column-only select over applications; ``created_to`` is exclusive"""
+        conditions = ExportService.filter_conditions(status, city, region, created_from, created_to)
+        return select(*EXPORT_COLUMNS).where(*conditions).order_by(Application.created_at)
+
+    @staticmethod
+    def filter_conditions(
+        status: Optional[str] = None,
+        city: Optional[str] = None,
+        region: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> list:
+        conditions = []
+        if status:
+            conditions.append(Application.status == status)
+        if city:
+            conditions.append(Application.city == city)
+        if region:
+            conditions.append(Application.region == region)
+        if created_from:
+            conditions.append(Application.created_at >= created_from)
+        if created_to:
+            conditions.append(Application.created_at < created_to)
+        return conditions
+
+    @staticmethod
+    async def stream(
+        db: AsyncSession,
+        query,
+        export_format: str,
+        chunk_size: int = 1000,
+        archived: Optional[AsyncIterator[List[Dict[str, Any]]]] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield encoded chunks of ``chunk_size`` rows from a server-side cursor.
+
+        Only one partition of rows is held in memory at a time; the consumer
+        awaiting each chunk provides the backpressure. Batches from
+        ``archived`` (older than any live row) are written first.
+        """
+        encode = ExportService.encode_csv if export_format == "csv" else ExportService.encode_ndjson
+        if export_format == "csv":
+            yield ExportService._csv_bytes([CSV_HEADER])
+
+        if archived is not None:
+            async for rows in archived:
+                yield encode([ExportRow(**{field: row[field] for field in ExportRow._fields}) for row in rows])
+
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield encode(rows)
+
+    @staticmethod
+    def encode_ndjson(rows: Sequence) -> bytes:
+        # default=str covers driver-specific UUID types (asyncpg's is not a uuid.UUID)
+        return b"".join(orjson.dumps(row._asdict(), default=str) + b"\n" for row in rows)
+
+    @staticmethod
+    def encode_csv(rows: Sequence) -> bytes:
+        return ExportService._csv_bytes(ExportService._csv_row(row) for row in rows)
+
+    @staticmethod
+    def _csv_bytes(records: Iterable) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(records)
+        return buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _csv_row(row) -> List:
+        address = row.address or {}
+        return [
+            row.id,
+            row.user_profile_id,
+            row.status,
+            address.get("city", ""),
+            address.get("address", ""),
+            row.description,
+            " ".join(row.image_urls or []),
+            row.created_at.isoformat(),
+            row.updated_at.isoformat(),
+        ]
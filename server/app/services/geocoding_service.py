@@ -1,10 +1,15 @@
 import asyncio
 from typing import Optional, List, Dict, Any
-import httpx
 from app.core.config import settings
 from app.schemas.address import AddressSchema
 
 
+def _httpx():
+    """Import httpx on the first lookup; only geocoding needs it, so it stays off the startup path"""
+    import httpx
+    return httpx
+
+
 class GeocodingService:
     def __init__(self):
         self.base_url = settings.nominatim_base_url
@@ -35,7 +40,7 @@ class GeocodingService:
         
         headers = {"User-Agent": self.user_agent}
         
-        async with httpx.AsyncClient() as client:
+        async with _httpx().AsyncClient() as client:
             try:
                 response = await client.get(
                     f"{self.base_url}/search",
@@ -63,7 +68,7 @@ class GeocodingService:
         
         headers = {"User-Agent": self.user_agent}
         
-        async with httpx.AsyncClient() as client:
+        async with _httpx().AsyncClient() as client:
             try:
                 response = await client.get(
                     f"{self.base_url}/reverse",
@@ -0,0 +1,371 @@
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+try:
+    import python_multipart as multipart
+except ImportError:  # pragma: no cover - python-multipart < 0.0.13
+    import multipart
+
+# Leading bytes of the image formats accepted, with the extension each is stored under
+SIGNATURES = (
+    (0, b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (8, b"WEBP", "webp", "image/webp"),
+    (4, b"ftypheic", "heic", "image/heic"),
+    (4, b"ftypheix", "heic", "image/heic"),
+    (4, b"ftypmif1", "heic", "image/heic"),
+)
+CONTENT_TYPES = {extension: content_type for _, _, extension, content_type in SIGNATURES}
+SNIFF_BYTES = 12
+IMAGE_KEY = re.compile(r"^[0-9a-f]{64}\.(jpg|png|webp|heic)$")
+# Chunks are collected up to this size, then hashed and written off the event loop
+WRITE_BUFFER_BYTES = 256 * 1024
+MAX_FILES_PER_REQUEST = 10
+
+
+class ImageUploadError(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class StoredImage:
+    key: str
+    content_type: str
+    size: int
+    # False when identical bytes were already stored
+    created: bool
+
+    @property
+    def url(self) -> str:
+        return image_url(self.key)
+
+
+def image_url(key: str) -> str:
+    base = settings.image_public_base_url or "/api/images"
+    return f"{base.rstrip('/')}/{key}"
+
+
+def sniff_image(head: bytes) -> Optional[Tuple[str, str]]:
+    """(extension, content type) of an accepted image format, from its first bytes"""
+    for offset, signature, extension, content_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            if extension == "webp" and not head.startswith(b"RIFF"):
+                continue
+            return extension, content_type
+    return None
+
+
+class ImageWriter:
+    """Stream one upload to a temporary file, hashing it on the way.
+
+    At most ``WRITE_BUFFER_BYTES`` of the upload are held in memory; each
+    full buffer is hashed and written in a worker thread.
+    """
+
+    def __init__(self, temp_dir: str, max_bytes: int):
+        os.makedirs(temp_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.extension: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._buffer = bytearray()
+        fd, self.path = tempfile.mkstemp(dir=temp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise ImageUploadError(f"Image exceeds {self.max_bytes} bytes", status_code=413)
+        self._buffer += data
+        if self.extension is None and len(self._buffer) >= SNIFF_BYTES:
+            self._sniff()
+        if len(self._buffer) >= WRITE_BUFFER_BYTES:
+            await self._flush()
+
+    def _sniff(self) -> None:
+        detected = sniff_image(bytes(self._buffer[:SNIFF_BYTES]))
+        if detected is None:
+            raise ImageUploadError("Only JPEG, PNG, WebP and HEIC images are accepted", status_code=415)
+        self.extension, self.content_type = detected
+
+    async def _flush(self) -> None:
+        chunk, self._buffer = self._buffer, bytearray()
+        await run_in_threadpool(self._write_chunk, chunk)
+
+    def _write_chunk(self, chunk: bytearray) -> None:
+        # hashlib releases the GIL on large inputs, so this does not stall other threads
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    async def close(self) -> str:
+        """Finish the file and return its content-addressed key"""
+        if self.extension is None:
+            self._sniff()
+        await self._flush()
+        await run_in_threadpool(self._file.close)
+        return f"{self._hash.hexdigest()}.{self.extension}"
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class ImageStore:
+    """Content-addressed image storage: an image's key is the hash of its bytes"""
+
+    # Uploads are spooled here before being moved or copied into the store
+    temp_dir: str
+
+    async def put(self, writer: ImageWriter, key: str) -> bool:
+        """Store a finished upload under ``key``; False if it was already there"""
+        raise NotImplementedError
+
+    def local_copy(self, key: str):
+        """Async context manager yielding a local path of the image, or None if missing"""
+        raise NotImplementedError
+
+
+class LocalImageStore(ImageStore):
+    def __init__(self, root: str):
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    async def put(self, writer: ImageWriter, key: str) -> bool:
+        return await run_in_threadpool(self._put, writer.path, key)
+
+    def _put(self, temp_path: str, key: str) -> bool:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(temp_path)
+            return False
+        # Same filesystem, so the image appears complete or not at all
+        os.replace(temp_path, path)
+        return True
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Optional[str]]:
+        path = self.path(key)
+        yield path if os.path.exists(path) else None
+
+
+class S3ImageStore(ImageStore):
+    """Any S3-compatible object store; uploads are spooled to local disk first,
+    since an object's key is only known once all of its bytes are hashed.
+    """
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, temp_dir: Optional[str] = None):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.temp_dir = temp_dir or os.path.join(tempfile.gettempdir(), "image-uploads")
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:  # pragma: no cover - optional dependency
+                raise RuntimeError("The s3 image storage backend requires boto3")
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def presigned_url(self, key: str, expires_in: int = 3600) -> str:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+    async def put(self, writer: ImageWriter, key: str) -> bool:
+        try:
+            return await run_in_threadpool(self._put, writer.path, key, writer.content_type)
+        finally:
+            writer.abort()
+
+    def _put(self, temp_path: str, key: str, content_type: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return False
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise
+        # upload_file streams the file in parts; it is never read into memory whole
+        self.client.upload_file(temp_path, self.bucket, key, ExtraArgs={"ContentType": content_type})
+        return True
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Optional[str]]:
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.temp_dir, suffix=".part")
+        os.close(fd)
+        try:
+            found = await run_in_threadpool(self._download, key, path)
+            yield path if found else None
+        finally:
+            os.unlink(path)
+
+    def _download(self, key: str, path: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.download_file(self.bucket, key, path)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+
+def create_store() -> ImageStore:
+    backend = settings.image_storage_backend
+    if backend == "local":
+        return LocalImageStore(settings.image_storage_dir)
+    if backend == "s3":
+        if not settings.image_s3_bucket:
+            raise ValueError("IMAGE_S3_BUCKET is required for the s3 image storage backend")
+        return S3ImageStore(settings.image_s3_bucket, settings.image_s3_endpoint_url)
+    raise ValueError(f"Unknown image storage backend: {backend}")
+
+
+class ImageService:
+    @staticmethod
+    async def save_stream(store: ImageStore, chunks: AsyncIterator[bytes]) -> StoredImage:
+        """Stream one image into ``store``"""
+        writer = ImageWriter(store.temp_dir, settings.image_max_bytes)
+        try:
+            async for chunk in chunks:
+                await writer.write(chunk)
+            if writer.size == 0:
+                raise ImageUploadError("Empty image")
+            key = await writer.close()
+            created = await store.put(writer, key)
+        except BaseException:
+            writer.abort()
+            raise
+        return StoredImage(key, writer.content_type, writer.size, created)
+
+    @staticmethod
+    async def receive(
+        store: ImageStore,
+        content_type: str,
+        body: AsyncIterator[bytes],
+        max_files: int = MAX_FILES_PER_REQUEST
+    ) -> List[StoredImage]:
+        """Store the images in a request body as it arrives.
+
+        Takes either a single raw image (``Content-Type: image/*``) or a
+        ``multipart/form-data`` body whose file parts are each an image.
+        The body is parsed incrementally, so no part is ever buffered whole.
+        """
+        media_type, options = multipart.multipart.parse_options_header(content_type or "")
+        if media_type.startswith(b"image/"):
+            return [await ImageService.save_stream(store, body)]
+        if media_type != b"multipart/form-data" or b"boundary" not in options:
+            raise ImageUploadError("Send an image or multipart/form-data", status_code=415)
+        return await ImageService._receive_multipart(store, options[b"boundary"], body, max_files)
+
+    @staticmethod
+    async def _receive_multipart(
+        store: ImageStore,
+        boundary: bytes,
+        body: AsyncIterator[bytes],
+        max_files: int
+    ) -> List[StoredImage]:
+        # The parser's callbacks are synchronous: they queue events that are
+        # then acted on (and written out) after each chunk is parsed
+        events: List[Tuple[str, bytes]] = []
+        header = {"field": b"", "value": b""}
+        headers: List[Tuple[bytes, bytes]] = []
+
+        def on_header_field(data: bytes, start: int, end: int) -> None:
+            header["field"] += data[start:end]
+
+        def on_header_value(data: bytes, start: int, end: int) -> None:
+            header["value"] += data[start:end]
+
+        def on_header_end() -> None:
+            headers.append((header["field"].lower(), header["value"]))
+            header["field"] = header["value"] = b""
+
+        def on_headers_finished() -> None:
+            disposition = dict(headers).get(b"content-disposition", b"")
+            _, params = multipart.multipart.parse_options_header(disposition)
+            headers.clear()
+            events.append(("begin", params.get(b"filename", b"")))
+
+        def on_part_data(data: bytes, start: int, end: int) -> None:
+            # A view, not a copy: the chunk is alive until its events are handled
+            events.append(("data", memoryview(data)[start:end]))
+
+        def on_part_end() -> None:
+            events.append(("end", b""))
+
+        def on_end() -> None:
+            events.append(("finish", b""))
+
+        parser = multipart.MultipartParser(boundary, {
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_end": on_end,
+        })
+        images: List[StoredImage] = []
+        writer: Optional[ImageWriter] = None
+        finished = False
+        try:
+            async for chunk in body:
+                parser.write(chunk)
+                for kind, data in events:
+                    if kind == "begin" and data:
+                        # Only file parts are images; plain form fields are ignored
+                        if len(images) >= max_files:
+                            raise ImageUploadError(f"At most {max_files} images per request")
+                        writer = ImageWriter(store.temp_dir, settings.image_max_bytes)
+                    elif kind == "data" and writer is not None:
+                        await writer.write(data)
+                    elif kind == "end" and writer is not None:
+                        if writer.size == 0:
+                            raise ImageUploadError("Empty image")
+                        key = await writer.close()
+                        created = await store.put(writer, key)
+                        images.append(StoredImage(key, writer.content_type, writer.size, created))
+                        writer = None
+                    elif kind == "finish":
+                        finished = True
+                events.clear()
+            parser.finalize()
+            # finalize() does not check the closing boundary arrived; without
+            # it the body was cut off, possibly in the middle of an image
+            if not finished:
+                raise ImageUploadError("Incomplete multipart body")
+        except multipart.exceptions.MultipartParseError as e:
+            raise ImageUploadError(f"Malformed multipart body: {e}")
+        finally:
+            if writer is not None:
+                writer.abort()
+        if not images:
+            raise ImageUploadError("No image in the request")
+        return images
+
+
+image_store = create_store()
@@ -0,0 +1,93 @@
+from datetime import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp
+from app.core.config import settings
+from app.core.middleware import RateLimitMiddleware
+from app.core.scheduler import Scheduler
+from app.db.base import async_session_maker
+from app.models import OTPRequest
+from app.services.counter_service import ApplicationCounterService
+from app.services.duplicate_service import DuplicateService
+from app.services.partition_service import PartitionService
+from app.services.status_event_service import StatusEventService
+
+
+class MaintenanceService:
+    @staticmethod
+    async def purge_expired_otps(db: AsyncSession, batch_size: int = 1000) -> int:
+        """Delete expired OTP requests in batches, committing each one.
+
+        Used codes expire like any other, so they go too. Short batches keep
+        row locks and WAL bursts small on a busy table.
+        """
+        deleted = 0
+        now = datetime.utcnow()
+        while True:
+            expired = select(OTPRequest.id).where(OTPRequest.expires_at < now).limit(batch_size)
+            ids = (await db.execute(expired)).scalars().all()
+            if not ids:
+                return deleted
+            await db.execute(delete(OTPRequest).where(OTPRequest.id.in_(ids)))
+            await db.commit()
+            deleted += len(ids)
+
+    @staticmethod
+    async def ensure_partitions() -> int:
+        """Create upcoming monthly partitions; safe to run from several workers at once"""
+        async with async_session_maker() as session:
+            created = await PartitionService.ensure_partitions(session)
+            await session.commit()
+            return len(created)
+
+    @staticmethod
+    def evict_stale_caches(app: ASGIApp) -> int:
+        """Drop per-client rate-limit windows that have fully expired"""
+        evicted = 0
+        layer = getattr(app, "middleware_stack", None)
+        while layer is not None:
+            if isinstance(layer, RateLimitMiddleware):
+                evicted += layer.evict_stale()
+            layer = getattr(layer, "app", None)
+        return evicted
+
+    @staticmethod
+    def register_jobs(scheduler: Scheduler, app: ASGIApp) -> None:
+        """Add the built-in maintenance jobs to ``scheduler``"""
+        async def purge_otps() -> int:
+            async with async_session_maker() as session:
+                return await MaintenanceService.purge_expired_otps(session)
+
+        async def reconcile_counters() -> int:
+            async with async_session_maker() as session:
+                return await ApplicationCounterService.reconcile(session)
+
+        async def purge_status_events() -> int:
+            async with async_session_maker() as session:
+                return await StatusEventService.purge_expired(session)
+
+        async def purge_duplicate_fingerprints() -> int:
+            async with async_session_maker() as session:
+                return await DuplicateService.purge_expired(session)
+
+        async def evict_caches() -> int:
+            return MaintenanceService.evict_stale_caches(app)
+
+        scheduler.add_job("purge_expired_otps", settings.otp_purge_interval_seconds, purge_otps)
+        scheduler.add_job("reconcile_counters", settings.counter_reconcile_interval_seconds, reconcile_counters)
+        # Off the startup path: until it runs, new months land in the default partition.
+        # Also runs when a worker takes over leadership, so a new leader does not wait a day
+        scheduler.add_job(
+            "ensure_partitions", settings.partition_maintenance_interval_seconds, MaintenanceService.ensure_partitions,
+            run_on_start=True
+        )
+        scheduler.add_job(
+            "purge_status_events", settings.status_event_purge_interval_seconds, purge_status_events
+        )
+        scheduler.add_job(
+            "purge_duplicate_fingerprints", settings.duplicate_purge_interval_seconds, purge_duplicate_fingerprints
+        )
+        # Caches live in each worker's memory, so every worker evicts its own
+        scheduler.add_job(
+            "evict_stale_caches", settings.cache_eviction_interval_seconds, evict_caches, leader_only=False
+        )
@@ -0,0 +1,208 @@
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, func, case, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Application, ApplicationArchiveCount
+from app.services.archive_service import ARCHIVE_COLUMNS, ArchiveService, ArchiveWriter
+from app.services.counter_service import COUNTER_FIELDS, STATUSES
+
+DEFAULT_PARTITION = "applications_default"
+PARTITION_NAME = re.compile(r"^applications_y(\d{4})m(\d{2})$")
+# Everything but the generated columns, which the database fills in on insert
+STORED_COLUMNS = ", ".join(column.name for column in Application.__table__.columns if column.computed is None)
+# Serialises partition DDL between workers starting at the same time
+PARTITION_LOCK_KEY = 0x61707073
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def is_partition(table_name: str) -> bool:
+    return table_name == DEFAULT_PARTITION or PARTITION_NAME.match(table_name) is not None
+
+
+class PartitionService:
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"applications_y{month.year:04d}m{month.month:02d}"
+
+    @staticmethod
+    def partition_month(table_name: str) -> Optional[date]:
+        match = PARTITION_NAME.match(table_name)
+        return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+    @staticmethod
+    def is_supported(db: AsyncSession) -> bool:
+        """Applications are only partitioned on PostgreSQL"""
+        return db.bind.dialect.name == "postgresql"
+
+    @staticmethod
+    async def list_partitions(db: AsyncSession) -> List[str]:
+        """Monthly partitions currently attached to applications, oldest first"""
+        result = await db.execute(text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'applications'
+        """))
+        return sorted(name for name in result.scalars() if PARTITION_NAME.match(name))
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, start: Optional[date] = None, months_ahead: int = 3) -> List[str]:
+        """Create missing monthly partitions from ``start`` (this month by default)
+        through ``months_ahead`` months from now; returns the names created.
+        """
+        if not PartitionService.is_supported(db):
+            return []
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        existing = set(await PartitionService.list_partitions(db))
+        this_month = month_start(datetime.utcnow())
+        month = month_start(start or this_month)
+        created = []
+        while month <= add_months(this_month, months_ahead):
+            name = PartitionService.partition_name(month)
+            if name not in existing:
+                await PartitionService._create_partition(db, month)
+                created.append(name)
+            month = add_months(month, 1)
+        return created
+
+    @staticmethod
+    async def _create_partition(db: AsyncSession, month: date) -> None:
+        name = PartitionService.partition_name(month)
+        bounds = {"lower": month, "upper": add_months(month, 1)}
+        ddl = f"CREATE TABLE {name} PARTITION OF applications FOR VALUES FROM ('{month}') TO ('{bounds['upper']}')"
+        in_range = "created_at >= :lower AND created_at < :upper"
+        stray = await db.scalar(text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        if not stray:
+            await db.execute(text(ddl))
+            return
+        # The default partition may not hold rows that belong to a new partition:
+        # take it out, create the partition and route its rows back through the parent
+        await db.execute(text(f"ALTER TABLE applications DETACH PARTITION {DEFAULT_PARTITION}"))
+        await db.execute(text(ddl))
+        await db.execute(text(
+            f"INSERT INTO applications ({STORED_COLUMNS}) "
+            f"SELECT {STORED_COLUMNS} FROM {DEFAULT_PARTITION} WHERE {in_range}"
+        ), bounds)
+        await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        await db.execute(text(f"ALTER TABLE applications ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+    @staticmethod
+    async def archive_expired(
+        db: AsyncSession,
+        archive_dir: str,
+        retention_months: int,
+        archive_format: str = "ndjson",
+        chunk_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Export partitions older than the retention window to files and drop them.
+
+        Each partition is written and recorded in the manifest before the
+        transaction that detaches it; readers only see manifest entries marked
+        complete, which happens after that transaction commits. A run
+        interrupted in between is finished by the next one.
+        """
+        if not PartitionService.is_supported(db):
+            return []
+        os.makedirs(archive_dir, exist_ok=True)
+        cutoff = add_months(month_start(datetime.utcnow()), -retention_months)
+        partitions = await PartitionService.list_partitions(db)
+        await db.commit()
+
+        # Entries left incomplete by an interrupted run whose partition is already gone
+        for name, entry in ArchiveService.load_manifest(archive_dir)["partitions"].items():
+            if not entry["complete"] and name not in partitions:
+                ArchiveService.save_entry(archive_dir, name, {**entry, "complete": True})
+
+        archived = []
+        for name in partitions:
+            month = PartitionService.partition_month(name)
+            if add_months(month, 1) > cutoff:
+                continue
+            entry = await PartitionService._archive_partition(db, name, month, archive_dir, archive_format, chunk_size)
+            ArchiveService.save_entry(archive_dir, name, {**entry, "complete": True})
+            archived.append(entry)
+        return archived
+
+    @staticmethod
+    async def _archive_partition(
+        db: AsyncSession,
+        name: str,
+        month: date,
+        archive_dir: str,
+        archive_format: str,
+        chunk_size: int
+    ) -> Dict[str, Any]:
+        in_partition = (Application.created_at >= month, Application.created_at < add_months(month, 1))
+        # Writes to the month stop here; reads continue until the detach
+        await db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+
+        file_name = ArchiveService.file_name(name, archive_format)
+        writer = ArchiveWriter(os.path.join(archive_dir, file_name), archive_format)
+        try:
+            # Keyset batches rather than a server-side cursor: an open cursor
+            # on the partition would block dropping it in this transaction
+            after = None
+            while True:
+                query = select(*ARCHIVE_COLUMNS).where(*in_partition)
+                if after is not None:
+                    query = query.where(tuple_(Application.created_at, Application.id) > after)
+                rows = (await db.execute(
+                    query.order_by(Application.created_at, Application.id).limit(chunk_size)
+                )).all()
+                if not rows:
+                    break
+                writer.write([row._asdict() for row in rows])
+                after = tuple_(rows[-1].created_at, rows[-1].id)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+        expected = await db.scalar(select(func.count()).select_from(Application).where(*in_partition))
+        if writer.rows != expected:
+            raise RuntimeError(f"Archived {writer.rows} rows of {name}, expected {expected}")
+        entry = {
+            "file": file_name,
+            "index": ArchiveService.index_name(file_name),
+            "format": archive_format,
+            "start": month.isoformat(),
+            "end": add_months(month, 1).isoformat(),
+            "rows": writer.rows,
+            "archived_at": datetime.utcnow().isoformat(),
+            "complete": False,
+        }
+        ArchiveService.save_entry(archive_dir, name, entry)
+
+        # Archived rows stay counted: fold them into the per-profile archive totals
+        totals = (
+            select(
+                Application.user_profile_id,
+                func.count(Application.id),
+                *[func.count(case((Application.status == status, 1))) for status in STATUSES]
+            )
+            .where(*in_partition)
+            .group_by(Application.user_profile_id)
+        )
+        statement = insert(ApplicationArchiveCount).from_select(["user_profile_id", *COUNTER_FIELDS], totals)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[ApplicationArchiveCount.user_profile_id],
+            set_={
+                field: getattr(ApplicationArchiveCount, field) + getattr(statement.excluded, field)
+                for field in COUNTER_FIELDS
+            }
+        ))
+        await db.execute(text(f"ALTER TABLE applications DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        return entry
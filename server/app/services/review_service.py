@@ -0,0 +1,147 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from sqlalchemy import select, update, exists, func, any_, bindparam, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import bump_profile_version
+from app.models import Application, ApplicationCounter
+from app.services.counter_service import ApplicationCounterService, STATUSES
+from app.services.status_event_service import StatusEventService
+
+# Rows changed by one bulk status update; filter updates past it need another call
+BULK_STATUS_LIMIT = 10000
+
+
+class StatusChange(NamedTuple):
+    ids: List[uuid.UUID]
+    # Owners of the changed applications, whose counters and cached views moved
+    profile_ids: List[uuid.UUID]
+    # Stream events to dispatch once the transaction commits
+    events: List[Dict[str, Any]]
+    # More applications matched than the limit; the rest are unchanged
+    truncated: bool = False
+
+
+def _matches(column, values: Sequence[uuid.UUID], db: AsyncSession):
+    """``column = ANY(:values)`` on PostgreSQL: one array parameter however many ids"""
+    if db.bind.dialect.name == "postgresql":
+        return column == any_(literal(list(values), ARRAY(UUID(as_uuid=True))))
+    return column.in_(values)
+
+
+class ReviewService:
+    @staticmethod
+    async def bulk_update_status(
+        db: AsyncSession,
+        new_status: str,
+        ids: Optional[Sequence[uuid.UUID]] = None,
+        conditions: Sequence = (),
+        limit: int = BULK_STATUS_LIMIT
+    ) -> StatusChange:
+        """Set the status of the selected applications with one UPDATE.
+
+        Counters, the owners' data versions and stream events change in the
+        same transaction; the caller commits. Applications already in ``new_status`` are left
+        alone. At most ``limit`` rows change; ``truncated`` says whether more matched.
+        """
+        selected = [Application.status != new_status, *conditions]
+        if ids is not None:
+            selected.append(_matches(Application.id, ids, db))
+        if db.bind.dialect.name == "postgresql":
+            rows = await ReviewService._update_returning_old(db, new_status, selected, limit)
+        else:
+            rows = await ReviewService._update_in_two_steps(db, new_status, selected, limit)
+        if not rows:
+            return StatusChange([], [], [])
+
+        changes: Dict[uuid.UUID, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(STATUSES, 0))
+        for row in rows:
+            changes[row.user_profile_id][row.old_status] -= 1
+            changes[row.user_profile_id][new_status] += 1
+        await ReviewService._apply_counter_changes(db, changes)
+        await bump_profile_version(db, *changes)
+        # After the version bump: its row locks order events of each profile by commit
+        events = await StatusEventService.record(
+            db, [(row.user_profile_id, row.id, row.old_status, new_status) for row in rows]
+        )
+        # Changed rows no longer match, so anything still matching was left out
+        truncated = False
+        if len(rows) == limit and (ids is None or len(ids) > limit):
+            truncated = bool(await db.scalar(select(exists().where(*selected))))
+        return StatusChange([row.id for row in rows], list(changes), events, truncated)
+
+    @staticmethod
+    async def _apply_counter_changes(db: AsyncSession, changes: Dict[uuid.UUID, Dict[str, int]]) -> None:
+        counters = ApplicationCounter.__table__
+        if db.bind.dialect.name == "postgresql":
+            # One UPDATE joined to the per-profile deltas passed as parallel arrays
+            deltas = func.unnest(
+                literal(list(changes), ARRAY(UUID(as_uuid=True))),
+                *[literal([change[status] for change in changes.values()], ARRAY(Integer)) for status in STATUSES]
+            ).table_valued("user_profile_id", *STATUSES).render_derived()
+            updated = (await db.execute(
+                update(counters)
+                .where(counters.c.user_profile_id == deltas.c.user_profile_id)
+                .values({status: counters.c[status] + deltas.c[status] for status in STATUSES})
+                .returning(counters.c.user_profile_id)
+            )).scalars().all()
+        else:
+            await db.execute(
+                update(counters)
+                .where(counters.c.user_profile_id == bindparam("profile_id"))
+                .values({status: counters.c[status] + bindparam(f"delta_{status}") for status in STATUSES}),
+                [
+                    {"profile_id": profile_id, **{f"delta_{status}": delta for status, delta in deltas.items()}}
+                    for profile_id, deltas in changes.items()
+                ]
+            )
+            updated = (await db.execute(
+                select(counters.c.user_profile_id).where(_matches(counters.c.user_profile_id, list(changes), db))
+            )).scalars().all()
+        missing = set(changes).difference(updated)
+        if missing:
+            # Missing rows (profiles predate the counters table): rebuild them
+            # from source rows, which already hold the new statuses
+            await ApplicationCounterService.reconcile(db, missing)
+
+    @staticmethod
+    async def _update_returning_old(db: AsyncSession, new_status: str, selected: list, limit: int):
+        # Lock the rows while reading their current status, so the counter
+        # deltas match what the UPDATE overwrites even under concurrent reviews
+        current = (
+            select(Application.id, Application.created_at, Application.status.label("old_status"))
+            .where(*selected)
+            .limit(limit)
+            .with_for_update()
+            .subquery()
+        )
+        # A Core statement: the ORM would process every returned row for session sync it does not need
+        applications = Application.__table__
+        result = await db.execute(
+            update(applications)
+            # Repeating the selection lets the planner probe the primary key
+            # for the listed ids instead of scanning every partition to join
+            .where(*selected, applications.c.id == current.c.id, applications.c.created_at == current.c.created_at)
+            .values(status=new_status, updated_at=datetime.utcnow())
+            .returning(applications.c.id, applications.c.user_profile_id, current.c.old_status)
+        )
+        return result.all()
+
+    @staticmethod
+    async def _update_in_two_steps(db: AsyncSession, new_status: str, selected: list, limit: int):
+        # SQLite cannot return columns of an UPDATE ... FROM source
+        current = (await db.execute(
+            select(Application.id, Application.user_profile_id, Application.status.label("old_status"))
+            .where(*selected)
+            .limit(limit)
+        )).all()
+        if current:
+            await db.execute(
+                update(Application)
+                .where(Application.id.in_([row.id for row in current]))
+                .values(status=new_status, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        return current
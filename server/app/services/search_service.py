@@ -0,0 +1,90 @@
+import html
+import re
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy import select, func, cast, literal_column, table, column
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Application
+
+SEARCH_CONFIGS = ("russian", "kazakh")
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# The database brackets matches with these private-use characters. The text is
+# HTML-escaped before they become tags, so markup a user wrote is never live
+MATCH_START = "\ue000"
+MATCH_STOP = "\ue001"
+# FTS5 table created alongside applications on SQLite (see app.models.application)
+applications_fts = table("applications_fts", column("application_id"))
+
+
+def highlight_html(marked: str) -> str:
+    """Escape a marked description as HTML, then turn the match markers into tags"""
+    return html.escape(marked).replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_STOP, HIGHLIGHT_STOP)
+
+
+class SearchService:
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query_text: str,
+        profile_id: Optional[uuid.UUID] = None,
+        limit: int = 20
+    ) -> List[Tuple[Application, float, str]]:
+        """Full-text search over description and address, best matches first.
+
+        Returns ``(application, rank, highlighted description)`` tuples; the
+        highlight is HTML with matched terms in ``<mark>`` tags.
+        """
+        if db.bind.dialect.name == "postgresql":
+            statement = SearchService._postgresql_query(query_text)
+        else:
+            statement = SearchService._sqlite_query(query_text)
+            if statement is None:
+                return []
+
+        if profile_id is not None:
+            statement = statement.where(Application.user_profile_id == profile_id)
+
+        result = await db.execute(statement.order_by(literal_column("rank").desc(), Application.id).limit(limit))
+        return [(row.Application, row.rank, highlight_html(row.highlight)) for row in result]
+
+    @staticmethod
+    def _postgresql_query(query_text: str):
+        # A document matches if either configuration parses the query into its terms
+        ts_query = None
+        for config in SEARCH_CONFIGS:
+            config_query = func.websearch_to_tsquery(cast(config, REGCONFIG), query_text)
+            ts_query = config_query if ts_query is None else ts_query.op("||")(config_query)
+
+        rank = func.ts_rank_cd(Application.search_vector, ts_query)
+        highlight = func.ts_headline(
+            cast(SEARCH_CONFIGS[0], REGCONFIG),
+            Application.description,
+            ts_query,
+            f"StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxFragments=2"
+        )
+        return (
+            select(Application, rank.label("rank"), highlight.label("highlight"))
+            .where(Application.search_vector.op("@@")(ts_query))
+        )
+
+    @staticmethod
+    def _sqlite_query(query_text: str):
+        # Quote every term so user input cannot use FTS5 query syntax
+        terms = re.findall(r"\w+", query_text)
+        if not terms:
+            return None
+        match = " ".join(f'"{term}"' for term in terms)
+
+        # FTS5 auxiliary functions and MATCH take the table itself as an argument
+        fts = literal_column("applications_fts")
+        return (
+            select(
+                Application,
+                (-func.bm25(fts)).label("rank"),
+                func.highlight(fts, 1, MATCH_START, MATCH_STOP).label("highlight")
+            )
+            .join_from(applications_fts, Application, applications_fts.c.application_id == Application.id)
+            .where(fts.op("MATCH")(match))
+        )
@@ -0,0 +1,174 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import orjson
+from sqlalchemy import select, insert, delete, func, literal, text, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.status_stream import NOTIFY_CHANNEL, notify_payloads, status_broker
+from app.models import ApplicationStatusEvent
+
+# (user_profile_id, application_id, previous_status, status)
+StatusChangeRow = Tuple[uuid.UUID, uuid.UUID, str, str]
+EVENT_COLUMNS = (
+    ApplicationStatusEvent.id,
+    ApplicationStatusEvent.user_profile_id,
+    ApplicationStatusEvent.application_id,
+    ApplicationStatusEvent.previous_status,
+    ApplicationStatusEvent.status,
+    ApplicationStatusEvent.created_at,
+)
+# Rows per multi-row INSERT on SQLite, well under its bind parameter limit
+INSERT_BATCH_SIZE = 2000
+
+
+def _event(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "profile_id": str(row.user_profile_id),
+        "application_id": str(row.application_id),
+        "previous_status": row.previous_status,
+        "status": row.status,
+        "changed_at": row.created_at.isoformat(),
+    }
+
+
+def format_event(event: Dict[str, Any]) -> bytes:
+    data = {key: value for key, value in event.items() if key not in ("id", "profile_id")}
+    return b"id: %d\nevent: status\ndata: %s\n\n" % (event["id"], orjson.dumps(data))
+
+
+class StatusEventService:
+    @staticmethod
+    async def record(db: AsyncSession, changes: Sequence[StatusChangeRow]) -> List[Dict[str, Any]]:
+        """Store status change events in the caller's transaction.
+
+        Call after ``bump_profile_version`` so event ids follow commit order,
+        and hand the result to ``status_broker.dispatch`` once committed. On
+        PostgreSQL the events are also NOTIFYed, which the database delivers
+        to every worker only if the transaction commits.
+        """
+        if db.bind.dialect.name == "postgresql":
+            events = await StatusEventService._insert_unnest(db, changes)
+        else:
+            events = await StatusEventService._insert_batches(db, changes)
+        if events and db.bind.dialect.name == "postgresql":
+            await db.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": NOTIFY_CHANNEL, "payloads": notify_payloads(events)}
+            )
+        return events
+
+    @staticmethod
+    async def _insert_batches(db: AsyncSession, changes: Sequence[StatusChangeRow]) -> List[Dict[str, Any]]:
+        events = []
+        now = datetime.utcnow()
+        for start in range(0, len(changes), INSERT_BATCH_SIZE):
+            rows = [
+                {
+                    "user_profile_id": profile_id,
+                    "application_id": application_id,
+                    "previous_status": previous_status,
+                    "status": new_status,
+                    "created_at": now,
+                }
+                for profile_id, application_id, previous_status, new_status in changes[start:start + INSERT_BATCH_SIZE]
+            ]
+            result = await db.execute(insert(ApplicationStatusEvent).values(rows).returning(*EVENT_COLUMNS))
+            events.extend(_event(row) for row in result)
+        return events
+
+    @staticmethod
+    async def _insert_unnest(db: AsyncSession, changes: Sequence[StatusChangeRow]) -> List[Dict[str, Any]]:
+        # One INSERT ... SELECT from parallel arrays: four parameters and a
+        # cached statement however many rows, where a multi-row VALUES takes
+        # longer to compile than to run
+        if not changes:
+            return []
+        profile_ids, application_ids, previous, statuses = zip(*changes)
+        source = func.unnest(
+            literal(list(profile_ids), ARRAY(UUID(as_uuid=True))),
+            literal(list(application_ids), ARRAY(UUID(as_uuid=True))),
+            literal(list(previous), ARRAY(String)),
+            literal(list(statuses), ARRAY(String)),
+        ).table_valued("user_profile_id", "application_id", "previous_status", "status").render_derived()
+        columns = ["user_profile_id", "application_id", "previous_status", "status", "created_at"]
+        rows = select(*[source.c[column] for column in columns[:-1]], literal(datetime.utcnow()))
+        result = await db.execute(insert(ApplicationStatusEvent).from_select(columns, rows).returning(*EVENT_COLUMNS))
+        return [_event(row) for row in result]
+
+    @staticmethod
+    async def since(db: AsyncSession, profile_id: uuid.UUID, last_event_id: int, limit: int) -> List[Dict[str, Any]]:
+        result = await db.execute(
+            select(*EVENT_COLUMNS)
+            .where(ApplicationStatusEvent.user_profile_id == profile_id, ApplicationStatusEvent.id > last_event_id)
+            .order_by(ApplicationStatusEvent.id)
+            .limit(limit)
+        )
+        return [_event(row) for row in result]
+
+    @staticmethod
+    async def latest_id(db: AsyncSession, profile_id: uuid.UUID) -> int:
+        latest = await db.scalar(
+            select(func.max(ApplicationStatusEvent.id)).where(ApplicationStatusEvent.user_profile_id == profile_id)
+        )
+        return latest or 0
+
+    @staticmethod
+    async def stream(
+        db: AsyncSession,
+        profile_id: uuid.UUID,
+        last_event_id: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Server-sent events for one profile: replay after ``last_event_id``, then live.
+
+        The session is only used for short catch-up reads and is released
+        between them, so an idle connection does not hold a database connection.
+        """
+        subscription = status_broker.subscribe(profile_id, settings.status_stream_queue_size)
+        if last_event_id is not None:
+            # Subscribed first, so events committed during the replay are queued, not lost
+            subscription.mark_overflowed()
+        last_event_id = last_event_id or 0
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    subscription.drain()
+                    limit = settings.status_stream_replay_limit
+                    events = await StatusEventService.since(db, profile_id, last_event_id, limit + 1)
+                    if len(events) > limit:
+                        # Too far behind to replay: the client should reload its applications
+                        last_event_id = await StatusEventService.latest_id(db, profile_id)
+                        await db.rollback()
+                        yield b"id: %d\nevent: reset\ndata: {}\n\n" % last_event_id
+                        continue
+                    await db.rollback()
+                else:
+                    events = subscription.drain()
+                for event in events:
+                    if event["id"] > last_event_id:
+                        last_event_id = event["id"]
+                        yield format_event(event)
+                if subscription.overflowed:
+                    continue
+                if not await subscription.wait(settings.status_stream_heartbeat_seconds):
+                    yield b": heartbeat\n\n"
+        finally:
+            status_broker.unsubscribe(subscription)
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession, batch_size: int = 1000) -> int:
+        """Delete events past the retention window in batches, committing each one"""
+        deleted = 0
+        cutoff = datetime.utcnow() - timedelta(hours=settings.status_event_retention_hours)
+        while True:
+            expired = select(ApplicationStatusEvent.id).where(ApplicationStatusEvent.created_at < cutoff).limit(batch_size)
+            ids = (await db.execute(expired)).scalars().all()
+            if not ids:
+                return deleted
+            await db.execute(delete(ApplicationStatusEvent).where(ApplicationStatusEvent.id.in_(ids)))
+            await db.commit()
+            deleted += len(ids)
@@ -0,0 +1,92 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.imaging import render_variant
+from app.services.image_service import ImageStore
+
+# Longest edge in pixels of each downscaled variant
+VARIANTS = {"thumb": 320, "medium": 1280}
+# Formats Pillow can decode out of the box; HEIC originals are served as is
+THUMBNAIL_EXTENSIONS = ("jpg", "png", "webp")
+
+
+class ThumbnailGenerator:
+    """Downscaled image variants, rendered in worker processes and cached on disk.
+
+    Variants are keyed by the original's content hash, so a cached file
+    never goes stale. Concurrent requests for a variant that is still
+    rendering wait for the same render.
+    """
+
+    def __init__(self, cache_dir: str, workers: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._rendering: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def supports(key: str) -> bool:
+        return key.rsplit(".", 1)[1] in THUMBNAIL_EXTENSIONS
+
+    def path(self, key: str, variant: str) -> str:
+        stem, extension = key.rsplit(".", 1)
+        return os.path.join(self.cache_dir, key[:2], f"{stem}.{variant}.{extension}")
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned rather than forked: forking a process with running
+            # threads and open connections can deadlock the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def get(self, store: ImageStore, key: str, variant: str) -> Optional[str]:
+        """Path of a variant, rendering it on first use; None if the original is missing.
+
+        Raises ValueError if the original cannot be decoded.
+        """
+        path = self.path(key, variant)
+        try:
+            # Off the event loop: the cache directory may be on slow or network storage
+            await run_in_threadpool(os.stat, path)
+            return path
+        except FileNotFoundError:
+            pass
+        render = self._rendering.get(path)
+        if render is None:
+            render = asyncio.ensure_future(self._render(store, key, variant, path))
+            self._rendering[path] = render
+            render.add_done_callback(lambda _: self._rendering.pop(path, None))
+        # A client that disconnects must not cancel a render others are waiting on
+        return await asyncio.shield(render)
+
+    def warm(self, store: ImageStore, key: str) -> None:
+        """Start rendering every variant of a new image in the background"""
+        if not self.supports(key):
+            return
+        for variant in VARIANTS:
+            task = asyncio.ensure_future(self.get(store, key, variant))
+            # Retrieve failures so they are not logged as unhandled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _render(self, store: ImageStore, key: str, variant: str, path: str) -> Optional[str]:
+        async with store.local_copy(key) as source:
+            if source is None:
+                return None
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, render_variant, source, path, VARIANTS[variant])
+        return path
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+thumbnail_generator = ThumbnailGenerator(settings.thumbnail_cache_dir, settings.thumbnail_workers)
@@ -0,0 +1,136 @@
+"""Time of one bulk status update of 10k applications, statement by statement.
+
+Seeds profiles with pending applications, counter rows included, then runs
+``ReviewService.bulk_update_status`` on a random set of ids several times.
+Each round runs in a transaction that is rolled back and the table is vacuumed
+after it, so every round starts from the same data. The time of each SQL
+statement is recorded as well, so the share of the application ``UPDATE`` (the
+rows and their indexes) can be told apart from the counters, versions and
+status events around it.
+
+The seed is committed, as an update of uncommitted rows is slower than one of
+a settled table, and deleted at the end. Use a scratch database migrated to
+the current schema: accounts whose phone numbers start with ``PHONE_PREFIX``
+are taken for the benchmark's own.
+
+Usage:
+    python -m benchmarks.bench_bulk_status --database-url postgresql+asyncpg://.../db \\
+        [--applications 400000] [--profiles 2000] [--ids 10000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models import Application
+from app.services.review_service import ReviewService
+
+PHONE_PREFIX = "+7000"
+
+BENCH_PROFILES = """
+    SELECT user_profiles.id FROM user_profiles JOIN accounts ON accounts.id = user_profiles.account_id
+    WHERE accounts.phone_number LIKE :prefix || '%'
+"""
+
+SEED = [
+    """
+    INSERT INTO accounts (id, phone_number, is_verified, created_at, updated_at)
+    SELECT gen_random_uuid(), :prefix || lpad(g::text, 7, '0'), true, now(), now()
+    FROM generate_series(1, :profiles) AS g
+    """,
+    """
+    INSERT INTO user_profiles (id, account_id, name, surname, position, data_version, created_at, updated_at)
+    SELECT gen_random_uuid(), id, 'Bench', 'Bulk', 'Bench', 1, now(), now()
+    FROM accounts WHERE phone_number LIKE :prefix || '%'
+    """,
+    f"""
+    INSERT INTO applications (id, user_profile_id, address, description, image_urls, status, created_at, updated_at)
+    SELECT gen_random_uuid(), profiles.id,
+        jsonb_build_object('address', 'улица ' || g, 'city', (ARRAY['Алматы', 'Астана', 'Шымкент'])[1 + g % 3]),
+        'Проблема с освещением на улице номер ' || g, ARRAY[]::text[], 'pending',
+        date_trunc('month', now()) + make_interval(secs => g % 1000000), now()
+    FROM generate_series(1, :applications) AS g
+    JOIN (SELECT id, row_number() OVER () AS position FROM ({BENCH_PROFILES}) AS bench) AS profiles
+        ON profiles.position = 1 + g % :profiles
+    """,
+    f"""
+    INSERT INTO application_counters (user_profile_id, total, pending, approved, rejected)
+    SELECT user_profile_id, count(*), count(*), 0, 0 FROM applications
+    WHERE user_profile_id IN ({BENCH_PROFILES}) GROUP BY user_profile_id
+    """,
+]
+
+CLEANUP = [
+    f"DELETE FROM application_counters WHERE user_profile_id IN ({BENCH_PROFILES})",
+    f"DELETE FROM applications WHERE user_profile_id IN ({BENCH_PROFILES})",
+    f"DELETE FROM user_profiles WHERE id IN ({BENCH_PROFILES})",
+    "DELETE FROM accounts WHERE phone_number LIKE :prefix || '%'",
+]
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    statements = defaultdict(list)
+    started = {}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        started[conn] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        statements[" ".join(statement.split()[:3])].append(time.perf_counter() - started.pop(conn))
+
+    parameters = {"prefix": PHONE_PREFIX, "profiles": args.profiles, "applications": args.applications}
+    async with engine.connect() as conn, engine.connect() as vacuum:
+        await vacuum.execution_options(isolation_level="AUTOCOMMIT")
+        async with conn.begin():
+            for statement in SEED:
+                await conn.execute(text(statement), parameters)
+        try:
+            await vacuum.exec_driver_sql("VACUUM ANALYZE")
+            totals = []
+            for _ in range(args.rounds):
+                ids = (await conn.execute(
+                    select(Application.id)
+                    .where(Application.user_profile_id.in_(text(BENCH_PROFILES).bindparams(prefix=PHONE_PREFIX)))
+                    .order_by(func.random()).limit(args.ids)
+                )).scalars().all()
+                await conn.rollback()
+                statements.clear()
+                async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                    round_started = time.perf_counter()
+                    change = await ReviewService.bulk_update_status(db, "approved", ids=ids)
+                    totals.append(time.perf_counter() - round_started)
+                    assert len(change.ids) == len(ids), "some applications were not updated"
+                await conn.rollback()
+                print(f"round {len(totals)}: {totals[-1] * 1e3:5.0f} ms; "
+                      + ", ".join(f"{name} {sum(times) * 1e3:.0f} ms" for name, times in statements.items()))
+                await vacuum.exec_driver_sql("VACUUM applications, application_counters, user_profiles")
+        finally:
+            await conn.rollback()
+            async with conn.begin():
+                for statement in CLEANUP:
+                    await conn.execute(text(statement), parameters)
+    await engine.dispose()
+
+    print(f"{args.ids} ids over {args.applications} applications of {args.profiles} profiles")
+    print(f"median {statistics.median(totals) * 1e3:.0f} ms, best {min(totals) * 1e3:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--applications", type=int, default=400000)
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--ids", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Latency of the near-duplicate check on application create.
+
+Seeds one window's worth of fingerprints spread over Almaty, then runs
+``DuplicateService.check_and_record`` for new applications one at a time, as
+the create endpoint does. A share of them repeat a seeded description at the
+same spot with a small edit, to report how many planted duplicates are caught
+and how many others are flagged (generated texts share templates, so some
+are genuinely close). For scale, it also times comparing a signature against
+every fingerprint in the window, which is what a check without LSH buckets
+would do.
+
+Everything runs in one transaction that is rolled back, so the target database
+is left as it was; it must be migrated to the current schema.
+
+Usage:
+    python -m benchmarks.bench_duplicates --database-url postgresql+asyncpg://.../db \\
+        [--history 50000] [--checks 1000] [--repeats 0.1] [--scan-checks 20]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import settings
+from app.models import Account, ApplicationFingerprint, ApplicationLSHBucket, UserProfile
+from app.services.duplicate_service import (
+    DuplicateService, band_hashes, lsh_buckets, minhash, pack_signature, similarity, unpack_signature
+)
+
+PROBLEMS = [
+    "Не горит уличный фонарь", "Яма на проезжей части", "Сломана скамейка", "Переполнены мусорные баки",
+    "Не работает светофор", "Открыт канализационный люк", "Упало дерево", "Разбит тротуар",
+    "Нет освещения во дворе", "Протекает теплотрасса", "Незаконная свалка", "Сломаны качели",
+]
+PLACES = [
+    "возле школы", "у остановки", "на перекрёстке", "во дворе дома", "рядом с рынком", "у входа в парк",
+    "напротив аптеки", "за торговым центром", "около поликлиники", "на въезде во двор",
+]
+DETAILS = [
+    "уже неделю", "после дождя стало хуже", "опасно для детей", "жители жаловались несколько раз",
+    "машины объезжают по встречной", "вечером совсем темно", "просим срочно устранить", "пешеходы ходят по дороге",
+]
+
+
+def random_description(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(PROBLEMS)} {rng.choice(PLACES)} {rng.randint(1, 200)}, "
+        f"{rng.choice(DETAILS)}, {rng.choice(DETAILS)}"
+    )
+
+
+def random_point(rng: random.Random):
+    return {"latitude": rng.uniform(43.15, 43.35), "longitude": rng.uniform(76.80, 77.05)}
+
+
+def reworded(description: str, rng: random.Random) -> str:
+    words = description.split()
+    words[rng.randrange(len(words))] = rng.choice(["очень", "снова", "тоже", "сильно"])
+    return " ".join(words)
+
+
+async def seed(db: AsyncSession, profile_id: uuid.UUID, count: int, rng: random.Random) -> list:
+    now = datetime.utcnow()
+    history, fingerprints, buckets = [], [], []
+    for _ in range(count):
+        address = random_point(rng)
+        description = random_description(rng)
+        application_id = uuid.uuid4()
+        created_at = now - timedelta(hours=rng.uniform(0, settings.duplicate_window_hours))
+        cell = DuplicateService.location_cell(address)
+        signature = minhash(description)
+        fingerprints.append({
+            "application_id": application_id, "user_profile_id": profile_id, "geohash": cell,
+            "signature": pack_signature(signature), "created_at": created_at,
+        })
+        buckets.extend(
+            {"bucket": bucket, "application_id": application_id, "created_at": created_at}
+            for bucket in set(lsh_buckets(band_hashes(signature), cell))
+        )
+        history.append((address, description))
+    for start in range(0, count, 5000):
+        await db.execute(insert(ApplicationFingerprint), fingerprints[start:start + 5000])
+    for start in range(0, len(buckets), 20000):
+        await db.execute(insert(ApplicationLSHBucket), buckets[start:start + 20000])
+    return history
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    engine = create_async_engine(args.database_url)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        account = Account(phone_number="+70000000046", is_verified=True)
+        db.add(account)
+        await db.flush()
+        profile = UserProfile(account_id=account.id, name="Bench", surname="Duplicates", position="Bench")
+        db.add(profile)
+        await db.flush()
+
+        started = time.perf_counter()
+        history = await seed(db, profile.id, args.history, rng)
+        for table in ("application_fingerprints", "application_lsh_buckets"):
+            await conn.exec_driver_sql(f"ANALYZE {table}")
+        print(f"seeded {args.history} fingerprints in {time.perf_counter() - started:.1f}s")
+
+        timings, signing, caught, false_flags, planted = [], [], 0, 0, 0
+        for _ in range(args.checks):
+            if rng.random() < args.repeats:
+                address, description = rng.choice(history)
+                description = reworded(description, rng)
+                planted += 1
+                is_repeat = True
+            else:
+                address, description, is_repeat = random_point(rng), random_description(rng), False
+            application = SimpleNamespace(
+                id=uuid.uuid4(), user_profile_id=profile.id, address=address,
+                description=description, created_at=datetime.utcnow()
+            )
+            started = time.perf_counter()
+            minhash(description)
+            signing.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            matches = await DuplicateService.check_and_record(db, [application])
+            timings.append(time.perf_counter() - started)
+            if matches and is_repeat:
+                caught += 1
+            elif matches:
+                false_flags += 1
+
+        # Baseline: compare against every fingerprint in the window, as a check
+        # without LSH buckets would have to
+        cutoff = datetime.utcnow() - timedelta(hours=settings.duplicate_window_hours)
+        scans = []
+        for _ in range(args.scan_checks):
+            signature = minhash(random_description(rng))
+            started = time.perf_counter()
+            rows = (await db.execute(
+                select(ApplicationFingerprint.signature).where(ApplicationFingerprint.created_at >= cutoff)
+            )).scalars()
+            max(similarity(signature, unpack_signature(row)) for row in rows)
+            scans.append(time.perf_counter() - started)
+
+        await transaction.rollback()
+    await engine.dispose()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    print(f"{args.checks} checks against {args.history} recent applications")
+    print(f"signature (CPU)  : {statistics.median(signing) * 1e6:8.0f} us median")
+    print(f"check + record   : {statistics.median(timings) * 1e3:8.2f} ms median, "
+          f"p95 {quantiles[94] * 1e3:.2f} ms, p99 {quantiles[98] * 1e3:.2f} ms")
+    print(f"full-window scan : {statistics.median(scans) * 1e3:8.2f} ms median")
+    print(f"planted repeats  : {caught}/{planted} flagged")
+    print(f"other flagged    : {false_flags}/{args.checks - planted}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--history", type=int, default=50000)
+    parser.add_argument("--checks", type=int, default=1000)
+    parser.add_argument("--repeats", type=float, default=0.1)
+    parser.add_argument("--scan-checks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=46)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
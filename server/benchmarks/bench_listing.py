@@ -0,0 +1,134 @@
+"""CPU and memory per listing page: ORM instances against projected columns.
+
+Seeds one profile with applications, then fetches the same keyset pages both
+ways, each through a new session as a request would:
+
+- the previous path selects ``Application`` instances and builds an
+  ``ApplicationResponseSchema`` for each;
+- the current path selects ``LISTING_COLUMNS`` and maps the row tuples
+  straight to dicts, with ``address_display`` and ``image_count`` computed by
+  the database.
+
+Both pages go through ``ORJSONModelResponse``, and the script checks that
+they encode to the same bytes. CPU time covers this process only: the
+database does the same work on both paths. Peak memory is measured with
+tracemalloc, in a separate pass, because tracing slows everything down.
+
+Everything runs in one transaction that is rolled back, so the target database
+is left as it was; it must be migrated to the current schema.
+
+Usage:
+    python -m benchmarks.bench_listing --database-url postgresql+asyncpg://.../db \\
+        [--applications 2000] [--page-size 100] [--rounds 200]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.applications import LISTING_COLUMNS, ORDERINGS, _application_response, _listing_item
+from app.core.pagination import paginate
+from app.core.responses import ORJSONModelResponse
+from app.models import Account, Application, UserProfile
+from app.services.geocoding_service import geocoding_service
+from benchmarks.nominatim_simulator import fake_place
+
+
+async def orm_page(conn, profile_id, page_size: int) -> bytes:
+    db = AsyncSession(bind=conn, expire_on_commit=False)
+    columns, descending = ORDERINGS["-created_at"]
+    query = select(Application).where(Application.user_profile_id == profile_id)
+    applications = (await db.execute(paginate(query, columns, descending, None, page_size))).scalars().all()
+    body = ORJSONModelResponse([_application_response(application) for application in applications[:page_size]]).body
+    await db.close()
+    return body
+
+
+async def column_page(conn, profile_id, page_size: int) -> bytes:
+    db = AsyncSession(bind=conn, expire_on_commit=False)
+    columns, descending = ORDERINGS["-created_at"]
+    query = select(*LISTING_COLUMNS).where(Application.user_profile_id == profile_id)
+    rows = (await db.execute(paginate(query, columns, descending, None, page_size))).all()
+    body = ORJSONModelResponse([_listing_item(row) for row in rows[:page_size]]).body
+    await db.close()
+    return body
+
+
+async def timed(fetch, conn, profile_id, page_size: int, rounds: int) -> dict:
+    cpu, wall = [], []
+    for _ in range(rounds):
+        started_cpu, started = time.process_time(), time.perf_counter()
+        await fetch(conn, profile_id, page_size)
+        cpu.append(time.process_time() - started_cpu)
+        wall.append(time.perf_counter() - started)
+    tracemalloc.start()
+    await fetch(conn, profile_id, page_size)
+    tracemalloc.reset_peak()
+    await fetch(conn, profile_id, page_size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"cpu": statistics.mean(cpu), "wall": statistics.median(wall), "peak": peak}
+
+
+async def run(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        account = Account(phone_number="+70000000050", is_verified=True)
+        db.add(account)
+        await db.flush()
+        profile = UserProfile(account_id=account.id, name="Bench", surname="Listing", position="Bench")
+        db.add(profile)
+        await db.flush()
+        now = datetime.utcnow()
+        await db.execute(insert(Application), [
+            {
+                "id": uuid.uuid4(),
+                "user_profile_id": profile.id,
+                "address": geocoding_service._parse_nominatim_address(fake_place(f"listing {i}")).model_dump(),
+                "description": "Проблема с освещением на улице, требуется замена фонарей " * 3,
+                "image_urls": [f"/api/images/{i:064x}.jpg" for _ in range(i % 4)],
+                "status": ("pending", "approved", "rejected")[i % 3],
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now,
+            }
+            for i in range(args.applications)
+        ])
+        await conn.exec_driver_sql("ANALYZE applications")
+
+        orm_body = await orm_page(conn, profile.id, args.page_size)
+        column_body = await column_page(conn, profile.id, args.page_size)
+        assert orm_body == column_body, "the two paths encode different pages"
+
+        orm = await timed(orm_page, conn, profile.id, args.page_size, args.rounds)
+        columns = await timed(column_page, conn, profile.id, args.page_size, args.rounds)
+
+        await transaction.rollback()
+    await engine.dispose()
+
+    print(f"page of {args.page_size} applications, {args.rounds} rounds, identical {len(orm_body)} byte bodies")
+    print(f"{'':22} {'CPU/page':>10} {'wall p50':>10} {'peak mem':>10}")
+    for name, result in (("ORM instances", orm), ("projected columns", columns)):
+        print(f"{name:22} {result['cpu'] * 1e3:7.2f} ms {result['wall'] * 1e3:7.2f} ms "
+              f"{result['peak'] / 1024:7.0f} KiB")
+    print(f"CPU saved per page    {(1 - columns['cpu'] / orm['cpu']):10.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--applications", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
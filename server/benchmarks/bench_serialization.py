@@ -0,0 +1,94 @@
+"""Serialization cost of a 100-item applications page.
+
+Compares the previous path (build models, let FastAPI re-validate them through
+``response_model`` and encode with stdlib ``json``) against returning an
+``ORJSONModelResponse`` built from models validated once.
+
+Usage:
+    python -m benchmarks.bench_serialization [--items 100] [--rounds 200]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import ORJSONModelResponse
+from app.schemas.application import ApplicationResponseSchema
+
+
+def build_page(items: int) -> List[ApplicationResponseSchema]:
+    profile_id = uuid.uuid4()
+    now = datetime.utcnow()
+    return [
+        ApplicationResponseSchema(
+            id=uuid.uuid4(),
+            user_profile_id=profile_id,
+            address={
+                "found": True,
+                "address": f"{i}, проспект Абая, Алмалинский район, Алматы, Казахстан",
+                "road": "проспект Абая",
+                "city": "Алматы",
+                "region": "Алматы",
+                "country": "Казахстан",
+                "country_code": "kz",
+                "latitude": 43.2220 + i / 1000,
+                "longitude": 76.8512 + i / 1000,
+                "confidence": 0.9,
+            },
+            description="Проблема с освещением на улице, требуется замена фонарей " * 3,
+            image_urls=[f"https://example.com/images/{i}/{n}.jpg" for n in range(3)],
+            status="pending",
+            address_display=f"{i}, проспект Абая, Алматы",
+            image_count=3,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(items)
+    ]
+
+
+async def previous_path(page, field) -> bytes:
+    content = await serialize_response(field=field, response_content=page)
+    return JSONResponse(content).body
+
+
+def fast_path(page) -> bytes:
+    return ORJSONModelResponse(page).body
+
+
+def measure(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    page = build_page(args.items)
+    field = create_response_field(name="response", type_=List[ApplicationResponseSchema])
+    loop = asyncio.new_event_loop()
+
+    assert loop.run_until_complete(previous_path(page, field)).decode() != ""
+    previous = measure(lambda: loop.run_until_complete(previous_path(page, field)), args.rounds)
+    fast = measure(lambda: fast_path(page), args.rounds)
+    loop.close()
+
+    print(f"page of {args.items} applications, {args.rounds} rounds")
+    print(f"response_model + json : {previous:9.1f} us/page")
+    print(f"ORJSONModelResponse   : {fast:9.1f} us/page")
+    print(f"speedup               : {previous / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Throughput and peak memory of one multipart image upload.
+
+Feeds a multipart body to each path in network-sized chunks, the way the
+ASGI server delivers it, and stores the image on local disk:
+
+- buffered: read the whole body with ``request.body()``, then hash and write it
+- form: ``request.form()`` (FastAPI's ``UploadFile``), then hash and copy the spooled file
+- streaming: ``ImageService.receive``, which parses, hashes and writes as chunks arrive
+
+Peak memory is the largest Python heap growth during one upload (tracemalloc).
+
+Usage:
+    python -m benchmarks.bench_uploads [--megabytes 20] [--rounds 5] [--chunk-kb 64]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from starlette.requests import Request
+
+from app.services.image_service import ImageService, LocalImageStore
+
+BOUNDARY = "benchmark-boundary"
+
+
+def build_body(size: int) -> bytes:
+    image = b"\xff\xd8\xff\xe0" + os.urandom(size - 4)
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="files"; filename="photo.jpg"\r\n'
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + image + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def make_request(body: bytes, chunk_size: int) -> Request:
+    position = 0
+
+    async def receive():
+        nonlocal position
+        chunk = body[position:position + chunk_size]
+        position += chunk_size
+        return {"type": "http.request", "body": chunk, "more_body": position < len(body)}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+def store_bytes(store: LocalImageStore, data: bytes) -> None:
+    key = hashlib.sha256(data).hexdigest() + ".jpg"
+    path = os.path.join(store.temp_dir, key)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.replace(path, store.path(key))
+
+
+async def buffered(request: Request, store: LocalImageStore) -> None:
+    body = await request.body()
+    start = body.index(b"\r\n\r\n") + 4
+    end = body.rindex(f"\r\n--{BOUNDARY}--".encode())
+    store_bytes(store, body[start:end])
+
+
+async def form(request: Request, store: LocalImageStore) -> None:
+    upload = (await request.form())["files"]
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(dir=store.temp_dir)
+    with os.fdopen(fd, "wb") as f:
+        while chunk := await upload.read(1024 * 1024):
+            digest.update(chunk)
+            f.write(chunk)
+    await upload.close()
+    os.replace(path, store.path(digest.hexdigest() + ".jpg"))
+
+
+async def streaming(request: Request, store: LocalImageStore) -> None:
+    await ImageService.receive(store, request.headers["content-type"], request.stream())
+
+
+def run(
+    path: Callable[[Request, LocalImageStore], Awaitable[None]],
+    body: bytes,
+    chunk_size: int,
+    rounds: int
+):
+    timings, peaks = [], []
+    for _ in range(rounds):
+        root = tempfile.mkdtemp(prefix="bench-uploads-")
+        store = LocalImageStore(root)
+        os.makedirs(store.temp_dir)
+        # Every path stores under the same two-level layout
+        for prefix in range(256):
+            os.makedirs(os.path.join(root, f"{prefix:02x}"))
+        request = make_request(body, chunk_size)
+        tracemalloc.start()
+        start = time.perf_counter()
+        asyncio.run(path(request, store))
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        shutil.rmtree(root)
+    return min(timings), max(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    size = int(args.megabytes * 1024 * 1024)
+    body = build_body(size)
+    print(f"{args.megabytes:g} MB image, {args.chunk_kb} KB chunks, best of {args.rounds}")
+    for name, path in (("buffered", buffered), ("form", form), ("streaming", streaming)):
+        seconds, peak = run(path, body, args.chunk_kb * 1024, args.rounds)
+        print(f"{name:10}: {size / seconds / 1e6:8.1f} MB/s  peak {peak / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cold import time of ``app.main``, checked against a budget.
+
+Imports the app in fresh interpreters under ``python -X importtime`` and
+reports the median cumulative time and the slowest modules. This is what a
+worker added by autoscaling pays before it serves a request. It exits with
+status 1 when the median is over ``--budget``. Wall-clock times depend on
+the machine and how busy it is, so this is not part of the unit suite;
+``tests/test_startup.py`` only checks that deferred modules stay unloaded.
+
+Usage:
+    python -m benchmarks.import_time [--runs 5] [--budget 1.5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times() -> Dict[str, Tuple[int, int]]:
+    """Import app.main in a fresh interpreter; returns {module: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    # -X importtime itself adds overhead, so this is above the plain import time
+    parser.add_argument("--budget", type=float, default=1.5, help="Median seconds allowed for import app.main")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    median = statistics.median(times["app.main"][1] for times in runs) / 1e6
+    fastest = min(runs, key=lambda times: times["app.main"][1])
+    slowest = sorted(fastest.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+    print(f"import app.main: median {median * 1e3:.0f} ms over {args.runs} runs (budget {args.budget * 1e3:.0f} ms)")
+    for module, (self_us, cumulative_us) in slowest:
+        print(f"  {module:50} self {self_us / 1e3:7.1f} ms  cumulative {cumulative_us / 1e3:7.1f} ms")
+    if median > args.budget:
+        sys.exit(f"import app.main takes {median:.2f} s, over the {args.budget:.2f} s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""End-to-end HTTP load test of the API, with Nominatim simulated locally.
+
+Starts ``benchmarks.nominatim_simulator`` and the production server
+(``python -m app.server``), pointed at the simulator and at the given
+database. PostgreSQL must be migrated to the current schema; with no URL a
+fresh SQLite file is created. Then each concurrency level runs that many
+virtual users in a closed loop. In every iteration a virtual user becomes a
+new citizen:
+
+- requests and verifies an OTP;
+- creates a profile;
+- types an address into autocomplete, one keystroke per request;
+- files one application by that address and one by coordinates;
+- lists all and its own applications;
+- reads its stats.
+
+Each citizen sends from its own ``X-Forwarded-For`` address, which the server
+trusts from localhost. The per-IP rate limit then applies per citizen, as it
+does in production, rather than to all the load at once.
+
+The report is JSON, written to stdout or ``--output``. For each level it
+gives throughput, p50/p95/p99 latency and status counts, overall and per
+endpoint, along with the simulator's counts. The client runs in one Python
+process, so on a small machine it competes with the server for CPU.
+``client_cpu_seconds`` shows how much it used; compare runs made on the same
+machine rather than reading the numbers as capacity.
+
+Usage:
+    python -m benchmarks.loadtest [--database-url postgresql+asyncpg://.../db] \\
+        [--concurrency 1,10,50] [--duration 30] [--warmup 5] [--workers 1] \\
+        [--nominatim-latency-ms 150] [--nominatim-error-rate 0.01] \\
+        [--nominatim-rate-limit 0] [--think-ms 0] [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy.engine import make_url
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FIRST_NAMES = ["Айгерим", "Нурлан", "Дана", "Ерлан", "Асель", "Тимур", "Жанна", "Арман"]
+SURNAMES = ["Ахметова", "Садыков", "Омарова", "Касымов", "Жумабаева", "Нургалиев"]
+STREETS = ["Абая", "Достык", "Толе би", "Райымбека", "Жибек Жолы", "Аль-Фараби", "Сатпаева"]
+PROBLEMS = [
+    "Не горит уличный фонарь", "Яма на проезжей части", "Сломана скамейка",
+    "Переполнены мусорные баки", "Не работает светофор", "Открыт канализационный люк",
+]
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples: List[tuple], duration: float) -> dict:
+    latencies = sorted(latency for _, latency in samples)
+    statuses = Counter(str(status) for status, _ in samples)
+    summary = {
+        "requests": len(samples),
+        "rps": round(len(samples) / duration, 1),
+        "errors": sum(count for status, count in statuses.items() if not status.startswith(("2", "3"))),
+        "statuses": dict(sorted(statuses.items())),
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        }
+    return summary
+
+
+class Recorder:
+    """Latencies by endpoint for requests that finish inside the measured window"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[tuple]] = defaultdict(list)
+        self.start = self.end = float("inf")
+        self.journeys = 0
+
+    def measuring(self, at: float) -> bool:
+        return self.start <= at < self.end
+
+    def record(self, label: str, status, started: float, finished: float) -> None:
+        if self.start <= started and finished < self.end:
+            self.samples[label].append((status, finished - started))
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random,
+                 phone_prefix: int, think: float):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.phone_prefix = phone_prefix
+        self.think = think
+        self.headers: Dict[str, str] = {}
+
+    async def call(self, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as exc:
+            response, status = None, type(exc).__name__
+        self.recorder.record(label, status, started, time.perf_counter())
+        if self.think:
+            await asyncio.sleep(self.think)
+        return response
+
+    async def journey(self, number: int) -> None:
+        rng = self.rng
+        self.headers = {"X-Forwarded-For": f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}"}
+        phone = f"+77{self.phone_prefix:03d}{number:06d}"
+
+        await self.call("POST /auth/request-otp", "POST", "/auth/request-otp", json={"phone_number": phone})
+        response = await self.call(
+            "POST /auth/verify-otp", "POST", "/auth/verify-otp", json={"phone_number": phone, "otp_code": "1111"}
+        )
+        if response is None or response.status_code != 200 or not response.json().get("tokens"):
+            return
+        self.headers["Authorization"] = f"Bearer {response.json()['tokens']['access']}"
+
+        response = await self.call(
+            "POST /api/accounts/profile/", "POST", "/api/accounts/profile/",
+            json={"name": rng.choice(FIRST_NAMES), "surname": rng.choice(SURNAMES), "position": "Житель"}
+        )
+        if response is None or response.status_code != 201:
+            return
+
+        address = f"{rng.choice(STREETS)} {rng.randint(1, 250)}"
+        for length in range(3, len(address) + 1):
+            if address[length - 1] != " ":
+                await self.call("GET /api/geo/autocomplete", "GET", "/api/geo/autocomplete",
+                                params={"q": address[:length], "limit": 5})
+
+        await self.call(
+            "POST /api/applications/ (address)", "POST", "/api/applications/",
+            json={"description": f"{rng.choice(PROBLEMS)}, {address}", "address_query": f"Алматы, {address}"}
+        )
+        await self.call(
+            "POST /api/applications/ (coordinates)", "POST", "/api/applications/",
+            json={"description": rng.choice(PROBLEMS), "latitude": rng.uniform(43.15, 43.35),
+                  "longitude": rng.uniform(76.80, 77.05)}
+        )
+        await self.call("GET /api/applications/", "GET", "/api/applications/", params={"page_size": 20})
+        await self.call("GET /api/applications/me/", "GET", "/api/applications/me/")
+        await self.call("GET /api/applications/stats/", "GET", "/api/applications/stats/")
+        if self.recorder.measuring(time.perf_counter()):
+            self.recorder.journeys += 1
+
+
+async def run_level(args: argparse.Namespace, concurrency: int, first_number: int) -> tuple:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=args.app_url, limits=limits, timeout=30) as client:
+        now = time.perf_counter()
+        recorder.start = now + args.warmup
+        recorder.end = recorder.start + args.duration
+        numbers = iter(range(first_number, 10 ** 6))
+
+        async def loop(index: int) -> None:
+            user = VirtualUser(client, recorder, random.Random(args.seed * 1000 + first_number + index),
+                               args.phone_prefix, args.think_ms / 1000)
+            while time.perf_counter() < recorder.end:
+                await user.journey(next(numbers))
+
+        cpu = resource.getrusage(resource.RUSAGE_SELF)
+        await asyncio.gather(*(loop(index) for index in range(concurrency)))
+        used = resource.getrusage(resource.RUSAGE_SELF)
+
+    every = [sample for samples in recorder.samples.values() for sample in samples]
+    level = {
+        "concurrency": concurrency,
+        "duration_seconds": args.duration,
+        "journeys_completed": recorder.journeys,
+        "total": summarize(every, args.duration),
+        "endpoints": {label: summarize(samples, args.duration) for label, samples in sorted(recorder.samples.items())},
+        "client_cpu_seconds": round(used.ru_utime + used.ru_stime - cpu.ru_utime - cpu.ru_stime, 2),
+    }
+    return level, next(numbers)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, log_path: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{url} exited with status {process.returncode}; see {log_path}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    sys.exit(f"{url} did not come up within {timeout:.0f}s; see {log_path}")
+
+
+def start(name: str, command: List[str], env: dict, workdir: str) -> tuple:
+    log_path = os.path.join(workdir, f"{name}.log")
+    log = open(log_path, "wb")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, log_path
+
+
+def stop(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=40)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Migrated database to run against (default: a new SQLite file)")
+    parser.add_argument("--app-url", help="Load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated virtual user counts")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before each level")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pause after each request")
+    parser.add_argument("--nominatim-latency-ms", type=float, default=150)
+    parser.add_argument("--nominatim-jitter", type=float, default=0.3)
+    parser.add_argument("--nominatim-error-rate", type=float, default=0.01)
+    parser.add_argument("--nominatim-rate-limit", type=float, default=0, help="Requests per second (0: unlimited)")
+    parser.add_argument("--phone-prefix", type=int, help="Three digits that make this run's phone numbers unique")
+    parser.add_argument("--seed", type=int, default=48)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if args.phone_prefix is None:
+        # Accounts persist between runs against the same database
+        args.phone_prefix = random.randrange(1000)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    processes = []
+    nominatim_url = None
+    try:
+        if args.app_url is None:
+            nominatim_url = f"http://127.0.0.1:{free_port()}"
+            simulator, log_path = start("nominatim", [
+                sys.executable, "-m", "benchmarks.nominatim_simulator",
+                "--port", nominatim_url.rsplit(":", 1)[1],
+                "--latency-ms", str(args.nominatim_latency_ms), "--jitter", str(args.nominatim_jitter),
+                "--error-rate", str(args.nominatim_error_rate), "--rate-limit", str(args.nominatim_rate_limit),
+                "--seed", str(args.seed),
+            ], dict(os.environ), workdir)
+            processes.append(simulator)
+            wait_until_up(f"{nominatim_url}/stats", simulator, log_path)
+
+            args.database_url = args.database_url or f"sqlite+aiosqlite:///{workdir}/loadtest.db"
+            args.app_url = f"http://127.0.0.1:{free_port()}"
+            env = dict(
+                os.environ,
+                DATABASE_URL=args.database_url,
+                NOMINATIM_BASE_URL=nominatim_url,
+                TWILIO_MOCK_MODE="true",
+                # Keep recycling out of the measurements
+                SERVER_MAX_REQUESTS="0",
+            )
+            server, log_path = start("server", [
+                sys.executable, "-m", "app.server",
+                "--bind", args.app_url.removeprefix("http://"), "--workers", str(args.workers),
+            ], env, workdir)
+            processes.append(server)
+            wait_until_up(f"{args.app_url}/health", server, log_path)
+
+        report = {
+            "config": {
+                "app_url": args.app_url,
+                "database": make_url(args.database_url).get_backend_name() if args.database_url else None,
+                "workers": args.workers if nominatim_url else None,
+                "duration_seconds": args.duration,
+                "warmup_seconds": args.warmup,
+                "think_ms": args.think_ms,
+                "nominatim": {
+                    "latency_ms": args.nominatim_latency_ms,
+                    "jitter": args.nominatim_jitter,
+                    "error_rate": args.nominatim_error_rate,
+                    "rate_limit": args.nominatim_rate_limit,
+                } if nominatim_url else None,
+            },
+            "levels": [],
+        }
+        number = 0
+        for concurrency in levels:
+            before = httpx.get(f"{nominatim_url}/stats").json() if nominatim_url else None
+            level, number = asyncio.run(run_level(args, concurrency, number))
+            if nominatim_url:
+                after = httpx.get(f"{nominatim_url}/stats").json()
+                level["nominatim"] = {key: after[key] - before.get(key, 0) for key in after}
+            report["levels"].append(level)
+            print(f"concurrency {concurrency}: {level['total']['rps']} rps, "
+                  f"p99 {level['total'].get('latency_ms', {}).get('p99')} ms", file=sys.stderr)
+    finally:
+        for process in reversed(processes):
+            stop(process)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
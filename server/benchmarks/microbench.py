@@ -0,0 +1,272 @@
+"""Microbenchmarks of the service-layer hot paths, with stored baselines.
+
+Times each case in a calibrated loop with the garbage collector off, repeats
+it, and reports the fastest and median time per call. ``--save`` records the
+results as a baseline. ``--compare`` checks the current results against a
+baseline and exits with status 1 if any case is slower than it by more than
+``--threshold``. The comparison uses the fastest repeat, which is the least
+disturbed by other processes. A case that looks slower is measured again, up
+to ``--rounds`` times, because a busy machine can slow a whole round down. Baselines are only comparable on the machine and Python that
+recorded them. The committed one, ``benchmarks/baselines/microbench.json``,
+is a reference; record your own before changing a hot path.
+
+Usage:
+    python -m benchmarks.microbench [--save [PATH] | --compare [PATH]] \\
+        [--threshold 0.15] [--filter auth] [--rounds 3]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from pydantic import ValidationError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.api.applications import _application_response
+from app.core.middleware import RateLimitMiddleware
+from app.core.responses import ORJSONModelResponse
+from app.models import Account, Application
+from app.schemas.auth import OTPRequestSchema
+from app.services.auth_service import AuthService
+from app.services.geocoding_service import geocoding_service
+from benchmarks.nominatim_simulator import fake_place
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "microbench.json"
+
+# Each case is set up once and returns a function that times ``loops`` calls
+CASES: Dict[str, Callable[[], Callable[[int], float]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def timed(fn: Callable[[], object]) -> Callable[[int], float]:
+    def time_loops(loops: int) -> float:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - started
+    return time_loops
+
+
+def applications(count: int) -> List[Application]:
+    profile_id = uuid.uuid4()
+    now = datetime.utcnow()
+    return [
+        Application(
+            id=uuid.uuid4(),
+            user_profile_id=profile_id,
+            address=geocoding_service._parse_nominatim_address(fake_place(f"application {i}")).model_dump(),
+            description="Проблема с освещением на улице, требуется замена фонарей " * 3,
+            image_urls=[f"/api/images/{i:064x}.jpg" for _ in range(3)],
+            status="pending",
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+@case("geocoding.parse_nominatim_address")
+def parse_nominatim_address():
+    data = fake_place("проспект Абая 150")
+    return timed(lambda: geocoding_service._parse_nominatim_address(data))
+
+
+@case("auth.create_tokens_for_account")
+def create_tokens():
+    account = Account(id=uuid.uuid4(), phone_number="+77011234567", is_verified=True)
+    return timed(lambda: AuthService.create_tokens_for_account(account))
+
+
+@case("auth.verify_token")
+def verify_token():
+    account = Account(id=uuid.uuid4(), phone_number="+77011234567", is_verified=True)
+    token = AuthService.create_tokens_for_account(account)["access"]
+    return timed(lambda: AuthService.verify_token(token))
+
+
+@case("schemas.phone_number_valid")
+def phone_number_valid():
+    return timed(lambda: OTPRequestSchema(phone_number="+77011234567"))
+
+
+@case("schemas.phone_number_invalid")
+def phone_number_invalid():
+    def validate():
+        try:
+            OTPRequestSchema(phone_number="+1 555 0100")
+        except ValidationError:
+            pass
+    return timed(validate)
+
+
+@case("schemas.application_response")
+def application_response():
+    application = applications(1)[0]
+    return timed(lambda: _application_response(application))
+
+
+@case("schemas.application_page_100_build")
+def application_page_build():
+    page = applications(100)
+    return timed(lambda: [_application_response(application) for application in page])
+
+
+@case("schemas.application_page_100_encode")
+def application_page_encode():
+    page = [_application_response(application) for application in applications(100)]
+    return timed(lambda: ORJSONModelResponse(page).body)
+
+
+@case("middleware.rate_limit_dispatch")
+def rate_limit_dispatch():
+    # Active clients, each with 50 to 90 calls in the window: the allowed path
+    # as it runs under steady load, including the trimming of old call times
+    middleware = RateLimitMiddleware(app=None, calls=100, period=60)
+    response = Response()
+    loop = asyncio.new_event_loop()
+
+    async def call_next(request):
+        return response
+
+    async def dispatch(requests: List[Request], loops: int) -> float:
+        started = time.perf_counter()
+        for i in range(loops):
+            await middleware.dispatch(requests[i % len(requests)], call_next)
+        return time.perf_counter() - started
+
+    def time_loops(loops: int) -> float:
+        now = time.time()
+        ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(max(1, loops // 40))]
+        middleware.clients = {ip: {"calls": [now - 30 + j * 0.5 for j in range(50)]} for ip in ips}
+        requests = [
+            Request({"type": "http", "method": "GET", "path": "/", "headers": [], "client": (ip, 50000)})
+            for ip in ips
+        ]
+        return loop.run_until_complete(dispatch(requests, loops))
+    return time_loops
+
+
+def calibrate(time_loops: Callable[[int], float], min_seconds: float) -> int:
+    """Smallest of 1, 2, 5, 10, 20, ... loops that take at least min_seconds"""
+    loops = 1
+    while True:
+        for multiple in (1, 2, 5):
+            if time_loops(loops * multiple) >= min_seconds:
+                return loops * multiple
+        loops *= 10
+
+
+def measure(time_loops: Callable[[int], float], repeat: int, min_seconds: float) -> dict:
+    # As timeit does: collections would land on whichever call triggers them
+    gc.collect()
+    gc.disable()
+    try:
+        loops = calibrate(time_loops, min_seconds)
+        per_call = [time_loops(loops) / loops for _ in range(repeat)]
+    finally:
+        gc.enable()
+    return {
+        "min_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def machine() -> dict:
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def slower(result: dict, previous: dict, threshold: float) -> bool:
+    return result["min_us"] > previous["min_us"] * (1 + threshold)
+
+
+def compare(baseline: dict, results: Dict[str, dict], threshold: float) -> List[str]:
+    """Print each case against the baseline; returns the names that regressed"""
+    regressions = []
+    print(f"{'case':40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:40} {'-':>12} {result['min_us']:>9.2f} us {'':>8}  new")
+            continue
+        change = result["min_us"] / previous["min_us"] - 1
+        if slower(result, previous, threshold):
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        print(f"{name:40} {previous['min_us']:>9.2f} us {result['min_us']:>9.2f} us {change:>+7.1%}  {verdict}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, type=Path, help="Record a baseline")
+    mode.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, type=Path, help="Check against a baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Slowdown flagged as a regression (0.15: 15%%)")
+    parser.add_argument("--filter", help="Only cases whose name contains this")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Length of one timed repeat")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Measure a case up to this many times, keeping the fastest, before it counts as slower")
+    args = parser.parse_args()
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    if baseline and baseline.get("machine") != machine():
+        print(f"warning: baseline recorded on {baseline.get('machine')}, this is {machine()}", file=sys.stderr)
+
+    results = {}
+    for name, setup in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        time_loops = setup()
+        results[name] = measure(time_loops, args.repeat, args.min_seconds)
+        # A busy machine slows whole rounds down; a real regression shows in every round
+        for _ in range(args.rounds - 1):
+            previous = baseline["results"].get(name) if baseline else None
+            if baseline and not (previous and slower(results[name], previous, args.threshold)):
+                break
+            again = measure(time_loops, args.repeat, args.min_seconds)
+            if again["min_us"] < results[name]["min_us"]:
+                results[name] = again
+        if not args.compare:
+            print(f"{name:40} {results[name]['min_us']:>9.2f} us  (median {results[name]['median_us']:.2f} us)")
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        recorded = {"machine": machine(), "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+                    "results": results}
+        args.save.write_text(json.dumps(recorded, indent=2) + "\n")
+        print(f"baseline saved to {args.save}")
+    elif args.compare:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            sys.exit(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Local stand-in for Nominatim with configurable latency, errors and rate limiting.
+
+Serves ``/search`` and ``/reverse`` with made-up Almaty addresses in
+Nominatim's JSON shape. The same query always returns the same results, and
+``limit`` is respected. Point ``NOMINATIM_BASE_URL`` at it to load-test the
+API without sending traffic to the public server, whose usage policy allows
+one request per second.
+
+Each response waits a log-normally distributed delay around ``--latency-ms``.
+A share of requests (``--error-rate``) fail with 503. Beyond
+``--rate-limit`` requests per second (a token bucket holding ``--burst``),
+requests get 429, as the public server does. ``GET /stats`` returns the
+counts so far.
+
+Usage:
+    python -m benchmarks.nominatim_simulator [--port 8090] [--latency-ms 150] \\
+        [--jitter 0.3] [--error-rate 0.01] [--rate-limit 0] [--burst 1]
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+STREETS = [
+    "проспект Абая", "проспект Достык", "улица Толе би", "проспект Райымбека", "улица Жибек Жолы",
+    "проспект Аль-Фараби", "улица Сатпаева", "улица Тимирязева", "проспект Назарбаева", "улица Розыбакиева",
+]
+DISTRICTS = ["Алмалинский район", "Бостандыкский район", "Медеуский район", "Ауэзовский район"]
+
+
+def fake_place(key: str) -> dict:
+    """A deterministic Nominatim result for ``key``"""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    street = STREETS[digest[0] % len(STREETS)]
+    district = DISTRICTS[digest[1] % len(DISTRICTS)]
+    house_number = str(1 + int.from_bytes(digest[2:4], "big") % 300)
+    lat = 43.15 + int.from_bytes(digest[4:8], "big") / 2 ** 32 * 0.2
+    lon = 76.80 + int.from_bytes(digest[8:12], "big") / 2 ** 32 * 0.25
+    address = {
+        "house_number": house_number,
+        "road": street,
+        "city_district": district,
+        "city": "Алматы",
+        "ISO3166-2-lvl4": "KZ-75",
+        "postcode": f"050{digest[12] % 100:02d}0",
+        "country": "Казахстан",
+        "country_code": "kz",
+    }
+    return {
+        "place_id": int.from_bytes(digest[:6], "big"),
+        "licence": "Data © OpenStreetMap contributors, ODbL 1.0. https://osm.org/copyright",
+        "osm_type": "way",
+        "osm_id": int.from_bytes(digest[6:11], "big"),
+        "lat": f"{lat:.7f}",
+        "lon": f"{lon:.7f}",
+        "class": "building",
+        "type": "yes",
+        "importance": round(0.2 + digest[13] / 255 * 0.6, 6),
+        "display_name": f"{house_number}, {street}, {district}, Алматы, {address['postcode']}, Казахстан",
+        "address": address,
+    }
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def build_app(
+    latency_ms: float = 150,
+    jitter: float = 0.3,
+    error_rate: float = 0.0,
+    rate_limit: float = 0,
+    burst: int = 1,
+    seed: int = 48,
+) -> Starlette:
+    rng = random.Random(seed)
+    bucket = TokenBucket(rate_limit, burst) if rate_limit > 0 else None
+    stats = Counter()
+
+    async def respond(build):
+        stats["requests"] += 1
+        if bucket is not None and not bucket.take():
+            # The public server answers over-limit requests straight away
+            stats["rate_limited"] += 1
+            return JSONResponse({"error": "Too Many Requests"}, status_code=429)
+        if latency_ms > 0:
+            # Median latency_ms; jitter is the sigma of the underlying normal
+            await asyncio.sleep(latency_ms / 1000 * math.exp(rng.gauss(0, jitter)))
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "Service Unavailable"}, status_code=503)
+        stats["ok"] += 1
+        return JSONResponse(build())
+
+    async def search(request: Request):
+        query = request.query_params.get("q", "").strip().lower()
+        limit = min(int(request.query_params.get("limit", 10)), 40)
+        # Longer queries are more specific and match fewer places
+        matches = max(1, min(limit, 8 - len(query) // 4))
+        return await respond(lambda: [fake_place(f"{query}#{i}") for i in range(matches)] if query else [])
+
+    async def reverse(request: Request):
+        lat = request.query_params.get("lat", "")
+        lon = request.query_params.get("lon", "")
+        # Points within about 10 m resolve to the same building
+        return await respond(lambda: fake_place(f"{float(lat):.4f},{float(lon):.4f}"))
+
+    async def get_stats(request: Request):
+        return JSONResponse(dict(stats))
+
+    return Starlette(routes=[
+        Route("/search", search),
+        Route("/reverse", reverse),
+        Route("/stats", get_stats),
+    ])
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Median response delay")
+    parser.add_argument("--jitter", type=float, default=0.3, help="Spread of the delay (log-normal sigma)")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Share of requests failing with 503")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second before 429 (0: unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed at once within the rate limit")
+    parser.add_argument("--seed", type=int, default=48)
+    args = parser.parse_args()
+    app = build_app(args.latency_ms, args.jitter, args.error_rate, args.rate_limit, args.burst, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
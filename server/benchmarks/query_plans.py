@@ -0,0 +1,253 @@
+"""Query-plan regression check for the applications endpoints.
+
+Seeds a PostgreSQL database with a realistic volume of rows (a long tail of
+small profiles plus one heavy profile), then runs
+``EXPLAIN (ANALYZE, BUFFERS)`` on the statements each endpoint issues, built
+with the same helpers the routers use. Exits with status 1 if any plan falls
+back to a sequential scan that reads pages of an application table or partition.
+
+The target database is DROPPED AND RECREATED from the models unless
+``--skip-seed`` is given, so point it at a scratch database. The script
+refuses to run against the app's own ``DATABASE_URL``. It also refuses to
+seed a database that holds tables it did not create, such as
+``alembic_version`` in a migrated app database.
+
+Usage:
+    python -m benchmarks.query_plans --database-url postgresql+asyncpg://.../bench \\
+        [--profiles 100000] [--applications 2000000] [--heavy 20000] [--skip-seed]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import select, and_, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.applications import ORDERINGS, _own_listing, _page_query
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.db.base import Base
+from app.models import Account, Application, ApplicationCounter, OTPRequest, UserProfile
+from app.services.counter_service import ApplicationCounterService
+from app.services.export_service import ExportService
+from app.services.partition_service import PartitionService, add_months, is_partition, month_start
+
+CHECKED_TABLES = {table.name for table in Base.metadata.sorted_tables}
+HEAVY_PHONE = "+70000000001"
+# Position in the heavy profile's history that "deep page" cursors point at
+DEEP_OFFSET = 5000
+# Default page size of the listing endpoints
+PAGE_SIZE = 20
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO accounts (id, phone_number, is_verified, created_at, updated_at)
+    SELECT gen_random_uuid(), '+7' || lpad(g::text, 10, '0'), true, now(), now()
+    FROM generate_series(1, :profiles) AS g
+    """,
+    """
+    INSERT INTO user_profiles (id, account_id, name, surname, position, address, data_version, created_at, updated_at)
+    SELECT gen_random_uuid(), a.id, 'Имя', 'Фамилия', 'Амбассадор',
+           '{"city": "Алматы", "country_code": "kz"}'::jsonb, 0, now(), now()
+    FROM accounts AS a
+    """,
+    # Heavy profile gets :heavy rows, the rest are spread uniformly over all profiles
+    """
+    INSERT INTO applications (id, user_profile_id, address, description, image_urls, status, created_at, updated_at)
+    SELECT gen_random_uuid(), p.id,
+           jsonb_build_object('found', true, 'address', g || ', проспект Абая, Алматы',
+                             'city', 'Алматы', 'region', 'Алматы', 'country_code', 'kz', 'latitude', 43.2 + random() / 10, 'longitude', 76.8 + random() / 10),
+           'Проблема с освещением на улице № ' || g,
+           ARRAY['https://example.com/images/' || g || '.jpg'],
+           (ARRAY['pending', 'approved', 'rejected'])[1 + g % 3],
+           now() - make_interval(secs => g * 7), now()
+    FROM generate_series(1, :heavy) AS g,
+         (SELECT up.id FROM user_profiles AS up JOIN accounts AS a ON a.id = up.account_id
+          WHERE a.phone_number = :heavy_phone) AS p
+    """,
+    """
+    INSERT INTO applications (id, user_profile_id, address, description, image_urls, status, created_at, updated_at)
+    SELECT gen_random_uuid(), p.id,
+           jsonb_build_object('found', true, 'address', g || ', улица Сатпаева, Астана',
+                             'city', 'Астана', 'region', 'Астана', 'country_code', 'kz', 'latitude', 51.1 + random() / 10, 'longitude', 71.4 + random() / 10),
+           'Повреждение дорожного покрытия № ' || g,
+           ARRAY['https://example.com/images/' || g || '.jpg'],
+           (ARRAY['pending', 'approved', 'rejected'])[1 + g % 3],
+           now() - make_interval(secs => g * 3), now()
+    FROM generate_series(1, :tail) AS g
+    JOIN (SELECT id, row_number() OVER () - 1 AS n FROM user_profiles) AS p ON p.n = g % :profiles
+    """,
+    """
+    INSERT INTO application_counters (user_profile_id, total, pending, approved, rejected)
+    SELECT up.id,
+           COUNT(ap.id),
+           COUNT(ap.id) FILTER (WHERE ap.status = 'pending'),
+           COUNT(ap.id) FILTER (WHERE ap.status = 'approved'),
+           COUNT(ap.id) FILTER (WHERE ap.status = 'rejected')
+    FROM user_profiles AS up
+    LEFT JOIN applications AS ap ON ap.user_profile_id = up.id
+    GROUP BY up.id
+    """,
+    """
+    INSERT INTO otp_requests (phone_number, code, is_used, expires_at, created_at, updated_at)
+    SELECT '+7' || lpad((1 + g % :profiles)::text, 10, '0'), '1111', g % 4 <> 0,
+           now() + interval '5 minutes', now(), now()
+    FROM generate_series(1, :otps) AS g
+    """,
+]
+
+
+def same_database(first: str, second: str) -> bool:
+    def key(url: str):
+        url = make_url(url)
+        # The host may also be a socket directory in the query string
+        return url.get_backend_name(), url.host, url.port or 5432, url.database, url.query.get("host")
+    return key(first) == key(second)
+
+
+def unknown_tables(sync_conn) -> List[str]:
+    """Tables that seeding would drop but this script did not create"""
+    return sorted(
+        name for name in inspect(sync_conn).get_table_names()
+        if name not in CHECKED_TABLES and not is_partition(name)
+    )
+
+
+async def seed(conn, profiles: int, applications: int, heavy: int) -> None:
+    unknown = await conn.run_sync(unknown_tables)
+    if unknown:
+        sys.exit(f"refusing to drop a database holding tables this script did not create: {', '.join(unknown)}")
+    await conn.run_sync(Base.metadata.drop_all)
+    await conn.run_sync(Base.metadata.create_all)
+    # Seeded rows reach back about ten weeks
+    await PartitionService.ensure_partitions(AsyncSession(bind=conn), add_months(month_start(datetime.utcnow()), -3))
+    params = {
+        "profiles": profiles, "heavy": heavy, "tail": applications - heavy,
+        "otps": profiles * 2, "heavy_phone": HEAVY_PHONE,
+    }
+    for statement in SEED_STATEMENTS:
+        start = time.perf_counter()
+        await conn.execute(text(statement), {k: v for k, v in params.items() if f":{k}" in statement})
+        print(f"  seeded {statement.split()[2]:<22} {time.perf_counter() - start:7.1f}s")
+
+
+async def endpoint_queries(conn) -> Iterator[Tuple[str, Any]]:
+    """Build the statements issued by each endpoint for the heavy profile"""
+    account = (await conn.execute(select(Account).where(Account.phone_number == HEAVY_PHONE))).one()
+    profile = (await conn.execute(select(UserProfile).where(UserProfile.account_id == account.id))).one()
+    middle = (await conn.execute(
+        _own_listing(profile.id).order_by(Application.created_at.desc()).offset(DEEP_OFFSET).limit(1)
+    )).one()
+
+    def page(ordering: str, deep: bool, status_filter=None, city=None):
+        # Deep pages go through a cursor, as a client following X-Next-Cursor would send it
+        columns, _ = ORDERINGS[ordering]
+        cursor = encode_cursor(ordering, [getattr(middle, column.key) for column in columns]) if deep else None
+        statement, _ = _page_query(_own_listing(profile.id, status_filter, city), ordering, cursor, PAGE_SIZE)
+        return statement
+
+    queries = [
+        ("auth: account by phone", select(Account).where(Account.phone_number == HEAVY_PHONE)),
+        ("auth: pending OTP", select(OTPRequest).where(
+            and_(OTPRequest.phone_number == HEAVY_PHONE, OTPRequest.is_used == False)  # noqa: E712
+        ).order_by(OTPRequest.created_at.desc())),
+        ("profile: by account", select(UserProfile).where(UserProfile.account_id == account.id)),
+        ("applications: stats", select(ApplicationCounter).where(ApplicationCounter.user_profile_id == profile.id)),
+        ("applications: get by id", select(Application).where(
+            and_(Application.id == middle.id, Application.user_profile_id == profile.id)
+        )),
+        ("applications: by status, page 1", page("-created_at", False, status_filter="approved")),
+        ("applications: by status, deep", page("-created_at", True, status_filter="approved")),
+        ("applications: by city, page 1", page("-created_at", False, city="Алматы")),
+        ("applications: by city, deep", page("-created_at", True, city="Алматы")),
+    ]
+    for ordering in ORDERINGS:
+        queries.append((f"applications: list {ordering}, page 1", page(ordering, False)))
+        queries.append((f"applications: list {ordering}, deep", page(ordering, True)))
+    queries.append(("counters: reconcile batch", ApplicationCounterService.counts_query([profile.id])))
+    queries.append(("export: by city, first chunk", ExportService.build_query(city="Алматы").limit(1000)))
+    return queries
+
+
+def walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+async def explain(conn, statement) -> Dict[str, Any]:
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+    document = result.scalar_one()
+    return (json.loads(document) if isinstance(document, str) else document)[0]
+
+
+async def run(args) -> int:
+    engine = create_async_engine(args.database_url)
+    if not args.skip_seed:
+        print(f"seeding {args.profiles} profiles, {args.applications} applications")
+        async with engine.begin() as conn:
+            await seed(conn, args.profiles, args.applications, args.heavy)
+        # Fresh statistics and visibility map, as autovacuum would leave them
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE"))
+
+    failures: List[str] = []
+    async with engine.connect() as conn:
+        print(f"\n{'query':<40} {'ms':>8} {'hit':>7} {'read':>7}  scans")
+        for name, statement in await endpoint_queries(conn):
+            result = await explain(conn, statement)
+            plan = result["Plan"]
+            nodes = list(walk(plan))
+            scans = sorted({
+                f"{node['Node Type']}({node.get('Index Name') or node['Relation Name']})"
+                for node in nodes if "Relation Name" in node
+            })
+            # Scanning an empty table (a future partition, say) touches no pages and is no regression
+            seq_scans = [
+                node["Relation Name"] for node in nodes
+                if node["Node Type"] == "Seq Scan"
+                and (node["Relation Name"] in CHECKED_TABLES or is_partition(node["Relation Name"]))
+                and node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0) > 0
+            ]
+            print(
+                f"{name:<40} {result['Execution Time']:8.2f} {plan.get('Shared Hit Blocks', 0):7d} "
+                f"{plan.get('Shared Read Blocks', 0):7d}  {', '.join(scans)}"
+            )
+            if seq_scans:
+                failures.append(f"{name}: Seq Scan on {', '.join(seq_scans)}")
+    await engine.dispose()
+
+    if failures:
+        print("\nplan regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nno sequential scans on application tables")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="A scratch PostgreSQL database")
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--applications", type=int, default=2_000_000)
+    parser.add_argument("--heavy", type=int, default=20_000, help="applications owned by the heavy profile")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse previously seeded data")
+    args = parser.parse_args()
+
+    if not args.database_url.startswith("postgresql"):
+        parser.error("query plans are only meaningful on PostgreSQL")
+    if same_database(args.database_url, settings.database_url):
+        parser.error("--database-url is the app's own database; seeding would drop it")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,13 @@ import pytest
 import asyncio
 from typing import AsyncGenerator
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
-from app.db.base import Base, get_session
+from app.db.base import Base, get_primary_session, get_session
 from app.core.config import settings
+from app.core.middleware import RateLimitMiddleware
 
 # Test database URL
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
@@ -25,6 +27,7 @@ async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 app.dependency_overrides[get_session] = override_get_session
+app.dependency_overrides[get_primary_session] = override_get_session
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -61,3 +64,26 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 def client():
     ac = AsyncClient(app=app, base_url="http://test")
     return ac
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limit():
+    """Keep the in-memory rate limiter from leaking between tests"""
+    layer = app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, RateLimitMiddleware):
+            layer.clients.clear()
+        layer = getattr(layer, "app", None)
+
+
+@pytest.fixture(scope="function")
+def sql_statements():
+    """Collect SQL statements executed against the test database"""
+    statements = []
+    
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
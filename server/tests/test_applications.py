@@ -1,23 +1,38 @@
 import pytest
+import csv
+import io
+import json
+import os
+import uuid
 from httpx import AsyncClient
+from sqlalchemy import delete, event, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from unittest.mock import patch, AsyncMock
+from app.core.config import settings
+from datetime import datetime
+from app.models import Application, ApplicationArchiveCount, ApplicationCounter, UserProfile
 from app.schemas.address import AddressSchema
+from app.services.archive_service import ArchiveService, ArchiveWriter
+from app.services.counter_service import ApplicationCounterService
+from app.services.duplicate_service import DuplicateService
+from app.services.export_service import ExportService
+from app.services.review_service import ReviewService
+from tests.conftest import test_async_session, test_engine
 
 
-async def get_auth_headers(client: AsyncClient) -> dict:
+async def get_auth_headers(client: AsyncClient, phone_number: str = "+77771234567") -> dict:
     """Helper function to get authentication headers"""
     # Request OTP
     await client.post(
         "/auth/request-otp",
-        json={"phone_number": "+77771234567"}
+        json={"phone_number": phone_number}
     )
     
     # Verify OTP and get tokens
     response = await client.post(
         "/auth/verify-otp",
         json={
-            "phone_number": "+77771234567",
+            "phone_number": phone_number,
             "otp_code": "1111"
         }
     )
@@ -26,9 +41,9 @@ async def get_auth_headers(client: AsyncClient) -> dict:
     return {"Authorization": f"Bearer {tokens['access']}"}
 
 
-async def create_test_profile(client: AsyncClient) -> dict:
+async def create_test_profile(client: AsyncClient, phone_number: str = "+77771234567") -> dict:
     """Helper function to create a test profile"""
-    headers = await get_auth_headers(client)
+    headers = await get_auth_headers(client, phone_number)
     
     response = await client.post(
         "/api/accounts/profile/",
@@ -490,3 +505,701 @@ async def test_delete_application(client: AsyncClient, db_session: AsyncSession)
         headers=headers
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_my_applications_conditional_get(client: AsyncClient, db_session: AsyncSession):
+    """Test ETag revalidation of own applications list"""
+    headers = await create_test_profile(client, "+77770000027")
+    
+    first = await client.get("/api/applications/me/", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    
+    cached = await client.get("/api/applications/me/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        await client.post(
+            "/api/applications/",
+            json={"description": "Новая заявка", "image_urls": [], "address_query": "Алматы"},
+            headers=headers
+        )
+    
+    changed = await client.get("/api/applications/me/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_my_applications_cursor_pagination(client: AsyncClient, db_session: AsyncSession):
+    """Test walking own applications with keyset cursors"""
+    headers = await create_test_profile(client, "+77770000030")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        for i in range(5):
+            await client.post(
+                "/api/applications/",
+                json={"description": f"Заявка {i}", "image_urls": [], "address_query": "Алматы"},
+                headers=headers
+            )
+    
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"page_size": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/applications/me/", params=params, headers=headers)
+        assert response.status_code == 200
+        seen.extend(item["description"] for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+    
+    assert seen == [f"Заявка {i}" for i in reversed(range(5))]
+    assert cursor is None
+    
+    response = await client.get(
+        "/api/applications/",
+        params={"ordering": "created_at", "page_size": 3},
+        headers=headers
+    )
+    assert [item["description"] for item in response.json()] == ["Заявка 0", "Заявка 1", "Заявка 2"]
+    next_page = await client.get(
+        "/api/applications/",
+        params={"ordering": "created_at", "page_size": 3, "cursor": response.headers["x-next-cursor"]},
+        headers=headers
+    )
+    assert [item["description"] for item in next_page.json()] == ["Заявка 3", "Заявка 4"]
+    
+    mismatched = await client.get(
+        "/api/applications/",
+        params={"ordering": "status", "cursor": response.headers["x-next-cursor"]},
+        headers=headers
+    )
+    assert mismatched.status_code == 400
+    
+    invalid = await client.get("/api/applications/me/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert invalid.status_code == 400
+    
+    # Clients that predate pagination send neither parameter and still get everything
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        for batch in range(2):
+            await client.post(
+                "/api/applications/bulk/",
+                json={"items": [
+                    {"description": f"Пакет {batch}-{i}", "image_urls": [], "address_query": "Алматы"} for i in range(60)
+                ]},
+                headers=headers
+            )
+    everything = await client.get("/api/applications/me/", headers=headers)
+    assert len(everything.json()) == 125
+    assert len({item["id"] for item in everything.json()}) == 125
+    assert everything.json()[-1]["description"] == "Заявка 0"
+    assert "x-next-cursor" not in everything.headers
+    first_page = await client.get("/api/applications/me/", params={"page_size": 20}, headers=headers)
+    assert len(first_page.json()) == 20
+    assert "x-next-cursor" in first_page.headers
+
+
+@pytest.mark.asyncio
+async def test_listing_pages_match_detail_responses(client: AsyncClient, db_session: AsyncSession):
+    """Listing rows, computed in SQL, encode the same as the ORM-backed detail response"""
+    headers = await create_test_profile(client, "+77770000050")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=True, address="Абая 150, Алматы", city="Алматы")
+        await client.post(
+            "/api/applications/",
+            json={"description": "С фото", "image_urls": ["https://example.com/1.jpg", "https://example.com/2.jpg"],
+                  "address_query": "Абая 150"},
+            headers=headers
+        )
+        mock_geocode.return_value = AddressSchema(found=False)
+        await client.post(
+            "/api/applications/",
+            json={"description": "Без фото", "image_urls": [], "address_query": "где-то"},
+            headers=headers
+        )
+    
+    for path in ("/api/applications/", "/api/applications/me/", "/api/applications/status/pending/"):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200
+        items = response.json()
+        assert sorted(item["image_count"] for item in items) == [0, 2]
+        for item in items:
+            detail = await client.get(f"/api/applications/{item['id']}/", headers=headers)
+            assert item == detail.json()
+
+
+@pytest.mark.asyncio
+async def test_application_counters_and_reconcile(client: AsyncClient, db_session: AsyncSession):
+    """Test counters follow writes and reconciliation repairs drift"""
+    headers = await create_test_profile(client, "+77770000031")
+    await create_test_profile(client, "+77770000131")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        app_ids = []
+        for i in range(4):
+            create_response = await client.post(
+                "/api/applications/",
+                json={"description": f"Заявка {i}", "image_urls": [], "address_query": "Алматы"},
+                headers=headers
+            )
+            app_ids.append(create_response.json()["id"])
+    
+    await client.put(f"/api/applications/{app_ids[0]}/status/", json={"status": "approved"}, headers=headers)
+    await client.put(f"/api/applications/{app_ids[1]}/status/", json={"status": "rejected"}, headers=headers)
+    await client.delete(f"/api/applications/{app_ids[2]}/", headers=headers)
+    
+    stats = (await client.get("/api/applications/stats/", headers=headers)).json()
+    assert stats == {"total": 3, "pending": 1, "approved": 1, "rejected": 1, "approval_rate": 50.0}
+    profile = (await client.get("/api/accounts/profile/me/", headers=headers)).json()
+    assert profile["applications_count"] == 3
+    
+    async with test_async_session() as session:
+        await session.execute(
+            update(ApplicationCounter)
+            .where(ApplicationCounter.user_profile_id == uuid.UUID(profile["id"]))
+            .values(total=42, pending=0)
+        )
+        await session.commit()
+        
+        # The sweep commits batch by batch, releasing the counter rows it locked
+        profiles = await session.scalar(select(func.count(UserProfile.id)))
+        with patch.object(session, "commit", wraps=session.commit) as commit:
+            assert await ApplicationCounterService.reconcile(session, batch_size=1) >= 1
+        assert commit.call_count == profiles > 1
+        assert await ApplicationCounterService.reconcile(session) == 0
+    
+    stats = (await client.get("/api/applications/stats/", headers=headers)).json()
+    assert stats["total"] == 3
+    assert stats["pending"] == 1
+    
+    # A status change rebuilds a missing counter row with the new status counted once
+    async with test_async_session() as session:
+        await session.execute(delete(ApplicationCounter).where(ApplicationCounter.user_profile_id == uuid.UUID(profile["id"])))
+        await session.commit()
+    await client.put(f"/api/applications/{app_ids[3]}/status/", json={"status": "approved"}, headers=headers)
+    async with test_async_session() as session:
+        counter = await session.get(ApplicationCounter, uuid.UUID(profile["id"]))
+        assert (counter.total, counter.pending, counter.approved, counter.rejected) == (3, 0, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_export_applications_streams_filtered_rows(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test reviewers can export applications as NDJSON and CSV"""
+    headers = await create_test_profile(client, "+77770000034")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        for i in range(3):
+            mock_geocode.return_value = AddressSchema(
+                found=True,
+                address=f"{i}, улица Экспортная, Экспортград",
+                city="Экспортград" if i < 2 else "Алматы"
+            )
+            create_response = await client.post(
+                "/api/applications/",
+                json={"description": f"Экспорт {i}", "image_urls": [], "address_query": "Экспортград"},
+                headers=headers
+            )
+            assert create_response.status_code == 201
+    
+    forbidden = await client.get("/api/applications/export/", headers=headers)
+    assert forbidden.status_code == 403
+    
+    monkeypatch.setattr(settings, "reviewer_phone_numbers", ["+77770000034"])
+    response = await client.get(
+        "/api/applications/export/",
+        params={"city": "Экспортград", "status": "pending"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["description"] for row in rows] == ["Экспорт 0", "Экспорт 1"]
+    
+    response = await client.get(
+        "/api/applications/export/",
+        params={"format": "csv", "city": "Экспортград"},
+        headers=headers
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert [record["address"] for record in records] == [
+        "0, улица Экспортная, Экспортград",
+        "1, улица Экспортная, Экспортград",
+    ]
+    assert records[0]["city"] == "Экспортград"
+    
+    invalid = await client.get("/api/applications/export/", params={"format": "xml"}, headers=headers)
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_update(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test reviewers change many statuses at once and counters follow"""
+    reviewer_headers = await create_test_profile(client, "+77770000042")
+    owner_headers = await create_test_profile(client, "+77770000142")
+    
+    ids = {}
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=True, address="Ревизионная 1", city="Ревизия")
+        for name, headers in (("reviewer", reviewer_headers), ("owner", owner_headers)):
+            ids[name] = []
+            for i in range(2):
+                response = await client.post(
+                    "/api/applications/",
+                    json={"description": f"Ревизия {i}", "image_urls": [], "address_query": "Ревизия"},
+                    headers=headers
+                )
+                ids[name].append(response.json()["id"])
+    selected = ids["reviewer"] + ids["owner"][:1]
+    
+    forbidden = await client.put(
+        "/api/applications/bulk/status/", json={"status": "approved", "ids": selected}, headers=owner_headers
+    )
+    assert forbidden.status_code == 403
+    
+    monkeypatch.setattr(settings, "reviewer_phone_numbers", ["+77770000042"])
+    response = await client.put(
+        "/api/applications/bulk/status/", json={"status": "approved", "ids": selected}, headers=reviewer_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["updated"] == 3
+    assert sorted(response.json()["ids"]) == sorted(selected)
+    assert response.json()["truncated"] is False
+    
+    owner_stats = (await client.get("/api/applications/stats/", headers=owner_headers)).json()
+    assert (owner_stats["pending"], owner_stats["approved"]) == (1, 1)
+    reviewer_stats = (await client.get("/api/applications/stats/", headers=reviewer_headers)).json()
+    assert (reviewer_stats["pending"], reviewer_stats["approved"]) == (0, 2)
+    
+    # Applications already in the target status are not touched again
+    repeated = await client.put(
+        "/api/applications/bulk/status/", json={"status": "approved", "ids": selected}, headers=reviewer_headers
+    )
+    assert repeated.json() == {"updated": 0, "ids": [], "truncated": False}
+    
+    # A profile without a counter row gets one rebuilt instead of being skipped
+    async with test_async_session() as session:
+        owner_profile = select(Application.user_profile_id).where(Application.id == uuid.UUID(ids["owner"][0]))
+        await session.execute(
+            delete(ApplicationCounter).where(ApplicationCounter.user_profile_id == owner_profile.scalar_subquery())
+        )
+        await session.commit()
+    
+    by_filter = await client.put(
+        "/api/applications/bulk/status/",
+        json={"status": "rejected", "filter": {"city": "Ревизия", "status": "pending"}},
+        headers=reviewer_headers
+    )
+    assert by_filter.json()["ids"] == ids["owner"][1:]
+    async with test_async_session() as session:
+        owner_counter = (await session.execute(
+            select(ApplicationCounter).where(ApplicationCounter.user_profile_id == owner_profile.scalar_subquery())
+        )).scalar_one()
+    assert (owner_counter.pending, owner_counter.approved, owner_counter.rejected) == (0, 1, 1)
+    
+    # A filter matching more than the limit changes that many and says more are left
+    conditions = ExportService.filter_conditions(status="approved", city="Ревизия")
+    async with test_async_session() as session:
+        first = await ReviewService.bulk_update_status(session, "pending", conditions=conditions, limit=2)
+        rest = await ReviewService.bulk_update_status(session, "pending", conditions=conditions, limit=2)
+        await session.commit()
+    assert (len(first.ids), first.truncated) == (2, True)
+    assert (len(rest.ids), rest.truncated) == (1, False)
+    
+    for body in (
+        {"status": "approved", "ids": selected, "filter": {"city": "Ревизия"}},
+        {"status": "approved", "filter": {}},
+        {"status": "approved"},
+        {"status": "archived", "ids": selected},
+    ):
+        invalid = await client.put("/api/applications/bulk/status/", json=body, headers=reviewer_headers)
+        assert invalid.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_applications(client: AsyncClient, db_session: AsyncSession, sql_statements: list):
+    """Test bulk creation geocodes each address once and reports per-item results"""
+    headers = await create_test_profile(client, "+77770000035")
+    items = [
+        {"description": "Пакет 0", "image_urls": [], "address_query": "Абая 1, Алматы"},
+        {"description": "Пакет 1", "image_urls": ["https://example.com/1.jpg"], "address_query": "абая 1, алматы "},
+        {"description": "Пакет 2", "image_urls": ["https://example.com/x.jpg"] * 11, "address_query": "Алматы"},
+        {"description": "Пакет 3", "image_urls": []},
+        {"description": "Пакет 4", "image_urls": [], "latitude": 43.2220, "longitude": 76.8512},
+    ]
+    
+    connections = set()
+    checked_out = []
+    
+    def checkout(dbapi_connection, record, proxy):
+        connections.add(dbapi_connection)
+    
+    def checkin(dbapi_connection, record):
+        connections.discard(dbapi_connection)
+    
+    async def geocode(query):
+        # No database connection is held while the geocoder is waited on
+        checked_out.append(len(connections))
+        return AddressSchema(found=True, address="Абая 1, Алматы", city="Алматы")
+    
+    event.listen(test_engine.sync_engine, "checkout", checkout)
+    event.listen(test_engine.sync_engine, "checkin", checkin)
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode, \
+            patch('app.services.geocoding_service.geocoding_service.reverse_geocode_to_address') as mock_reverse:
+        mock_geocode.side_effect = geocode
+        mock_reverse.return_value = AddressSchema(found=False)
+        sql_statements.clear()
+        response = await client.post("/api/applications/bulk/", json={"items": items}, headers=headers)
+    event.remove(test_engine.sync_engine, "checkout", checkout)
+    event.remove(test_engine.sync_engine, "checkin", checkin)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 2
+    assert [result["status_code"] for result in data["results"]] == [201, 201, 422, 400, 201]
+    assert data["results"][1]["application"]["address"]["city"] == "Алматы"
+    assert data["results"][1]["application"]["image_count"] == 1
+    assert "Maximum 10 image URLs allowed" in data["results"][2]["error"]
+    assert data["results"][4]["application"]["address"]["found"] is False
+    assert mock_geocode.call_count == 1
+    assert checked_out == [0]
+    assert sum(statement.startswith("INSERT INTO applications") for statement in sql_statements) == 1
+    
+    stats = (await client.get("/api/applications/stats/", headers=headers)).json()
+    assert stats["total"] == 3
+    
+    too_many = await client.post(
+        "/api/applications/bulk/",
+        json={"items": [items[0]] * 101},
+        headers=headers
+    )
+    assert too_many.status_code == 422
+    
+    with patch.object(settings, "bulk_geocode_limit", 2), \
+            patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        too_many_addresses = await client.post(
+            "/api/applications/bulk/",
+            json={"items": [{**items[0], "address_query": f"Абая {i}"} for i in range(3)]},
+            headers=headers
+        )
+    assert too_many_addresses.status_code == 400
+    assert too_many_addresses.json()["detail"] == "At most 2 distinct addresses per request"
+    assert mock_geocode.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_filter_applications_by_city_and_region(client: AsyncClient, db_session: AsyncSession):
+    """Test city/region filters on the generated address columns"""
+    headers = await create_test_profile(client, "+77770000036")
+    locations = [("Алматы", "Алматы"), ("Астана", "Астана"), ("Талгар", "Алматинская область")]
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        for city, region in locations:
+            mock_geocode.return_value = AddressSchema(found=True, address=f"{city}, Казахстан", city=city, region=region)
+            await client.post(
+                "/api/applications/",
+                json={"description": f"Заявка {city}", "image_urls": [], "address_query": city},
+                headers=headers
+            )
+    
+    response = await client.get("/api/applications/me/", params={"city": "Астана"}, headers=headers)
+    assert [item["description"] for item in response.json()] == ["Заявка Астана"]
+    
+    response = await client.get("/api/applications/", params={"region": "Алматинская область"}, headers=headers)
+    assert [item["description"] for item in response.json()] == ["Заявка Талгар"]
+    
+    response = await client.get(
+        "/api/applications/status/pending/",
+        params={"city": "Алматы", "region": "Алматы"},
+        headers=headers
+    )
+    assert [item["description"] for item in response.json()] == ["Заявка Алматы"]
+
+
+@pytest.mark.asyncio
+async def test_search_applications(client: AsyncClient, db_session: AsyncSession):
+    """Test full-text search ranks and highlights own applications"""
+    headers = await create_test_profile(client, "+77770000037")
+    other_headers = await create_test_profile(client, "+77770000137")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=True, address="проспект Абая 10, Алматы", city="Алматы")
+        for description in ["Не горит фонарь во дворе", "Яма на дороге", "Фонарь мигает, фонарь гудит"]:
+            await client.post(
+                "/api/applications/",
+                json={"description": description, "image_urls": [], "address_query": "Абая 10"},
+                headers=headers
+            )
+        await client.post(
+            "/api/applications/",
+            json={"description": "Чужой фонарь", "image_urls": [], "address_query": "Абая 10"},
+            headers=other_headers
+        )
+    
+    response = await client.get("/api/applications/search/", params={"q": "фонарь"}, headers=headers)
+    assert response.status_code == 200
+    results = response.json()
+    assert [item["description"] for item in results] == ["Фонарь мигает, фонарь гудит", "Не горит фонарь во дворе"]
+    assert results[0]["rank"] >= results[1]["rank"]
+    assert "<mark>фонарь</mark>" in results[1]["highlight"]
+    
+    by_address = await client.get("/api/applications/search/", params={"q": "Абая"}, headers=headers)
+    assert len(by_address.json()) == 3
+    
+    application_id = results[1]["id"]
+    await client.put(f"/api/applications/{application_id}/", json={"description": "Починили"}, headers=headers)
+    await client.delete(f"/api/applications/{results[0]['id']}/", headers=headers)
+    response = await client.get("/api/applications/search/", params={"q": "фонарь"}, headers=headers)
+    assert response.json() == []
+    
+    syntax = await client.get("/api/applications/search/", params={"q": "Яма\"*)"}, headers=headers)
+    assert [item["description"] for item in syntax.json()] == ["Яма на дороге"]
+    
+    # Markup in the description comes back escaped; only the match markers are tags
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        await client.post(
+            "/api/applications/",
+            json={"description": "Люк <img src=x onerror=alert(1)> & забор", "image_urls": [], "address_query": "Абая"},
+            headers=headers
+        )
+    response = await client.get("/api/applications/search/", params={"q": "забор"}, headers=headers)
+    assert response.json()[0]["highlight"] == "Люк &lt;img src=x onerror=alert(1)&gt; &amp; <mark>забор</mark>"
+
+
+def write_archive(
+    archive_dir, partition: str, rows: list, archive_format: str = "ndjson", batch_size: int = 1000, indexed: bool = True
+) -> None:
+    """Write an archived partition the way the archival job does, or as written before archives had an index"""
+    file_name = ArchiveService.file_name(partition, archive_format)
+    writer = ArchiveWriter(str(archive_dir / file_name), archive_format)
+    for start in range(0, len(rows), batch_size):
+        writer.write(rows[start:start + batch_size])
+    writer.close()
+    entry = {"file": file_name, "index": ArchiveService.index_name(file_name)}
+    if not indexed:
+        os.remove(writer.index_path)
+        del entry["index"]
+    start = min(row["created_at"] for row in rows).replace(day=1)
+    ArchiveService.save_entry(str(archive_dir), partition, {
+        **entry, "format": archive_format, "start": start.date().isoformat(),
+        "end": start.replace(month=start.month + 1).date().isoformat(), "rows": len(rows), "complete": True,
+    })
+
+
+def archived_row(profile_id: str, description: str, created_at: datetime, status: str = "approved") -> dict:
+    return {
+        "id": uuid.uuid4(), "user_profile_id": uuid.UUID(profile_id), "status": status,
+        "address": {"address": "Архивная улица 1", "city": "Архивград"}, "description": description,
+        "image_urls": [], "city": "Архивград", "region": None, "country_code": None,
+        "created_at": created_at, "updated_at": created_at,
+    }
+
+
+@pytest.mark.asyncio
+async def test_archived_applications_fallback(client: AsyncClient, db_session: AsyncSession, tmp_path, monkeypatch):
+    """Test reads beyond the retention window fall back to archive files"""
+    headers = await create_test_profile(client, "+77770000038")
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=True, address="Новая улица 1", city="Алматы")
+        create_response = await client.post(
+            "/api/applications/",
+            json={"description": "Свежая", "image_urls": [], "address_query": "Новая"},
+            headers=headers
+        )
+    profile_id = create_response.json()["user_profile_id"]
+    
+    rows = [
+        archived_row(profile_id, "Старая 1", datetime(2023, 3, 5, 10, 0)),
+        archived_row(profile_id, "Старая 2", datetime(2023, 3, 20, 10, 0), status="rejected"),
+    ]
+    write_archive(tmp_path, "applications_y2023m03", rows)
+    foreign = archived_row(str(uuid.uuid4()), "Чужая", datetime(2023, 4, 1, 10, 0))
+    write_archive(tmp_path, "applications_y2023m04", [foreign])
+    monkeypatch.setattr(settings, "application_archive_dir", str(tmp_path))
+    
+    # Archives are only read for profiles known to have archived rows
+    response = await client.get("/api/applications/me/", headers=headers)
+    assert [item["description"] for item in response.json()] == ["Свежая"]
+    
+    async with test_async_session() as session:
+        session.add(ApplicationArchiveCount(user_profile_id=uuid.UUID(profile_id), total=2, approved=1, rejected=1))
+        await session.commit()
+    
+    first = await client.get("/api/applications/me/", params={"page_size": 2}, headers=headers)
+    assert [item["description"] for item in first.json()] == ["Свежая", "Старая 2"]
+    second = await client.get(
+        "/api/applications/me/",
+        params={"page_size": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers
+    )
+    assert [item["description"] for item in second.json()] == ["Старая 1"]
+    assert "X-Next-Cursor" not in second.headers
+    
+    oldest_first = await client.get("/api/applications/", params={"page_size": 2}, headers=headers)
+    assert [item["description"] for item in oldest_first.json()] == ["Старая 1", "Старая 2"]
+    
+    approved = await client.get("/api/applications/status/approved/", headers=headers)
+    assert [item["description"] for item in approved.json()] == ["Старая 1"]
+    
+    detail = await client.get(f"/api/applications/{rows[1]['id']}/", headers=headers)
+    assert detail.status_code == 200
+    assert detail.json()["address_display"] == "Архивная улица 1"
+    assert detail.json()["status"] == "rejected"
+    
+    # Misses are answered from the indexes without opening an archive file
+    with patch.object(ArchiveService, "_read_batches", side_effect=AssertionError), \
+            patch.object(ArchiveService, "_read_file", side_effect=AssertionError):
+        for missing_id in (uuid.uuid4(), foreign["id"]):
+            missing = await client.get(f"/api/applications/{missing_id}/", headers=headers)
+            assert missing.status_code == 404
+    
+    # Archived rows stay counted through reconciliation
+    async with test_async_session() as session:
+        await session.execute(
+            update(ApplicationCounter)
+            .where(ApplicationCounter.user_profile_id == uuid.UUID(profile_id))
+            .values(total=0, approved=0)
+        )
+        await ApplicationCounterService.reconcile(session, [uuid.UUID(profile_id)])
+        await session.commit()
+    stats = await client.get("/api/applications/stats/", headers=headers)
+    assert (stats.json()["total"], stats.json()["approved"], stats.json()["rejected"]) == (3, 1, 1)
+
+
+def test_parquet_archive_round_trip(tmp_path, monkeypatch):
+    """Test Parquet archives read back with the same types and filters"""
+    pytest.importorskip("pyarrow")
+    profile_id = str(uuid.uuid4())
+    rows = [archived_row(profile_id, f"Паркет {i}", datetime(2023, 5, 1 + i, 12, 30)) for i in range(3)]
+    rows[1]["status"] = "pending"
+    write_archive(tmp_path, "applications_y2023m05", rows, archive_format="parquet")
+    monkeypatch.setattr(settings, "application_archive_dir", str(tmp_path))
+    
+    pending = list(ArchiveService.iter_rows(ArchiveService.filters(user_profile_id=profile_id, status="pending")))
+    assert pending == [rows[1]]
+    later = list(ArchiveService.iter_rows({}, created_from=datetime(2023, 5, 2, 12, 30)))
+    assert [row["description"] for row in later] == ["Паркет 1", "Паркет 2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("archive_format", ["ndjson", "parquet"])
+async def test_archive_index(tmp_path, monkeypatch, archive_format):
+    """Test lookups read only the indexed batches, and unindexed archives are indexed by rewriting them"""
+    if archive_format == "parquet":
+        pytest.importorskip("pyarrow")
+    profile_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+    rows = [
+        archived_row(profile_id if i in (3, 7) else other_id, f"Строка {i}", datetime(2023, 6, 1 + i, 9, 0))
+        for i in range(10)
+    ]
+    write_archive(tmp_path, "applications_y2023m06", rows, archive_format, batch_size=2, indexed=False)
+    monkeypatch.setattr(settings, "application_archive_dir", str(tmp_path))
+    
+    # Without an index, detail lookups find nothing; listings still scan the file
+    assert await ArchiveService.find(rows[3]["id"], uuid.UUID(profile_id)) is None
+    assert list(ArchiveService.iter_rows(ArchiveService.filters(user_profile_id=profile_id))) == [rows[3], rows[7]]
+    
+    assert ArchiveService.index_archives(str(tmp_path), chunk_size=2) == ["applications_y2023m06"]
+    assert ArchiveService.index_archives(str(tmp_path)) == []
+    assert list(ArchiveService.iter_rows({})) == rows
+    
+    read_batches = ArchiveService._read_batches
+    with patch.object(ArchiveService, "_read_file", side_effect=AssertionError), \
+            patch.object(ArchiveService, "_read_batches", side_effect=read_batches) as reads:
+        found = await ArchiveService.find(rows[7]["id"], uuid.UUID(profile_id))
+        assert (found.id, found.description) == (rows[7]["id"], "Строка 7")
+        assert reads.call_args.args[3] == [3]
+        assert await ArchiveService.find(rows[7]["id"], uuid.UUID(other_id)) is None
+        
+        listed = list(ArchiveService.iter_rows(ArchiveService.filters(user_profile_id=profile_id)))
+        assert listed == [rows[3], rows[7]]
+        assert reads.call_args.args[3] == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_near_duplicates_flagged_for_reviewers(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test a similar description filed nearby soon after is flagged, and only that"""
+    first_headers = await create_test_profile(client, "+77770000046")
+    second_headers = await create_test_profile(client, "+77770000146")
+    description = "Сломан светофор на перекрёстке Абая и Сейфуллина, не горит зелёный сигнал"
+    
+    async def create(headers, text, latitude=43.2380, longitude=76.9450):
+        response = await client.post(
+            "/api/applications/",
+            json={"description": text, "image_urls": [], "latitude": latitude, "longitude": longitude},
+            headers=headers
+        )
+        return response.json()["id"]
+    
+    with patch('app.services.geocoding_service.geocoding_service.reverse_geocode_to_address') as mock_reverse:
+        mock_reverse.return_value = AddressSchema(found=False)
+        original = await create(first_headers, description)
+        # Another profile, a few metres away across a cell edge, reworded slightly
+        repeat = await create(second_headers, description.replace("не горит", "не работает"), 43.2381, 76.9452)
+        unrelated = await create(second_headers, "Яма на дороге возле школы номер 12", 43.2380, 76.9450)
+        # Same text in another city
+        elsewhere = await create(second_headers, description, 51.1280, 71.4300)
+    
+    forbidden = await client.get("/api/applications/duplicates/", headers=second_headers)
+    assert forbidden.status_code == 403
+    
+    monkeypatch.setattr(settings, "reviewer_phone_numbers", ["+77770000046"])
+    
+    async def flagged(own_ids):
+        """Walk every page, keeping this test's applications; other tests add flags too"""
+        items, cursor = [], None
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/applications/duplicates/", params=params, headers=first_headers)
+            assert response.status_code == 200
+            assert len(response.json()) <= 2
+            items += [item for item in response.json() if item["application"]["id"] in own_ids]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return items
+    
+    own_ids = {original, repeat, unrelated, elsewhere}
+    items = await flagged(own_ids)
+    assert [item["application"]["id"] for item in items] == [repeat]
+    assert items[0]["duplicate_of"]["id"] == original
+    assert 0.6 <= items[0]["similarity"] < 1.0
+    
+    # Bulk creation is checked against history and within the batch
+    batch = [{"description": description, "image_urls": [], "latitude": 43.2380, "longitude": 76.9450}] * 2
+    with patch('app.services.geocoding_service.geocoding_service.reverse_geocode_to_address') as mock_reverse:
+        mock_reverse.return_value = AddressSchema(found=False)
+        bulk = await client.post("/api/applications/bulk/", json={"items": batch}, headers=second_headers)
+    bulk_ids = [result["application"]["id"] for result in bulk.json()["results"]]
+    own_ids.update(bulk_ids)
+    items = await flagged(own_ids)
+    # Newest first
+    assert [item["application"]["id"] for item in items][2:] == [repeat]
+    assert sorted(item["application"]["id"] for item in items[:2]) == sorted(bulk_ids)
+    
+    # Deleting an application drops its flag; its duplicates keep theirs
+    await client.delete(f"/api/applications/{repeat}/", headers=second_headers)
+    await client.delete(f"/api/applications/{original}/", headers=first_headers)
+    assert sorted(item["application"]["id"] for item in await flagged(own_ids)) == sorted(bulk_ids)
+    
+    # Once the window has passed, flagged fingerprints stay for reviewers
+    monkeypatch.setattr(settings, "duplicate_window_hours", -1)
+    async with test_async_session() as session:
+        assert await DuplicateService.purge_expired(session) > 0
+    assert sorted(item["application"]["id"] for item in await flagged(own_ids)) == sorted(bulk_ids)
+    
+    invalid = await client.get("/api/applications/duplicates/", params={"cursor": "bogus"}, headers=first_headers)
+    assert invalid.status_code == 400
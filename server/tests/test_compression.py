@@ -0,0 +1,101 @@
+import pytest
+from httpx import AsyncClient
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+
+from app.core.etag import encoded_etag, etag_matches
+from app.core.middleware import CompressionMiddleware, negotiate_encoding
+
+
+def test_negotiate_encoding_respects_quality():
+    """Test Accept-Encoding negotiation"""
+    assert negotiate_encoding("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("*", ["zstd", "gzip"]) == "zstd"
+    assert negotiate_encoding("identity", ["gzip"]) is None
+    assert negotiate_encoding("", ["gzip"]) is None
+
+
+@pytest.mark.asyncio
+async def test_small_response_not_compressed(client: AsyncClient):
+    """Test responses below the threshold are sent as is"""
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_openapi_served_precompressed(client: AsyncClient):
+    """Test OpenAPI docs are compressed once and served from cache"""
+    first = await client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    second = await client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert second.headers["content-encoding"] == "gzip"
+    assert first.json() == second.json()
+    assert int(second.headers["content-length"]) < len(second.content)
+
+
+@pytest.mark.asyncio
+async def test_compressed_responses_get_their_own_etag():
+    """Test each content-coding has its own strong ETag and both forms revalidate"""
+    async def endpoint(scope, receive, send):
+        if etag_matches(Request(scope), '"v1"'):
+            response = Response(status_code=304, headers={"ETag": '"v1"'})
+        else:
+            response = PlainTextResponse("x" * 1000, headers={"ETag": '"v1"'})
+        await response(scope, receive, send)
+
+    app = CompressionMiddleware(endpoint)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        plain = await client.get("/", headers={"Accept-Encoding": "identity"})
+        compressed = await client.get("/", headers={"Accept-Encoding": "gzip"})
+        revalidated = await client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": '"v1-gzip"'})
+        revalidated_plain = await client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": '"v1"'})
+
+    assert plain.headers["etag"] == '"v1"'
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == '"v1-gzip"'
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == '"v1-gzip"'
+    assert revalidated_plain.status_code == 304
+    assert revalidated_plain.headers["etag"] == '"v1"'
+    # Weak validators may be shared between codings
+    assert encoded_etag('W/"v1"', "br") == 'W/"v1"'
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_compressed_incrementally():
+    """Test streaming bodies are compressed chunk by chunk"""
+    async def chunks():
+        for i in range(50):
+            yield f'{{"row": {i}, "description": "Проблема с освещением"}}\n'.encode()
+
+    async def endpoint(scope, receive, send):
+        await StreamingResponse(chunks(), media_type="application/x-ndjson")(scope, receive, send)
+
+    app = CompressionMiddleware(endpoint, minimum_size=10)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 50
+
+
+@pytest.mark.asyncio
+async def test_event_stream_not_compressed():
+    """Test excluded media types pass through untouched"""
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("data: x\n\n" * 200, media_type="text/event-stream")(scope, receive, send)
+
+    app = CompressionMiddleware(endpoint, minimum_size=10)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text.startswith("data: x")
@@ -0,0 +1,252 @@
+import hashlib
+import io
+import os
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch
+from PIL import Image
+
+from app.core.config import settings
+from app.main import app
+from app.schemas.address import AddressSchema
+from app.services.image_service import ImageService, ImageUploadError, LocalImageStore, WRITE_BUFFER_BYTES
+from app.services.thumbnail_service import ThumbnailGenerator
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 8
+
+
+async def get_auth_headers(client: AsyncClient, phone_number: str) -> dict:
+    """Helper function to get authentication headers"""
+    await client.post("/auth/request-otp", json={"phone_number": phone_number})
+    response = await client.post(
+        "/auth/verify-otp",
+        json={"phone_number": phone_number, "otp_code": "1111"}
+    )
+    tokens = response.json()["tokens"]
+    return {"Authorization": f"Bearer {tokens['access']}"}
+
+
+async def chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.fixture(autouse=True)
+def no_thumbnail_warming():
+    with patch("app.api.images.thumbnail_generator.warm"):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_save_stream_hashes_and_deduplicates(tmp_path):
+    store = LocalImageStore(str(tmp_path))
+    data = JPEG * 1024  # Larger than one write buffer
+    assert len(data) > WRITE_BUFFER_BYTES
+
+    first = await ImageService.save_stream(store, chunks(data, 64 * 1024))
+    again = await ImageService.save_stream(store, chunks(data, 1000))
+
+    assert first.key == again.key == f"{hashlib.sha256(data).hexdigest()}.jpg"
+    assert first.created and not again.created
+    assert first.size == len(data)
+    with open(store.path(first.key), "rb") as f:
+        assert f.read() == data
+    # Nothing left behind in the spool directory
+    assert os.listdir(store.temp_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_invalid_images(client: AsyncClient, tmp_path):
+    headers = await get_auth_headers(client, "+77770000044")
+    store = LocalImageStore(str(tmp_path))
+    with patch("app.api.images.image_store", store):
+        response = await client.post(
+            "/api/images/", content=b"GIF89a" + b"\x00" * 32, headers={**headers, "Content-Type": "image/gif"}
+        )
+        assert response.status_code == 415
+
+        with patch.object(settings, "image_max_bytes", 1000):
+            response = await client.post(
+                "/api/images/", content=chunks(JPEG, 256), headers={**headers, "Content-Type": "image/jpeg"}
+            )
+        assert response.status_code == 413
+
+        response = await client.post(
+            "/api/images/", files={"note": (None, "text only")}, headers=headers
+        )
+        assert response.status_code == 400
+    assert os.listdir(store.temp_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_truncated_multipart_rejected(tmp_path):
+    """Test a body cut off before the closing boundary is not taken as complete"""
+    store = LocalImageStore(str(tmp_path))
+    content_type = "multipart/form-data; boundary=b"
+    parts = [
+        b'--b\r\nContent-Disposition: form-data; name="files"; filename="%s"\r\n\r\n%s\r\n' % (name, data)
+        for name, data in ((b"a.png", PNG), (b"b.jpg", JPEG))
+    ]
+    body = b"".join(parts) + b"--b--\r\n"
+    
+    images = await ImageService.receive(store, content_type, chunks(body, 100))
+    assert [image.size for image in images] == [len(PNG), len(JPEG)]
+    
+    # In the middle of the second image, and after it but before the closing boundary
+    for truncated in (body[:len(parts[0]) + 200], b"".join(parts)):
+        with pytest.raises(ImageUploadError, match="Incomplete multipart body"):
+            await ImageService.receive(store, content_type, chunks(truncated, 100))
+    assert os.listdir(store.temp_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_and_link_application_images(client: AsyncClient, tmp_path):
+    headers = await get_auth_headers(client, "+77770000144")
+    await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Test", "surname": "User", "position": "Tester"},
+        headers=headers
+    )
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        application = await client.post(
+            "/api/applications/",
+            json={"description": "Фото", "image_urls": [], "address_query": "Алматы"},
+            headers=headers
+        )
+    application_id = application.json()["id"]
+
+    store = LocalImageStore(str(tmp_path))
+    with patch("app.api.images.image_store", store):
+        # Standalone upload, streamed as a raw body
+        response = await client.post(
+            "/api/images/", content=chunks(PNG, 16), headers={**headers, "Content-Type": "image/png"}
+        )
+        assert response.status_code == 201
+        png = response.json()["images"][0]
+        assert png["key"] == f"{hashlib.sha256(PNG).hexdigest()}.png"
+        assert png["url"] == f"/api/images/{png['key']}"
+        assert png["created"] is True
+
+        # The same PNG again plus a JPEG, as multipart; the PNG is linked once
+        response = await client.post(
+            f"/api/applications/{application_id}/images/",
+            files=[("files", ("a.png", PNG, "image/png")), ("files", ("b.jpg", JPEG, "image/jpeg"))],
+            data={"caption": "ignored"},
+            headers=headers
+        )
+        assert response.status_code == 200
+        image_urls = response.json()["image_urls"]
+        assert image_urls == [png["url"], f"/api/images/{hashlib.sha256(JPEG).hexdigest()}.jpg"]
+        assert response.json()["image_count"] == 2
+
+        response = await client.post(
+            f"/api/applications/{application_id}/images/",
+            files=[("files", ("a.png", PNG, "image/png"))],
+            headers=headers
+        )
+        assert response.json()["image_urls"] == image_urls
+
+        response = await client.get(image_urls[1])
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert response.content == JPEG
+
+    response = await client.get(f"/api/images/{'0' * 64}.jpg")
+    assert response.status_code == 404
+    response = await client.get("/api/images/../../etc/passwd")
+    assert response.status_code == 404
+
+
+def encode_image(size, image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_image_range_and_cache_headers(client: AsyncClient, tmp_path):
+    store = LocalImageStore(str(tmp_path))
+    image = await ImageService.save_stream(store, chunks(JPEG, 512))
+    url = f"/api/images/{image.key}"
+    with patch("app.api.images.image_store", store):
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.content == JPEG
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["accept-ranges"] == "bytes"
+        etag = response.headers["etag"]
+
+        response = await client.get(url, headers={"Range": "bytes=4-13"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 4-13/{len(JPEG)}"
+        assert response.content == JPEG[4:14]
+
+        response = await client.get(url, headers={"Range": "bytes=-6"})
+        assert response.status_code == 206
+        assert response.content == JPEG[-6:]
+
+        # A stale If-Range gets the whole file; several ranges too
+        response = await client.get(url, headers={"Range": "bytes=0-1", "If-Range": '"other"'})
+        assert response.status_code == 200
+        response = await client.get(url, headers={"Range": "bytes=0-1,5-6"})
+        assert response.status_code == 200
+
+        response = await client.get(url, headers={"Range": f"bytes={len(JPEG)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(JPEG)}"
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+        response = await client.head(url)
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(JPEG))
+        assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_thumbnails_rendered_in_process_pool(client: AsyncClient, tmp_path):
+    store = LocalImageStore(str(tmp_path / "images"))
+    generator = ThumbnailGenerator(str(tmp_path / "thumbnails"), workers=1)
+    photo = await ImageService.save_stream(store, chunks(encode_image((2000, 1000), "JPEG"), 4096))
+    graphic = await ImageService.save_stream(store, chunks(encode_image((100, 60), "PNG"), 4096))
+    heic = await ImageService.save_stream(store, chunks(b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64, 4096))
+    try:
+        with patch("app.api.images.image_store", store), patch("app.api.images.thumbnail_generator", generator):
+            responses = [await client.get(f"/api/images/thumb/{photo.key}") for _ in range(2)]
+            for response in responses:
+                assert response.status_code == 200
+                assert response.headers["content-type"] == "image/jpeg"
+                assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+                assert Image.open(io.BytesIO(response.content)).size == (320, 160)
+            assert os.path.exists(generator.path(photo.key, "thumb"))
+
+            response = await client.head(f"/api/images/thumb/{photo.key}")
+            assert response.status_code == 200
+            assert response.headers["content-length"] == str(os.path.getsize(generator.path(photo.key, "thumb")))
+            assert response.content == b""
+
+            response = await client.get(f"/api/images/medium/{photo.key}", headers={"Range": "bytes=0-1"})
+            assert response.status_code == 206
+            assert response.content == b"\xff\xd8"
+
+            # Small images are not scaled up
+            response = await client.get(f"/api/images/thumb/{graphic.key}")
+            assert Image.open(io.BytesIO(response.content)).size == (100, 60)
+
+            assert (await client.get(f"/api/images/thumb/{heic.key}")).status_code == 404
+            assert (await client.get(f"/api/images/huge/{photo.key}")).status_code == 404
+            assert (await client.get(f"/api/images/thumb/{'0' * 64}.jpg")).status_code == 404
+    finally:
+        generator.shutdown()
+
+
+def test_image_routes_documented_once():
+    """Test HEAD routes stay out of the schema, so operation ids are unique"""
+    paths = app.openapi()["paths"]
+    operation_ids = [operation["operationId"] for path in paths.values() for operation in path.values()]
+    assert len(operation_ids) == len(set(operation_ids))
+    assert list(paths["/api/images/{key}"]) == ["get"]
+    assert list(paths["/api/images/{variant}/{key}"]) == ["get"]
@@ -0,0 +1,131 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select, func
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.middleware import RateLimitMiddleware
+from app.core.scheduler import Scheduler
+from app.models import OTPRequest
+from app.services.maintenance_service import MaintenanceService
+from tests.conftest import test_async_session, test_engine
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_otps_in_batches():
+    """Test expired OTPs are deleted batch by batch and live ones kept"""
+    now = datetime.utcnow()
+    async with test_async_session() as session:
+        for i in range(5):
+            session.add(OTPRequest(phone_number="+77770000039", is_used=i % 2 == 0, expires_at=now - timedelta(minutes=i + 1)))
+        session.add(OTPRequest(phone_number="+77770000039", expires_at=now + timedelta(minutes=5)))
+        await session.commit()
+        
+        deleted = await MaintenanceService.purge_expired_otps(session, batch_size=2)
+        
+        remaining = await session.scalar(
+            select(func.count()).select_from(OTPRequest).where(OTPRequest.phone_number == "+77770000039")
+        )
+    assert deleted >= 5
+    assert remaining == 1
+
+
+def test_evict_stale_rate_limit_windows():
+    """Test clients whose calls all fell out of the window are forgotten"""
+    limiter = RateLimitMiddleware(app=None, calls=10, period=60)
+    limiter.clients = {"old": {"calls": [100.0]}, "recent": {"calls": [100.0, 150.0]}, "empty": {"calls": []}}
+    
+    assert limiter.evict_stale(now=170.0) == 2
+    assert list(limiter.clients) == ["recent"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_records_job_metrics():
+    """Test job runs report duration, rows affected and failures"""
+    scheduler = Scheduler(test_engine)
+    
+    async def purge() -> int:
+        return 7
+    
+    async def broken() -> int:
+        raise RuntimeError("boom")
+    
+    good = scheduler.add_job("test_purge", 60, purge)
+    bad = scheduler.add_job("test_broken", 60, broken)
+    
+    # Without PostgreSQL there is a single process, which always leads
+    assert await scheduler.elect() is True
+    assert await scheduler.run_job(good) == 7
+    assert await scheduler.run_job(bad) is None
+    
+    exposition = metrics.render()
+    assert 'scheduler_job_rows_affected_total{job="test_purge"} 7.0' in exposition
+    assert 'scheduler_job_duration_seconds_count{job="test_purge"} 1' in exposition
+    assert 'scheduler_job_runs_total{job="test_broken",outcome="error"} 1.0' in exposition
+    assert "scheduler_is_leader 1" in exposition
+    
+    await scheduler.stop()
+    assert scheduler.is_leader is False
+
+
+@pytest.mark.asyncio
+async def test_new_leader_runs_start_jobs():
+    """Test run_on_start jobs run at start and again when a worker takes over, not after an interval"""
+    scheduler = Scheduler(test_engine, election_interval=3600)
+    runs = {"partitions": 0, "purge": 0}
+    
+    async def partitions() -> int:
+        runs["partitions"] += 1
+        return 0
+    
+    async def purge() -> int:
+        runs["purge"] += 1
+        return 0
+    
+    scheduler.add_job("test_partitions", 3600, partitions, run_on_start=True)
+    scheduler.add_job("test_interval_only", 3600, purge)
+    await scheduler.start()
+    await asyncio.sleep(0.05)
+    assert runs == {"partitions": 1, "purge": 0}
+    
+    # Keeping leadership is not a takeover
+    await scheduler.elect()
+    await asyncio.sleep(0.05)
+    assert runs == {"partitions": 1, "purge": 0}
+    
+    # Another worker led in between; this one takes over again
+    await scheduler._resign()
+    await scheduler.elect()
+    await asyncio.sleep(0.05)
+    assert runs == {"partitions": 2, "purge": 0}
+    
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient):
+    """Test metrics are served in Prometheus text format"""
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE scheduler_job_runs_total counter" in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_restricted(client: AsyncClient, monkeypatch):
+    """Test metrics are refused outside the allowed networks unless the token is sent"""
+    monkeypatch.setattr(settings, "metrics_allowed_networks", ["10.0.0.0/8"])
+    response = await client.get("/metrics")
+    assert response.status_code == 403
+    
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    response = await client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 403
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    
+    monkeypatch.setattr(settings, "metrics_allowed_networks", ["127.0.0.0/8"])
+    response = await client.get("/metrics")
+    assert response.status_code == 200
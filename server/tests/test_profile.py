@@ -6,19 +6,19 @@ from unittest.mock import patch
 from app.schemas.address import AddressSchema
 
 
-async def get_auth_headers(client: AsyncClient) -> dict:
+async def get_auth_headers(client: AsyncClient, phone_number: str = "+77771234567") -> dict:
     """Helper function to get authentication headers"""
     # Request OTP
     await client.post(
         "/auth/request-otp",
-        json={"phone_number": "+77771234567"}
+        json={"phone_number": phone_number}
     )
     
     # Verify OTP and get tokens
     response = await client.post(
         "/auth/verify-otp",
         json={
-            "phone_number": "+77771234567",
+            "phone_number": phone_number,
             "otp_code": "1111"
         }
     )
@@ -195,3 +195,32 @@ async def test_delete_profile_success(client: AsyncClient, db_session: AsyncSess
         headers=headers
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_my_profile_conditional_get(client: AsyncClient, db_session: AsyncSession):
+    """Test ETag revalidation of current user's profile"""
+    headers = await get_auth_headers(client, "+77770000028")
+    
+    await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Айдар", "surname": "Назарбаев", "position": "Менеджер"},
+        headers=headers
+    )
+    
+    first = await client.get("/api/accounts/profile/me/", headers=headers)
+    etag = first.headers["etag"]
+    
+    cached = await client.get("/api/accounts/profile/me/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    
+    await client.patch(
+        "/api/accounts/profile/me/",
+        json={"position": "Старший менеджер"},
+        headers=headers
+    )
+    
+    changed = await client.get("/api/accounts/profile/me/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["position"] == "Старший менеджер"
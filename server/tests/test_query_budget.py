@@ -0,0 +1,88 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from unittest.mock import patch
+
+from app.schemas.address import AddressSchema
+
+
+PHONE_NUMBER = "+77770000029"
+
+
+async def get_auth_headers(client: AsyncClient) -> dict:
+    """Helper function to get authentication headers"""
+    await client.post("/auth/request-otp", json={"phone_number": PHONE_NUMBER})
+    response = await client.post(
+        "/auth/verify-otp",
+        json={"phone_number": PHONE_NUMBER, "otp_code": "1111"}
+    )
+    tokens = response.json()["tokens"]
+    return {"Authorization": f"Bearer {tokens['access']}"}
+
+
+async def assert_statements(sql_statements: list, budget: int, request):
+    """Run a request and fail if it issues more SQL statements than budgeted"""
+    sql_statements.clear()
+    response = await request
+    assert response.status_code < 400, response.text
+    assert len(sql_statements) <= budget, "\n".join(sql_statements)
+    return response
+
+
+@pytest.mark.asyncio
+async def test_endpoint_query_budgets(client: AsyncClient, db_session: AsyncSession, sql_statements: list):
+    """Test each endpoint stays within its SQL statement budget regardless of row count"""
+    headers = await get_auth_headers(client)
+    await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Test", "surname": "User", "position": "Tester"},
+        headers=headers
+    )
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        for i in range(5):
+            response = await assert_statements(
+                sql_statements, 5,
+                client.post(
+                    "/api/applications/",
+                    json={"description": f"Проблема {i}", "image_urls": [], "address_query": "Алматы"},
+                    headers=headers
+                )
+            )
+        # A batch costs one statement more than a single create, however large:
+        # the profile is read again after the connection is released for geocoding
+        await assert_statements(
+            sql_statements, 6,
+            client.post(
+                "/api/applications/bulk/",
+                json={"items": [
+                    {"description": f"Пакет {i}", "image_urls": [], "address_query": "Алматы"} for i in range(20)
+                ]},
+                headers=headers
+            )
+        )
+    application_id = response.json()["id"]
+    
+    await assert_statements(sql_statements, 1, client.get(f"/auth/check-verification?phone_number=%2B{PHONE_NUMBER[1:]}"))
+    await assert_statements(sql_statements, 3, client.get("/api/accounts/profile/me/", headers=headers))
+    await assert_statements(sql_statements, 3, client.get("/api/applications/me/", headers=headers))
+    await assert_statements(sql_statements, 3, client.get("/api/applications/", headers=headers))
+    await assert_statements(sql_statements, 3, client.get("/api/applications/status/pending/", headers=headers))
+    await assert_statements(sql_statements, 3, client.get(f"/api/applications/{application_id}/", headers=headers))
+    await assert_statements(
+        sql_statements, 5,
+        client.put(f"/api/applications/{application_id}/", json={"description": "Обновлено"}, headers=headers)
+    )
+    await assert_statements(sql_statements, 3, client.get("/api/applications/stats/", headers=headers))
+    # Includes the status event for the stream
+    await assert_statements(
+        sql_statements, 7,
+        client.put(f"/api/applications/{application_id}/status/", json={"status": "approved"}, headers=headers)
+    )
+    await assert_statements(sql_statements, 6, client.delete(f"/api/applications/{application_id}/", headers=headers))
+    await assert_statements(
+        sql_statements, 6,
+        client.put("/api/accounts/profile/me/", json={"position": "Lead"}, headers=headers)
+    )
+    await assert_statements(sql_statements, 5, client.delete("/api/accounts/profile/me/", headers=headers))
@@ -0,0 +1,107 @@
+import time
+import uuid
+import pytest
+from httpx import AsyncClient
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from app.db import base
+from app.main import app
+from app.core.middleware import ReadYourWritesMiddleware
+from app.models import ApplicationCounter
+from app.services.counter_service import ApplicationCounterService
+from tests.conftest import test_async_session
+
+
+def make_request(method: str = "GET", headers: dict = None) -> Request:
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": "/", "headers": raw_headers})
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(base, "replica_session_maker", test_async_session)
+
+
+def test_no_replica_configured_uses_primary():
+    """Test everything goes to the primary without a replica"""
+    assert base.use_replica(make_request("GET")) is False
+
+
+def test_safe_requests_routed_to_replica(replica):
+    """Test GET/HEAD go to the replica and writes stay on the primary"""
+    assert base.use_replica(make_request("GET")) is True
+    assert base.use_replica(make_request("HEAD")) is True
+    assert base.use_replica(make_request("POST")) is False
+    assert base.use_replica(make_request("PUT")) is False
+
+
+def test_read_your_writes_window(replica):
+    """Test reads right after the client's own write stay on the primary"""
+    recent = str(time.time() - 1)
+    expired = str(time.time() - base.settings.replica_read_your_writes_seconds - 1)
+
+    assert base.use_replica(make_request("GET", {"X-Last-Write": recent})) is False
+    assert base.use_replica(make_request("GET", {"Cookie": f"last_write={recent}"})) is False
+    assert base.use_replica(make_request("GET", {"X-Last-Write": expired})) is True
+    assert base.use_replica(make_request("GET", {"X-Last-Write": "garbage"})) is False
+
+
+@pytest.mark.asyncio
+async def test_replica_session_marked_read_only(replica):
+    """Test sessions opened for the replica are flagged read-only"""
+    sessions = base.get_session(make_request("GET"))
+    session = await sessions.__anext__()
+    assert session.info["read_only"] is True
+    await sessions.aclose()
+
+    sessions = base.get_session(make_request("POST"))
+    session = await sessions.__anext__()
+    assert session.info["read_only"] is False
+    await sessions.aclose()
+
+
+@pytest.mark.asyncio
+async def test_status_stream_reads_primary(replica):
+    """Test the status event stream catches up from the primary although it is a GET"""
+    sessions = base.get_primary_session()
+    session = await sessions.__anext__()
+    assert session.info["read_only"] is False
+    assert session.bind is base.engine
+    await sessions.aclose()
+    
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/api/applications/events/")
+    assert base.get_primary_session in [dependency.call for dependency in route.dependant.dependencies]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_stamped():
+    """Test successful writes return the last-write token"""
+    async def endpoint(scope, receive, send):
+        status_code = 400 if scope["path"] == "/bad" else 201
+        await PlainTextResponse("ok", status_code=status_code)(scope, receive, send)
+
+    app = ReadYourWritesMiddleware(endpoint, window_seconds=5)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        write = await client.post("/")
+        read = await client.get("/")
+        failed = await client.post("/bad")
+
+    assert float(write.headers["x-last-write"]) <= time.time()
+    assert "last_write=" in write.headers["set-cookie"]
+    assert "Max-Age=5" in write.headers["set-cookie"]
+    assert "x-last-write" not in read.headers
+    assert "x-last-write" not in failed.headers
+
+
+@pytest.mark.asyncio
+async def test_counts_on_replica_do_not_write():
+    """Test missing counters are computed, not repaired, on a read-only session"""
+    profile_id = uuid.uuid4()
+    async with test_async_session() as session:
+        session.info["read_only"] = True
+        counts = await ApplicationCounterService.get_counts(session, profile_id)
+
+        assert counts == {"total": 0, "pending": 0, "approved": 0, "rejected": 0}
+        assert not session.new
+        assert await session.get(ApplicationCounter, profile_id) is None
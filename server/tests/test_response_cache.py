@@ -0,0 +1,120 @@
+import uuid
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from unittest.mock import patch
+
+from app.core.cache import MemoryCacheBackend
+from app.models import ApplicationCounter
+from app.schemas.address import AddressSchema
+from app.services.counter_service import ApplicationCounterService
+from tests.conftest import test_async_session
+
+
+async def get_auth_headers(client: AsyncClient, phone_number: str) -> dict:
+    """Helper function to get authentication headers"""
+    await client.post("/auth/request-otp", json={"phone_number": phone_number})
+    response = await client.post(
+        "/auth/verify-otp",
+        json={"phone_number": phone_number, "otp_code": "1111"}
+    )
+    tokens = response.json()["tokens"]
+    return {"Authorization": f"Bearer {tokens['access']}"}
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_lru_bounds():
+    """Test the in-process backend evicts least recently used entries"""
+    backend = MemoryCacheBackend(max_entries=2, max_bytes=10)
+    await backend.set("a", "1", b"xxx")
+    await backend.set("b", "1", b"yyy")
+    await backend.get("a", "1")
+    await backend.set("c", "1", b"zzz")
+    
+    assert await backend.get("a", "1") == b"xxx"
+    assert await backend.get("b", "1") is None
+    assert await backend.get("c", "1") == b"zzz"
+    
+    # Size bound: a large entry pushes out older ones, an oversized one is skipped
+    await backend.set("d", "1", b"12345678")
+    assert await backend.get("a", "1") is None
+    assert await backend.get("c", "1") is None
+    await backend.set("e", "1", b"12345678901")
+    assert await backend.get("e", "1") is None
+    assert backend.size == 8
+    
+    await backend.set("d", "2", b"")
+    await backend.invalidate("d")
+    assert await backend.get("d", "1") is None
+    assert backend.size == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_views_invalidated_by_writes(client: AsyncClient, sql_statements: list):
+    """Test repeated reads skip the data queries and writes are visible immediately"""
+    headers = await get_auth_headers(client, "+77770000041")
+    await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Test", "surname": "User", "position": "Tester"},
+        headers=headers
+    )
+    
+    views = ("/api/applications/stats/", "/api/applications/me/", "/api/accounts/profile/me/")
+    first = {view: await client.get(view, headers=headers) for view in views}
+    for view in views:
+        sql_statements.clear()
+        response = await client.get(view, headers=headers)
+        assert response.status_code == 200
+        assert response.content == first[view].content
+        assert response.headers["etag"] == first[view].headers["etag"]
+        # Account and profile only
+        assert len(sql_statements) == 2, "\n".join(sql_statements)
+    
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        created = await client.post(
+            "/api/applications/",
+            json={"description": "Кэш", "image_urls": [], "address_query": "Алматы"},
+            headers=headers
+        )
+    application_id = created.json()["id"]
+    
+    assert (await client.get("/api/applications/stats/", headers=headers)).json()["total"] == 1
+    assert [item["id"] for item in (await client.get("/api/applications/me/", headers=headers)).json()] == [application_id]
+    assert (await client.get("/api/accounts/profile/me/", headers=headers)).json()["applications_count"] == 1
+    
+    await client.put(f"/api/applications/{application_id}/status/", json={"status": "approved"}, headers=headers)
+    assert (await client.get("/api/applications/stats/", headers=headers)).json()["approved"] == 1
+    
+    await client.patch("/api/accounts/profile/me/", json={"position": "Lead"}, headers=headers)
+    assert (await client.get("/api/accounts/profile/me/", headers=headers)).json()["position"] == "Lead"
+    
+    await client.delete(f"/api/applications/{application_id}/", headers=headers)
+    assert (await client.get("/api/applications/stats/", headers=headers)).json()["total"] == 0
+    assert (await client.get("/api/applications/me/", headers=headers)).json() == []
+
+
+@pytest.mark.asyncio
+async def test_counter_repair_invalidates_cached_views(client: AsyncClient):
+    """Test reconciling drifted counters changes the cached stats"""
+    headers = await get_auth_headers(client, "+77770000141")
+    profile = await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Test", "surname": "User", "position": "Tester"},
+        headers=headers
+    )
+    profile_id = uuid.UUID(profile.json()["id"])
+    
+    async with test_async_session() as session:
+        await session.execute(
+            update(ApplicationCounter)
+            .where(ApplicationCounter.user_profile_id == profile_id)
+            .values(total=5, pending=5)
+        )
+        await session.commit()
+    assert (await client.get("/api/applications/stats/", headers=headers)).json()["total"] == 5
+    
+    async with test_async_session() as session:
+        assert await ApplicationCounterService.reconcile(session) >= 1
+        await session.commit()
+    assert (await client.get("/api/applications/stats/", headers=headers)).json()["total"] == 0
@@ -0,0 +1,44 @@
+import json
+import uuid
+from datetime import datetime
+
+from app.core.responses import ORJSONModelResponse
+from app.schemas.application import ApplicationResponseSchema, ApplicationStatsSchema
+
+
+def test_orjson_response_matches_pydantic_json():
+    """Test the fast encoder produces the same JSON as pydantic"""
+    application = ApplicationResponseSchema(
+        id=uuid.uuid4(),
+        user_profile_id=uuid.uuid4(),
+        address={"found": True, "address": "ул. Абая, Алматы", "latitude": 43.222},
+        description="Яма на дороге",
+        image_urls=["https://example.com/pothole.jpg"],
+        status="pending",
+        address_display="ул. Абая, Алматы",
+        image_count=1,
+        created_at=datetime(2025, 9, 16, 12, 29, 42, 131672),
+        updated_at=datetime(2025, 9, 16, 12, 29, 42)
+    )
+    
+    response = ORJSONModelResponse([application])
+    
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [json.loads(application.model_dump_json())]
+
+
+def test_orjson_response_encodes_single_model():
+    """Test a bare model is encoded as an object"""
+    stats = ApplicationStatsSchema(total=3, pending=1, approved=1, rejected=1, approval_rate=50.0)
+    
+    assert json.loads(ORJSONModelResponse(stats).body) == stats.model_dump()
+
+
+def test_orjson_response_encodes_uuid_subclasses():
+    """Test driver UUID types (asyncpg returns a uuid.UUID subclass) are encoded"""
+    class DriverUUID(uuid.UUID):
+        pass
+    
+    value = DriverUUID(str(uuid.uuid4()))
+    
+    assert json.loads(ORJSONModelResponse({"id": value}).body) == {"id": str(value)}
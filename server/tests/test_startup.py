@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from alembic.script import ScriptDirectory
+from app.db.base import SCHEMA_REVISION
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only needed by specific requests, so they must not load at startup; the
+# import time itself is measured by benchmarks/import_time.py
+DEFERRED_MODULES = ("httpx", "pyarrow")
+
+
+def test_schema_revision_matches_alembic_head():
+    """Test the revision checked at startup is the latest migration"""
+    script = ScriptDirectory(os.path.join(SERVER_DIR, "alembic"))
+    assert SCHEMA_REVISION == script.get_current_head()
+
+
+def test_deferred_modules_not_imported():
+    """Test importing the app does not load modules deferred to first use"""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(' '.join(sorted(sys.modules)))"],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    )
+    loaded = set(result.stdout.split())
+    for module in DEFERRED_MODULES:
+        assert module not in loaded
+
+
+def test_production_server_options(monkeypatch):
+    """Test the launcher preloads the app and sizes workers to the available CPUs"""
+    from app.core.config import settings
+    from app.server import Server, Worker, available_cpus, server_options
+    
+    options = server_options()
+    assert options["workers"] == available_cpus() >= 1
+    # gunicorn validates every option when loading them
+    server = Server(options)
+    assert server.cfg.worker_class is Worker
+    assert server.cfg.preload_app
+    assert server.cfg.max_requests == settings.server_max_requests
+    assert server.cfg.keepalive == settings.server_keepalive_seconds
+    # Uvicorn cancels lingering requests before gunicorn kills the worker
+    assert Worker.CONFIG_KWARGS["timeout_graceful_shutdown"] < server.cfg.graceful_timeout
+    
+    monkeypatch.setattr(settings, "server_workers", 3)
+    assert server_options()["workers"] == 3
+    assert server_options(bind="127.0.0.1:9000", workers=5)["workers"] == 5
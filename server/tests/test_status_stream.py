@@ -0,0 +1,127 @@
+import asyncio
+import uuid
+import pytest
+from httpx import AsyncClient
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.core.status_stream import NOTIFY_PAYLOAD_BYTES, Subscription, notify_payloads
+from app.schemas.address import AddressSchema
+from app.services.status_event_service import StatusEventService
+from tests.conftest import test_async_session
+
+
+async def get_auth_headers(client: AsyncClient, phone_number: str) -> dict:
+    """Helper function to get authentication headers"""
+    await client.post("/auth/request-otp", json={"phone_number": phone_number})
+    response = await client.post(
+        "/auth/verify-otp",
+        json={"phone_number": phone_number, "otp_code": "1111"}
+    )
+    tokens = response.json()["tokens"]
+    return {"Authorization": f"Bearer {tokens['access']}"}
+
+
+async def create_application(client: AsyncClient, phone_number: str):
+    """Create a profile with one application; returns headers, profile id and application id"""
+    headers = await get_auth_headers(client, phone_number)
+    profile = await client.post(
+        "/api/accounts/profile/",
+        json={"name": "Test", "surname": "User", "position": "Tester"},
+        headers=headers
+    )
+    with patch('app.services.geocoding_service.geocoding_service.geocode_address_query') as mock_geocode:
+        mock_geocode.return_value = AddressSchema(found=False)
+        application = await client.post(
+            "/api/applications/",
+            json={"description": "Поток", "image_urls": [], "address_query": "Алматы"},
+            headers=headers
+        )
+    return headers, uuid.UUID(profile.json()["id"]), application.json()["id"]
+
+
+async def next_chunk(stream) -> bytes:
+    return await asyncio.wait_for(stream.__anext__(), 2)
+
+
+def test_subscription_memory_bound():
+    """Test a slow subscriber drops its buffer instead of growing it"""
+    subscription = Subscription("profile", max_queued=2)
+    for event_id in range(1, 4):
+        subscription.push({"id": event_id})
+    assert subscription.overflowed is True
+    assert subscription.drain() == []
+
+
+def test_notify_payloads_fit_size_limit():
+    """Test events are packed into as few NOTIFY payloads as fit"""
+    events = [{"id": event_id, "status": "approved", "pad": "x" * 100} for event_id in range(200)]
+    payloads = notify_payloads(events)
+    assert 1 < len(payloads) < 10
+    assert all(len(payload.encode()) <= NOTIFY_PAYLOAD_BYTES for payload in payloads)
+    assert sum(payload.count('"id"') for payload in payloads) == 200
+
+
+@pytest.mark.asyncio
+async def test_stream_delivers_and_resumes(client: AsyncClient, monkeypatch):
+    """Test live status events, heartbeats and resuming from an event id"""
+    headers, profile_id, application_id = await create_application(client, "+77770000043")
+    
+    async with test_async_session() as session:
+        stream = StatusEventService.stream(session, profile_id)
+        assert await next_chunk(stream) == b"retry: 3000\n\n"
+        
+        await client.put(f"/api/applications/{application_id}/status/", json={"status": "approved"}, headers=headers)
+        chunk = (await next_chunk(stream)).decode()
+        assert chunk.startswith("id: ")
+        assert "event: status\n" in chunk
+        assert f'"application_id":"{application_id}"' in chunk
+        assert '"previous_status":"pending","status":"approved"' in chunk
+        first_id = int(chunk.split("\n")[0][len("id: "):])
+        
+        monkeypatch.setattr(settings, "status_stream_heartbeat_seconds", 0.01)
+        assert await next_chunk(stream) == b": heartbeat\n\n"
+        await stream.aclose()
+    
+    await client.put(f"/api/applications/{application_id}/status/", json={"status": "rejected"}, headers=headers)
+    
+    # Reconnecting after the first event replays only what was missed
+    async with test_async_session() as session:
+        stream = StatusEventService.stream(session, profile_id, last_event_id=first_id)
+        await next_chunk(stream)
+        chunk = (await next_chunk(stream)).decode()
+        assert '"previous_status":"approved","status":"rejected"' in chunk
+        assert int(chunk.split("\n")[0][len("id: "):]) > first_id
+        await stream.aclose()
+        
+        # Too far behind to replay: the client is told to reload
+        monkeypatch.setattr(settings, "status_stream_replay_limit", 1)
+        stream = StatusEventService.stream(session, profile_id, last_event_id=0)
+        await next_chunk(stream)
+        assert "event: reset\n" in (await next_chunk(stream)).decode()
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_overflowed_stream_catches_up_from_table(client: AsyncClient, monkeypatch):
+    """Test a connection whose buffer overflowed still receives every event"""
+    headers, profile_id, application_id = await create_application(client, "+77770000143")
+    monkeypatch.setattr(settings, "status_stream_queue_size", 1)
+    
+    async with test_async_session() as session:
+        stream = StatusEventService.stream(session, profile_id)
+        await next_chunk(stream)
+        for new_status in ("approved", "rejected", "pending"):
+            await client.put(f"/api/applications/{application_id}/status/", json={"status": new_status}, headers=headers)
+        chunks = [(await next_chunk(stream)).decode() for _ in range(3)]
+        await stream.aclose()
+    
+    assert ['"status":"approved"' in chunks[0], '"status":"rejected"' in chunks[1], '"status":"pending"' in chunks[2]] == [True] * 3
+
+
+@pytest.mark.asyncio
+async def test_stream_requires_profile(client: AsyncClient):
+    """Test accounts without a profile cannot open a stream"""
+    headers = await get_auth_headers(client, "+77770000243")
+    response = await client.get("/api/applications/events/", headers=headers)
+    assert response.status_code == 404